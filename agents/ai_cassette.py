@@ -0,0 +1,104 @@
+"""
+AI Cassettes - Record and replay AI responses for fast, deterministic runs
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Iterator
+
+
+def request_hash(prompt: str, system_prompt: Optional[str] = None) -> str:
+    """Stable hash of an AI request (provider and model independent)"""
+    canonical = json.dumps({"system": system_prompt or "", "prompt": prompt}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def task_key(task_description: Optional[str]) -> Optional[str]:
+    """Looser match key for a request, derived from the task description only"""
+    if not task_description:
+        return None
+    return hashlib.sha256(task_description.strip().encode('utf-8')).hexdigest()
+
+
+class Cassette:
+    """Append-only JSONL file of recorded AI responses.
+
+    Each line holds the request hash, an optional task key, and the response
+    as a list of ``[offset_seconds, text]`` stream chunks. Requests are matched
+    by exact hash first, then by task key, so recordings survive changes in
+    the surrounding project context.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.by_hash = {}
+        self.by_task = {}
+        self._replay_index = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._index(json.loads(line))
+                except json.JSONDecodeError:
+                    # A partially written trailing line from a crashed recorder
+                    continue
+
+    def _index(self, entry: Dict[str, Any]):
+        self.by_hash.setdefault(entry["hash"], []).append(entry)
+        if entry.get("task_key"):
+            self.by_task.setdefault(entry["task_key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.by_hash.values())
+
+    def lookup(self, req_hash: str, req_task_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Find a recording, cycling through repeated recordings of the same request"""
+        with self._lock:
+            for key, index in ((req_hash, self.by_hash), (req_task_key, self.by_task)):
+                entries = index.get(key) if key else None
+                if entries:
+                    position = self._replay_index.get(key, 0)
+                    self._replay_index[key] = position + 1
+                    return entries[position % len(entries)]
+        return None
+
+    def record(self, req_hash: str, chunks: List[List[Any]], req_task_key: Optional[str] = None,
+               metadata: Optional[Dict[str, Any]] = None):
+        """Append a recorded response to the cassette"""
+        entry = {
+            "hash": req_hash,
+            "task_key": req_task_key,
+            "chunks": chunks,
+            "recorded_at": time.time(),
+            "metadata": metadata or {}
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self._index(entry)
+
+
+def replay_chunks(entry: Dict[str, Any], speed: float = 0.0) -> Iterator[str]:
+    """Yield recorded chunks, optionally paced (speed 1.0 = original timing, 0 = instant)"""
+    start = time.perf_counter()
+    for offset, text in entry.get("chunks", []):
+        if speed > 0:
+            delay = offset / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        yield text
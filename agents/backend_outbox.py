@@ -0,0 +1,275 @@
+"""
+Backend Outbox - Ordered, durable delivery of agent reports across backend outages
+"""
+
+import os
+import json
+import time
+import random
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from http_session import backend_session
+from payload_encoding import encode_json_body
+
+OUTBOX_NAME = "outbox.jsonl"
+DEAD_LETTER_NAME = "outbox.dead.jsonl"
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock shared with other agent processes (no-op where fcntl is missing)"""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class BackendHealth:
+    """Tracks whether the backend is reachable without paying request timeouts.
+
+    A failed request marks it down. Until the next probe is due (exponential
+    backoff with jitter, up to ``max_backoff`` seconds) ``available()``
+    answers False immediately; the probe itself is a TCP connect with a
+    short timeout, not a full HTTP request.
+    """
+
+    def __init__(self, backend_url: str, probe_timeout: float = 0.25, max_backoff: float = 30.0):
+        parsed = urlparse(backend_url)
+        self.address = (parsed.hostname or "localhost", parsed.port or (443 if parsed.scheme == "https" else 80))
+        self.probe_timeout = probe_timeout
+        self.max_backoff = max_backoff
+        self.down_since = None
+        self._backoff = 0.0
+        self._next_probe = 0.0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        if self.down_since is None:
+            return True
+        with self._lock:
+            if self.down_since is None:
+                return True
+            if time.time() < self._next_probe:
+                return False
+            if self._probe():
+                self._mark_up_locked()
+                return True
+            self._schedule_probe_locked()
+            return False
+
+    def mark_down(self):
+        with self._lock:
+            if self.down_since is None:
+                self.down_since = time.time()
+                print(f"🔌 Backend {self.address[0]}:{self.address[1]} unreachable, queuing reports in the outbox")
+            self._schedule_probe_locked()
+
+    def mark_up(self):
+        with self._lock:
+            self._mark_up_locked()
+
+    def _mark_up_locked(self):
+        if self.down_since is not None:
+            print(f"🔌 Backend reachable again after {time.time() - self.down_since:.1f}s")
+        self.down_since = None
+        self._backoff = 0.0
+
+    def _schedule_probe_locked(self):
+        self._backoff = min(self.max_backoff, max(0.5, self._backoff * 2))
+        self._next_probe = time.time() + self._backoff * random.uniform(0.8, 1.2)
+
+    def _probe(self) -> bool:
+        try:
+            socket.create_connection(self.address, timeout=self.probe_timeout).close()
+            return True
+        except OSError:
+            return False
+
+
+class Outbox:
+    """Append-only log of reports that couldn't be delivered yet.
+
+    Each report is one JSON line (backend path, payload, optional coalesce
+    key); ``<log>.offset`` holds how far delivery has got. A background
+    thread replays the log in order whenever the backend is available,
+    backing off after server errors. A report the backend still fails on
+    after ``max_attempts`` tries is moved to ``outbox.dead.jsonl`` so it
+    can't hold up the reports behind it. Of several queued reports sharing a
+    coalesce key (e.g. progress of one task) only the newest is sent. Once
+    everything is delivered the log is truncated. Appends and replays take
+    a file lock, so agent processes can share one outbox.
+    """
+
+    def __init__(self, directory: str, backend_url: str, health: BackendHealth,
+                 compression: str = "gzip", replay_interval: float = 1.0, max_attempts: int = 5):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, OUTBOX_NAME)
+        self.dead_letter_path = os.path.join(directory, DEAD_LETTER_NAME)
+        self.offset_path = self.path + ".offset"
+        self.lock_path = self.path + ".lock"
+        self.backend_url = backend_url
+        self.health = health
+        self.compression = compression
+        self.replay_interval = replay_interval
+        self._replay_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self.max_attempts = max_attempts
+        self._failures = 0
+        # Failed deliveries of the report at the head of the log, keyed by its end offset
+        self._head_attempts = (None, 0)
+        self._thread = None
+        if self.pending():
+            self._start()
+
+    def pending(self) -> bool:
+        """Whether any queued report is still undelivered"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return False
+        return size > self._read_offset()
+
+    def append(self, path: str, payload: Dict[str, Any], coalesce: Optional[str] = None):
+        record = {"path": path, "json": payload, "coalesce": coalesce, "queued_at": time.time()}
+        line = (json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + "\n").encode('utf-8')
+        with _file_lock(self.lock_path):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        self._start()
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self.offset_path, 'r') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, offset: int):
+        temp_path = f"{self.offset_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(str(offset))
+        os.replace(temp_path, self.offset_path)
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="backend-outbox", daemon=True)
+            self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.replay_interval)
+            self._wakeup.clear()
+            if self.pending() and self.health.available():
+                try:
+                    self.replay()
+                except Exception as e:
+                    print(f"⚠️ Outbox replay error: {e}")
+            if self._failures:
+                # Server errors: back off before the next round
+                time.sleep(min(30.0, 2 ** self._failures) * random.uniform(0.8, 1.2))
+
+    def _read_pending(self, offset: int):
+        records = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                if not line.endswith(b"\n"):
+                    break  # a report still being appended
+                try:
+                    records.append((offset, json.loads(line)))
+                except ValueError:
+                    records.append((offset, None))
+        return records
+
+    def replay(self) -> Tuple[int, int]:
+        """Deliver queued reports in order; returns (sent, skipped as superseded)"""
+        import requests
+        sent = skipped = 0
+        with self._replay_lock, _file_lock(self.lock_path):
+            if not os.path.exists(self.path):
+                return sent, skipped
+            records = self._read_pending(self._read_offset())
+            newest = {}
+            for index, (_, record) in enumerate(records):
+                if record and record.get("coalesce"):
+                    newest[record["coalesce"]] = index
+
+            for index, (end_offset, record) in enumerate(records):
+                if record is None or (record.get("coalesce") and newest[record["coalesce"]] != index):
+                    skipped += 1
+                    self._write_offset(end_offset)
+                    continue
+                try:
+                    headers, body = encode_json_body(record["json"], self.compression)
+                    response = backend_session().post(f"{self.backend_url}{record['path']}", data=body,
+                                                      headers=headers, timeout=10)
+                except requests.RequestException:
+                    self.health.mark_down()
+                    break
+                if response.status_code >= 500:
+                    attempts = self._head_attempts[1] + 1 if self._head_attempts[0] == end_offset else 1
+                    if attempts < self.max_attempts:
+                        self._head_attempts = (end_offset, attempts)
+                        self._failures += 1
+                        break
+                    self._dead_letter(record, response.status_code)
+                    self._head_attempts = (None, 0)
+                    self._failures = 0
+                    skipped += 1
+                    self._write_offset(end_offset)
+                    continue
+                if response.status_code >= 400:
+                    print(f"⚠️ Outbox: backend rejected queued report {record['path']}: {response.status_code}")
+                self._failures = 0
+                self._head_attempts = (None, 0)
+                sent += 1
+                self._write_offset(end_offset)
+
+            if self._read_offset() >= os.path.getsize(self.path):
+                # Fully delivered: start a fresh log
+                os.truncate(self.path, 0)
+                self._write_offset(0)
+        if sent or skipped:
+            print(f"📬 Outbox: delivered {sent} queued report(s), {skipped} superseded or dead-lettered")
+        return sent, skipped
+
+    def _dead_letter(self, record: Dict[str, Any], status_code: int):
+        """Set aside a report the backend keeps failing on (called under the file lock)"""
+        record = dict(record, status_code=status_code, attempts=self.max_attempts, dead_at=time.time())
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + "\n")
+        print(f"☠️ Outbox: {record['path']} failed {self.max_attempts} times ({status_code}), "
+              f"moved to {self.dead_letter_path}")
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def backend_delivery(backend_url: str, directory: str, compression: str = "gzip") -> Tuple[BackendHealth, Outbox]:
+    """Health tracker and outbox shared by every agent in this process using the same backend"""
+    key = (backend_url, os.path.abspath(directory))
+    with _shared_lock:
+        if key not in _shared:
+            health = BackendHealth(backend_url,
+                                   probe_timeout=float(os.getenv("BACKEND_PROBE_TIMEOUT", "0.25")),
+                                   max_backoff=float(os.getenv("BACKEND_MAX_BACKOFF", "30")))
+            _shared[key] = (health, Outbox(directory, backend_url, health, compression,
+                                           max_attempts=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))))
+        return _shared[key]
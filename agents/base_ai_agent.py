@@ -5,22 +5,50 @@ Base AI Agent - Provides common AI integration functionality
 import os
 import json
 import time
-from typing import Dict, Any, List, Optional
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, Any, List, Optional, Iterator, Tuple, Callable
 from abc import ABC, abstractmethod
-import requests
-from dotenv import load_dotenv
-from project_context import ProjectContext
+from ai_cassette import Cassette, request_hash, task_key, replay_chunks
+from output_manifest import OutputManifest, file_digest, task_directory, load_archived_task
+from blob_store import BlobStore
+from task_output import cleanup_staging
+from task_checkpoint import cleanup_checkpoints
+from payload_encoding import encode_json_body, compression_setting
+from backend_outbox import backend_delivery
+from channel_client import ACCEPTED as CHANNEL_ACCEPTED
+from http_session import backend_session
+
+_environment_loaded = False
+
+
+def load_environment():
+    """Load .env into the environment once, at startup rather than at import"""
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
 
-# Load environment variables
-load_dotenv()
 
 class BaseAIAgent(ABC):
     def __init__(self, name: str, ai_provider: str = "openai"):
+        load_environment()
         self.name = name
         self.ai_provider = ai_provider.lower()
         self.status = "idle"
         self.current_task = None
+        self.current_task_description = None
         self.backend_url = os.getenv("BACKEND_URL", "http://localhost:4000")
+        # Batched file reports: None until the backend's support is known
+        self.batch_files_supported = None
+        self.notify_compression = compression_setting()
+        self.notify_chunk_bytes = int(os.getenv("NOTIFY_CHUNK_BYTES", str(1024 * 1024)))
+        
+        # Cassette for recording (AI_CASSETTE_RECORD=true) or replaying (AI_PROVIDER=replay) responses
+        cassette_path = os.getenv("AI_CASSETTE")
+        self.cassette = Cassette(cassette_path) if cassette_path else None
+        self.record_cassette = os.getenv("AI_CASSETTE_RECORD", "false").lower() == "true"
         
         # Initialize AI client based on provider
         self._init_ai_client()
@@ -28,39 +56,117 @@ class BaseAIAgent(ABC):
         # Output directory for generated code
         self.output_dir = os.path.join(os.getcwd(), "generated_code")
         os.makedirs(self.output_dir, exist_ok=True)
+        self.output_manifest = OutputManifest(self.output_dir)
+        # Content-addressed store behind write_file; task folders hold hardlinks
+        self.blob_store = BlobStore(os.path.join(self.output_dir, ".blobs"))
+        self.file_hashes = {}
+        self.file_contents = {}
+        # Task output is staged privately and renamed into place (see task_output.py)
+        self.output_io_workers = int(os.getenv("OUTPUT_IO_WORKERS", "4"))
+        cleanup_staging(self.output_dir)
+        # Reports the backend can't take right now wait in a durable outbox
+        self.backend_health, self.outbox = backend_delivery(
+            self.backend_url, os.path.join(self.output_dir, ".outbox"), self.notify_compression)
+        # Set by the orchestrator while its backend WebSocket is joined (see channel_client.py)
+        self.channel = None
+        # Stage checkpoints let a retried task resume (see task_checkpoint.py)
+        cleanup_checkpoints(self.output_dir, float(os.getenv("CHECKPOINT_RETENTION_HOURS", "24")) * 3600)
+        
+        # Project context for AI awareness: one per process, scanned on first use
+        self._project_context = None
         
-        # Project context for AI awareness
-        self.project_context = ProjectContext()
+        # Optional background watcher so tasks never wait on a context scan;
+        # agents share the context, so only the first one starts it
+        self.context_watcher = None
+        if os.getenv("CONTEXT_WATCHER", "false").lower() == "true" and not self.project_context.watcher_active:
+            from context_watcher import ContextWatcher
+            self.context_watcher = ContextWatcher(self.project_context)
+            self.context_watcher.start()
+    
+    @property
+    def project_context(self):
+        if self._project_context is None:
+            from project_context import shared_project_context
+            self._project_context = shared_project_context()
+        return self._project_context
     
     def _init_ai_client(self):
-        """Initialize AI client based on provider"""
+        """Configure the AI provider; its SDK client is created on first use (see ai_client)"""
+        self._ai_client = None
+        self._ai_client_ready = False
+        self._ai_client_lock = threading.Lock()
+        if self.ai_provider == "openai":
+            self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        elif self.ai_provider == "anthropic":
+            self.model = os.getenv("ANTHROPIC_MODEL", "claude-3-haiku-20240307")
+        elif self.ai_provider == "mock":
+            # Offline provider for benchmarks: serves the fallback templates
+            # after an optional simulated model latency
+            self.model = "mock"
+            self.mock_latency = float(os.getenv("MOCK_AI_LATENCY", "0"))
+        elif self.ai_provider == "replay":
+            # Serve recorded responses from the cassette instead of a live model
+            self.model = "replay"
+            self.replay_speed = float(os.getenv("AI_REPLAY_SPEED", "0"))
+            if self.cassette is None:
+                print("Warning: AI_PROVIDER=replay but AI_CASSETTE is not set")
+        else:
+            print(f"Warning: Unknown AI provider: {self.ai_provider}")
+    
+    @property
+    def ai_client(self):
+        """The provider SDK client, imported and constructed on first use"""
+        if not self._ai_client_ready:
+            with self._ai_client_lock:
+                if not self._ai_client_ready:
+                    self._ai_client = self._create_ai_client()
+                    self._ai_client_ready = True
+        return self._ai_client
+    
+    @ai_client.setter
+    def ai_client(self, client):
+        self._ai_client = client
+        self._ai_client_ready = True
+    
+    def _create_ai_client(self):
         if self.ai_provider == "openai":
             try:
                 import openai
                 api_key = os.getenv("OPENAI_API_KEY")
                 if api_key and not api_key.startswith('sk-placeholder'):
                     # Simple client creation without extra arguments
-                    self.ai_client = openai.OpenAI(api_key=api_key)
-                else:
-                    self.ai_client = None
-                self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+                    return openai.OpenAI(api_key=api_key)
             except Exception as e:
                 print(f"Warning: OpenAI client not available: {e}")
-                self.ai_client = None
-                
         elif self.ai_provider == "anthropic":
             try:
                 import anthropic
-                self.ai_client = anthropic.Anthropic(
+                return anthropic.Anthropic(
                     api_key=os.getenv("ANTHROPIC_API_KEY")
                 )
-                self.model = os.getenv("ANTHROPIC_MODEL", "claude-3-haiku-20240307")
             except Exception as e:
                 print(f"Warning: Anthropic client not available: {e}")
-                self.ai_client = None
-        else:
-            print(f"Warning: Unknown AI provider: {self.ai_provider}")
-            self.ai_client = None
+        return None
+    
+    def warm_up_ai_client(self, connect: Optional[bool] = None) -> bool:
+        """Create the SDK client now and, with ``connect`` (AI_WARMUP_CONNECT), open its HTTP connection.
+        
+        Listing models is free and leaves a kept-alive TLS connection in the
+        client's pool for the first real call. Returns False when there is
+        no client or the provider couldn't be reached.
+        """
+        client = self.ai_client
+        if client is None:
+            return False
+        if connect is None:
+            connect = os.getenv("AI_WARMUP_CONNECT", "true").lower() == "true"
+        if connect:
+            try:
+                client.with_options(timeout=5.0, max_retries=0).models.list()
+            except Exception as e:
+                print(f"⚠️ Could not reach {self.ai_provider} during warm-up: {e}")
+                return False
+        return True
     
     def call_ai_with_context(self, task_description: str, system_prompt: Optional[str] = None) -> str:
         """Make an AI API call with project context awareness"""
@@ -69,6 +175,21 @@ class BaseAIAgent(ABC):
     
     def call_ai(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Make an AI API call and return the response"""
+        if self.ai_provider == "replay":
+            return self._replay_ai(prompt, system_prompt)
+        
+        if self.cassette is not None and self.record_cassette:
+            return self._record_ai(prompt, system_prompt)
+        
+        return self._call_ai_direct(prompt, system_prompt)
+    
+    def _call_ai_direct(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Call the configured provider (or fallback templates) without any cassette handling"""
+        if self.ai_provider == "mock":
+            if self.mock_latency > 0:
+                time.sleep(self.mock_latency)
+            return self._generate_fallback_response(prompt)
+        
         if not self.ai_client:
             print(f"[{self.name}] ⚠️ AI client not available, using fallback template system")
             return self._generate_fallback_response(prompt)
@@ -105,6 +226,77 @@ class BaseAIAgent(ABC):
         
         return "No AI response available"
     
+    def _stream_ai(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Stream an AI response as text chunks (whole response for non-streaming providers)"""
+        if not self.ai_client:
+            yield self._call_ai_direct(prompt, system_prompt)
+            return
+        
+        try:
+            if self.ai_provider == "openai":
+                messages = []
+                if system_prompt:
+                    messages.append({"role": "system", "content": system_prompt})
+                messages.append({"role": "user", "content": prompt})
+                
+                stream = self.ai_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=4000,
+                    temperature=0.7,
+                    stream=True
+                )
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                        
+            elif self.ai_provider == "anthropic":
+                with self.ai_client.messages.stream(
+                    model=self.model,
+                    max_tokens=4000,
+                    temperature=0.7,
+                    system=system_prompt or "",
+                    messages=[{"role": "user", "content": prompt}]
+                ) as stream:
+                    for text in stream.text_stream:
+                        yield text
+                        
+        except Exception as e:
+            error_msg = f"AI API call failed: {str(e)}"
+            print(f"[{self.name}] {error_msg}")
+            yield f"Error: {error_msg}"
+    
+    def _record_ai(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Call the AI and append the response, with stream chunk timing, to the cassette"""
+        start = time.perf_counter()
+        chunks = []
+        for text in self._stream_ai(prompt, system_prompt):
+            chunks.append([round(time.perf_counter() - start, 4), text])
+        response = "".join(text for _, text in chunks)
+        
+        if response.startswith("Error:"):
+            return response
+        
+        self.cassette.record(
+            request_hash(prompt, system_prompt),
+            chunks,
+            task_key(self.current_task_description),
+            {"provider": self.ai_provider, "model": getattr(self, 'model', None)}
+        )
+        print(f"[{self.name}] 📼 Recorded AI response ({len(chunks)} chunks)")
+        return response
+    
+    def _replay_ai(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Serve a recorded response from the cassette"""
+        req_hash = request_hash(prompt, system_prompt)
+        entry = self.cassette.lookup(req_hash, task_key(self.current_task_description)) if self.cassette is not None else None
+        if not entry:
+            error_msg = f"No cassette recording for request {req_hash[:12]}"
+            print(f"[{self.name}] {error_msg}")
+            return f"Error: {error_msg}"
+        
+        return "".join(replay_chunks(entry, self.replay_speed))
+    
     def _generate_fallback_response(self, prompt: str) -> str:
         """Generate a fallback response when AI client is not available"""
         # Extract task type from prompt
@@ -618,10 +810,12 @@ function App() {
             else:
                 filepath = os.path.join(self.output_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            digest, existed = self.blob_store.put(content.encode('utf-8'))
+            self.blob_store.link(digest, filepath)
+            self.file_hashes[filepath] = digest
             
-            print(f"[{self.name}] ✅ Created file: {filepath}")
+            dedup = " (deduplicated)" if existed else ""
+            print(f"[{self.name}] ✅ Created file: {filepath}{dedup}")
             return filepath
             
         except Exception as e:
@@ -629,6 +823,37 @@ function App() {
             print(f"[{self.name}] ❌ {error_msg}")
             return error_msg
     
+    def record_task_outputs(self, task_id: str, file_paths: List[str]):
+        """Append the task's files (relative to the output dir) and their hashes to the manifest"""
+        if not file_paths:
+            return
+        try:
+            files = {
+                os.path.relpath(path, self.output_dir).replace(os.sep, '/'): self.file_hashes.get(path) or file_digest(path)
+                for path in file_paths
+            }
+            self.output_manifest.record(task_id, task_directory(files), files, {"agent": self.name})
+        except Exception as e:
+            print(f"[{self.name}] ⚠️ Failed to update output manifest: {e}")
+    
+    def load_task_outputs(self, task_id: str) -> Tuple[str, Dict[str, str]]:
+        """A previous task's output directory and files (root-relative path -> text), archived or not"""
+        entry = self.output_manifest.latest(task_id)
+        if not entry:
+            return "", {}
+        if "archived" in entry:
+            files = {path: data.decode('utf-8', errors='replace')
+                     for path, data in load_archived_task(self.output_dir, task_id).items()}
+        else:
+            files = {}
+            for path, digest in entry.get("files", {}).items():
+                data = self.blob_store.read(digest) if digest else None
+                if data is not None:
+                    files[path] = data.decode('utf-8', errors='replace')
+                elif os.path.exists(os.path.join(self.output_dir, path)):
+                    files[path] = self.read_file(os.path.join(self.output_dir, path))
+        return (task_directory(files) if files else ""), files
+    
     def read_file(self, filepath: str) -> str:
         """Read an existing file for context"""
         try:
@@ -650,11 +875,9 @@ function App() {
                 "metadata": metadata or {}
             }
             
-            response = requests.post(
-                f"{self.backend_url}/api/agent_status",
-                json=payload,
-                timeout=5
-            )
+            response = self._post_report("/api/agent_status", payload, timeout=5, coalesce=f"status:{self.name}")
+            if response is None:
+                return  # queued in the outbox
             
             if response.status_code == 200:
                 progress_info = f" ({progress}%)" if progress is not None else ""
@@ -677,11 +900,10 @@ function App() {
                 "timestamp": time.time()
             }
             
-            response = requests.post(
-                f"{self.backend_url}/api/tasks/{task_id}/progress",
-                json=payload,
-                timeout=5
-            )
+            response = self._post_report(f"/api/tasks/{task_id}/progress", payload, timeout=5,
+                                         coalesce=f"progress:{task_id}")
+            if response is None:
+                return  # queued in the outbox
             
             if response.status_code == 200:
                 print(f"[{self.name}] 📈 Progress updated: {progress}% - {stage}")
@@ -691,43 +913,216 @@ function App() {
         except Exception as e:
             print(f"[{self.name}] ⚠️ Progress update error: {e}")
     
-    def notify_file_created(self, task_id: str, file_path: str, file_type: str, description: str = ""):
-        """Notify backend when a file is created"""
+    def notify_file_created(self, task_id: str, file_path: str, file_type: str, description: str = "",
+                            content_hash: Optional[str] = None, content: Optional[str] = None):
+        """Notify backend when a file is created; content the backend already has is sent by hash only"""
         try:
-            # Read file content to send to backend
-            content = ""
-            try:
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-            except Exception as read_error:
-                print(f"[{self.name}] ⚠️ Could not read file {file_path}: {read_error}")
-                content = "// Could not read file content"
-            
             payload = {
                 "task_id": task_id,
                 "agent_id": self.name,
                 "file_path": file_path,
                 "file_type": file_type,
                 "description": description,
-                "content": content,
+                "content_hash": content_hash,
                 "timestamp": time.time()
             }
+            deduplicated = bool(content_hash) and self.blob_store.is_uploaded(self.backend_url, content_hash)
+            if not deduplicated:
+                payload["content"] = content if content is not None else self._file_content(file_path, content_hash)
             
-            response = requests.post(
-                f"{self.backend_url}/api/tasks/{task_id}/files",
-                json=payload,
-                timeout=5
-            )
+            # Queued reports always carry the content: the hash may be stale by replay time
+            with_content = lambda: {**payload, "content": content if content is not None
+                                    else self._file_content(file_path, content_hash)}
+            response = self._post_report(f"/api/tasks/{task_id}/files", payload, timeout=5, queue_as=with_content)
+            if response is None:
+                return
+            
+            if deduplicated and response.status_code in (409, 422):
+                # The backend lost (or never stored) this content: upload it after all
+                self.blob_store.forget_uploaded(self.backend_url, content_hash)
+                deduplicated = False
+                payload = with_content()
+                response = self._post_report(f"/api/tasks/{task_id}/files", payload, timeout=5)
+                if response is None:
+                    return
             
             if response.status_code == 200:
-                print(f"[{self.name}] 📄 File created: {file_path}")
+                if content_hash:
+                    self.blob_store.mark_uploaded(self.backend_url, content_hash)
+                dedup = " (content already on backend)" if deduplicated else ""
+                print(f"[{self.name}] 📄 File created: {file_path}{dedup}")
             else:
                 print(f"[{self.name}] ⚠️ Failed to notify file creation: {response.status_code}")
                 
         except Exception as e:
             print(f"[{self.name}] ⚠️ File notification error: {e}")
     
+    def notify_files_created(self, task_id: str, files: List[Dict[str, Any]]):
+        """Report all of a task's files in one compressed request.
+        
+        Each file dict holds file_path, file_type, description, content_hash and
+        the in-memory content. Content the backend already has is sent by hash
+        only; an amended file with a ``patch`` against an uploaded ``base_hash``
+        is sent as that patch. Backends without the batch endpoint get one
+        request per file.
+        """
+        if not files:
+            return
+        if self.batch_files_supported is False:
+            self._notify_files_individually(task_id, files)
+            return
+        
+        try:
+            entries = []
+            deduplicated = 0
+            patched = 0
+            for file in files:
+                entry = {key: file.get(key) for key in ("file_path", "file_type", "description", "content_hash")}
+                if file.get("content_hash") and self.blob_store.is_uploaded(self.backend_url, file["content_hash"]):
+                    deduplicated += 1
+                elif file.get("patch") and file.get("base_hash") and \
+                        self.blob_store.is_uploaded(self.backend_url, file["base_hash"]):
+                    # The backend rebuilds the content from its copy of the base
+                    entry["patch"] = file["patch"]
+                    entry["base_hash"] = file["base_hash"]
+                    patched += 1
+                else:
+                    entry["content"] = self._batch_content(file)
+                entries.append(entry)
+            
+            response = self._post_files_batch(task_id, entries, full_entries=lambda: [
+                {**{key: file.get(key) for key in ("file_path", "file_type", "description", "content_hash")},
+                 "content": self._batch_content(file)}
+                for file in files
+            ])
+            if response is None:
+                print(f"[{self.name}] 📮 Backend unavailable, {len(files)} file reports queued")
+                return
+            if response.status_code == 404 and "Task not found" not in response.text:
+                # Older backend without the batch route
+                self.batch_files_supported = False
+                self._notify_files_individually(task_id, files)
+                return
+            if response.status_code != 200:
+                print(f"[{self.name}] ⚠️ Failed to report files: {response.status_code}")
+                return
+            self.batch_files_supported = True
+            
+            result = response.json()
+            content_required = set(result.get("content_required") or [])
+            if content_required:
+                # The backend lost some content we sent by hash (or couldn't
+                # apply a patch): upload just those in full
+                retry = []
+                for file, entry in zip(files, entries):
+                    if entry["file_path"] in content_required:
+                        self.blob_store.forget_uploaded(self.backend_url, entry["content_hash"])
+                        if "patch" in entry:
+                            self.blob_store.forget_uploaded(self.backend_url, entry.pop("base_hash"))
+                            del entry["patch"]
+                            patched -= 1
+                        else:
+                            deduplicated -= 1
+                        entry["content"] = self._batch_content(file)
+                        retry.append(entry)
+                response = self._post_files_batch(task_id, retry)
+                if response is not None and response.status_code == 200:
+                    result["recorded"] = list(result.get("recorded") or []) + list(response.json().get("recorded") or [])
+            
+            recorded = set(result.get("recorded") or [])
+            for file in files:
+                if file.get("content_hash") and file["file_path"] in recorded:
+                    self.blob_store.mark_uploaded(self.backend_url, file["content_hash"])
+            
+            failed = result.get("failed") or []
+            failed_info = f", {len(failed)} failed" if failed else ""
+            print(f"[{self.name}] 📄 Reported {len(recorded)} files in one request "
+                  f"({deduplicated} by hash only, {patched} as patches{failed_info})")
+                
+        except Exception as e:
+            print(f"[{self.name}] ⚠️ File notification error: {e}")
+    
+    def _post_report(self, path: str, payload: Dict[str, Any], timeout: float = 5,
+                     coalesce: Optional[str] = None, queue_as: Optional[Callable[[], Dict[str, Any]]] = None,
+                     compressed: bool = False):
+        """Send a report to the backend over the agents channel, by HTTP POST, or via the outbox.
+        
+        While the orchestrator's WebSocket is joined (``self.channel``) the
+        report is one channel message; status and progress are not awaited.
+        Returns the response (or channel reply), or None if the report was queued: because the
+        backend is known to be down (no timeout is paid), the request failed to
+        connect, or the backend answered with a server error. The outbox retries
+        queued reports a limited number of times (see Outbox). ``queue_as`` builds
+        the payload to store instead (e.g. with full content rather than a hash);
+        queued reports sharing a ``coalesce`` key are superseded by the newest.
+        """
+        if not self.backend_health.available():
+            self.outbox.append(path, queue_as() if queue_as else payload, coalesce)
+            return None
+        pushed = self.channel.push(path, payload, coalesce, queue_as) if self.channel else None
+        if pushed is not None:
+            if coalesce:
+                return CHANNEL_ACCEPTED  # status and progress aren't awaited
+            try:
+                response = pushed.result(timeout=timeout)
+            except FutureTimeout:
+                return None  # still in flight; the outbox gets it if the socket drops
+            if response is None:
+                return None  # the socket dropped and the report went to the outbox
+        else:
+            import requests
+            try:
+                if compressed:
+                    headers, body = encode_json_body(payload, self.notify_compression, self.notify_chunk_bytes)
+                    response = backend_session().post(f"{self.backend_url}{path}", data=body, headers=headers,
+                                                      timeout=timeout)
+                else:
+                    response = backend_session().post(f"{self.backend_url}{path}", json=payload, timeout=timeout)
+            except requests.RequestException:
+                self.backend_health.mark_down()
+                self.outbox.append(path, queue_as() if queue_as else payload, coalesce)
+                return None
+        if response.status_code >= 500:
+            self.outbox.append(path, queue_as() if queue_as else payload, coalesce)
+            return None
+        return response
+    
+    def _batch_content(self, file: Dict[str, Any]) -> str:
+        if file.get("content") is not None:
+            return file["content"]
+        return self._file_content(file["file_path"], file.get("content_hash"))
+    
+    def _post_files_batch(self, task_id: str, entries: List[Dict[str, Any]],
+                          full_entries: Optional[Callable[[], List[Dict[str, Any]]]] = None):
+        payload = {
+            "task_id": task_id,
+            "agent_id": self.name,
+            "files": entries,
+            "timestamp": time.time()
+        }
+        queue_as = (lambda: {**payload, "files": full_entries()}) if full_entries else None
+        return self._post_report(f"/api/tasks/{task_id}/files/batch", payload, timeout=30,
+                                 queue_as=queue_as, compressed=True)
+    
+    def _notify_files_individually(self, task_id: str, files: List[Dict[str, Any]]):
+        for file in files:
+            self.notify_file_created(task_id, file["file_path"], file["file_type"], file.get("description", ""),
+                                     content_hash=file.get("content_hash"), content=file.get("content"))
+    
+    def _file_content(self, file_path: str, content_hash: Optional[str] = None) -> str:
+        """File content for upload: from the blob store when hashed, else read from disk"""
+        data = self.blob_store.read(content_hash) if content_hash else None
+        if data is not None:
+            return data.decode('utf-8', errors='replace')
+        try:
+            if os.path.exists(file_path):
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    return f.read()
+        except Exception as read_error:
+            print(f"[{self.name}] ⚠️ Could not read file {file_path}: {read_error}")
+            return "// Could not read file content"
+        return ""
+    
     def report_task_completion(self, task_id: str, result: Dict[str, Any], files_created: List[str]):
         """Send comprehensive task completion report"""
         try:
@@ -745,11 +1140,10 @@ function App() {
                 }
             }
             
-            response = requests.post(
-                f"{self.backend_url}/api/tasks/{task_id}/complete",
-                json=payload,
-                timeout=10
-            )
+            response = self._post_report(f"/api/tasks/{task_id}/complete", payload, timeout=10)
+            if response is None:
+                print(f"[{self.name}] 📮 Task completion queued for delivery")
+                return
             
             if response.status_code == 200:
                 print(f"[{self.name}] ✅ Task completion reported: {len(files_created)} files created")
@@ -776,11 +1170,10 @@ function App() {
                 }
             }
             
-            response = requests.post(
-                f"{self.backend_url}/api/tasks/{task_id}/error",
-                json=payload,
-                timeout=5
-            )
+            response = self._post_report(f"/api/tasks/{task_id}/error", payload, timeout=5)
+            if response is None:
+                print(f"[{self.name}] 📮 Error report queued for delivery")
+                return
             
             if response.status_code == 200:
                 print(f"[{self.name}] 🚨 Error reported: {error_type}")
@@ -801,11 +1194,7 @@ function App() {
                 }
             }
             
-            requests.post(
-                f"{self.backend_url}/api/messages",
-                json=payload,
-                timeout=5
-            )
+            self._post_report("/api/messages", payload, timeout=5)
             
         except Exception as e:
             print(f"[{self.name}] ⚠️ Failed to send progress update: {e}")
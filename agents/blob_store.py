@@ -0,0 +1,134 @@
+"""
+Blob Store - Content-addressed storage for generated files
+"""
+
+import os
+import stat
+import shutil
+import hashlib
+import tempfile
+import threading
+from typing import Optional, Tuple
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    """Stores each distinct file content once, keyed by its sha256.
+
+    Blobs live under ``<root>/<hash[:2]>/<hash>`` and are read-only; task
+    folders get hardlinks to them (a copy where the filesystem can't link),
+    so disk usage grows with unique content rather than with task count.
+    The store also remembers which hashes a backend has acknowledged, so
+    their content never has to be uploaded again.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._uploaded = {}  # backend url -> set of acknowledged hashes
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data: bytes, sync: bool = True) -> Tuple[str, bool]:
+        """Store content if it's new; returns (hash, already_stored).
+
+        With ``sync=False`` the caller is responsible for fsync'ing new blobs.
+        """
+        digest = content_hash(data)
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return digest, True
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            # Concurrent writers of the same content race harmlessly here
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return digest, False
+
+    def link(self, digest: str, destination: str):
+        """Place the blob at ``destination``, replacing whatever is there"""
+        directory = os.path.dirname(destination) or "."
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{os.path.basename(destination)}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(self.blob_path(digest), temp_path)
+        except OSError:
+            # Cross-device or no hardlink support: fall back to a private copy
+            shutil.copyfile(self.blob_path(digest), temp_path)
+        os.replace(temp_path, destination)
+
+    def read(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self.blob_path(digest), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def is_uploaded(self, backend_url: str, digest: str) -> bool:
+        return digest in self._uploaded_set(backend_url)
+
+    def mark_uploaded(self, backend_url: str, digest: str):
+        uploaded = self._uploaded_set(backend_url)
+        with self._lock:
+            if digest in uploaded:
+                return
+            uploaded.add(digest)
+            with open(self._uploaded_path(backend_url), 'a', encoding='utf-8') as f:
+                f.write(digest + "\n")
+
+    def forget_uploaded(self, backend_url: str, digest: str):
+        """The backend no longer has this content (e.g. its database was reset)"""
+        with self._lock:
+            self._uploaded_set(backend_url).discard(digest)
+
+    def _uploaded_path(self, backend_url: str) -> str:
+        return os.path.join(self.root, f"uploaded-{hashlib.sha1(backend_url.encode('utf-8')).hexdigest()[:12]}.txt")
+
+    def _uploaded_set(self, backend_url: str) -> set:
+        uploaded = self._uploaded.get(backend_url)
+        if uploaded is None:
+            uploaded = set()
+            try:
+                with open(self._uploaded_path(backend_url), 'r', encoding='utf-8') as f:
+                    uploaded.update(line.strip() for line in f if line.strip())
+            except OSError:
+                pass
+            self._uploaded[backend_url] = uploaded
+        return uploaded
+
+    def prune(self) -> int:
+        """Delete blobs no task folder links to any more (e.g. after archiving); returns the count"""
+        removed = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                if len(name) == 64 and os.stat(path).st_nlink == 1:
+                    os.unlink(path)
+                    removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        blobs = 0
+        total_bytes = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if len(name) == 64:
+                    blobs += 1
+                    total_bytes += os.path.getsize(os.path.join(directory, name))
+        return {"blobs": blobs, "bytes": total_bytes}
@@ -0,0 +1,229 @@
+"""
+Channel Client - Agent reports pushed over the backend WebSocket instead of one HTTP request each
+"""
+
+import json
+import asyncio
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+CHANNEL_TOPIC = "agents:lobby"
+JOIN_REF = "agents-join"
+
+# Report routes the backend also accepts as channel events (see AgentChannel)
+_TASK_EVENTS = {
+    "progress": "task_progress",
+    "files": "file_created",
+    "files/batch": "files_created",
+    "complete": "task_completed",
+    "error": "task_error",
+}
+
+_encoder = None
+
+
+def encode_json(message: Dict[str, Any]) -> str:
+    """Compact JSON text frame; orjson when installed, else the stdlib"""
+    global _encoder
+    if _encoder is None:
+        try:
+            import orjson
+            _encoder = lambda obj: orjson.dumps(obj, default=str).decode('utf-8')
+        except ImportError:
+            _encoder = lambda obj: json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str)
+    return _encoder(message)
+
+
+def channel_event(path: str) -> Optional[str]:
+    """Channel event for a backend report route, or None if it has no channel equivalent"""
+    if path == "/api/agent_status":
+        return "agent_status"
+    if path == "/api/messages":
+        return "chat_message"
+    if path.startswith("/api/tasks/"):
+        _, _, suffix = path[len("/api/tasks/"):].partition("/")
+        return _TASK_EVENTS.get(suffix)
+    return None
+
+
+class ChannelReply:
+    """A channel reply with the parts of a requests.Response report code reads"""
+
+    def __init__(self, status_code: int, body: Optional[Dict[str, Any]] = None):
+        self.status_code = status_code
+        self._body = body or {}
+
+    def json(self) -> Dict[str, Any]:
+        return self._body
+
+    @property
+    def text(self) -> str:
+        return json.dumps(self._body, default=str)
+
+
+# Fire-and-forget pushes (status, progress) don't wait for the backend
+ACCEPTED = ChannelReply(200, {"status": "pushed"})
+
+
+class _Message:
+    __slots__ = ("event", "path", "payload", "coalesce", "queue_as", "future")
+
+    def __init__(self, event, path, payload, coalesce, queue_as):
+        self.event = event
+        self.path = path
+        self.payload = payload
+        self.coalesce = coalesce
+        self.queue_as = queue_as
+        self.future = Future()
+
+
+class ChannelReporter:
+    """Pushes agent reports as messages on the ``agents:lobby`` channel.
+
+    Agent threads call ``push`` while the orchestrator's socket is joined;
+    the message goes into a bounded buffer and ``run`` (on the socket's event
+    loop) sends it as one frame. Backpressure is applied at three points:
+    ``websocket.send`` waits for the transport to drain, at most
+    ``max_in_flight`` messages await a reply, and once ``buffer_size``
+    messages are waiting ``push`` refuses so the caller uses HTTP instead.
+    A buffered report sharing a ``coalesce`` key with a newer one is replaced
+    in place. When the socket drops, everything unsent or unanswered goes to
+    ``on_undelivered`` (the outbox), so delivery stays at-least-once;
+    ``on_join`` runs once the channel is joined (the backend is reachable).
+    """
+
+    def __init__(self, buffer_size: int = 1000, max_in_flight: int = 100,
+                 on_undelivered: Optional[Callable[[str, Dict[str, Any], Optional[str]], None]] = None,
+                 on_join: Optional[Callable[[], None]] = None):
+        self.buffer_size = buffer_size
+        self.max_in_flight = max_in_flight
+        self.on_undelivered = on_undelivered
+        self.on_join = on_join
+        self.joined = False
+        self.stats = {"pushed": 0, "coalesced": 0, "refused": 0, "released": 0}
+        self._buffer = deque()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._refs = itertools.count(1)
+        self._loop = None
+        self._wakeup = None
+        self._websocket = None
+
+    def push(self, path: str, payload: Dict[str, Any], coalesce: Optional[str] = None,
+             queue_as: Optional[Callable[[], Dict[str, Any]]] = None) -> Optional[Future]:
+        """Queue a report for the channel.
+
+        Returns a Future resolved with the ChannelReply (or None if the report
+        went to the outbox instead), or None if the channel can't take it:
+        not joined, no channel event for ``path``, or the buffer is full.
+        """
+        event = channel_event(path)
+        if event is None or not self.joined:
+            return None
+        with self._lock:
+            if not self.joined:
+                return None
+            if coalesce:
+                for message in self._buffer:
+                    if message.coalesce == coalesce:
+                        message.payload, message.queue_as = payload, queue_as
+                        self.stats["coalesced"] += 1
+                        return message.future
+            if len(self._buffer) >= self.buffer_size:
+                self.stats["refused"] += 1
+                return None
+            message = _Message(event, path, payload, coalesce, queue_as)
+            self._buffer.append(message)
+            self.stats["pushed"] += 1
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+        return message.future
+
+    async def run(self, websocket):
+        """Join the channel on a connected socket and send buffered reports until it closes"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._websocket = websocket
+        await websocket.send(encode_json({"topic": CHANNEL_TOPIC, "event": "phx_join", "payload": {}, "ref": JOIN_REF}))
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while True:
+                    with self._lock:
+                        if not self.joined or not self._buffer or len(self._in_flight) >= self.max_in_flight:
+                            break
+                        message = self._buffer.popleft()
+                        ref = f"r{next(self._refs)}"
+                        self._in_flight[ref] = message
+                    await websocket.send(encode_json({
+                        "topic": CHANNEL_TOPIC,
+                        "event": message.event,
+                        "payload": message.payload,
+                        "ref": ref
+                    }))
+        except Exception as e:
+            # The listener sees the socket close and reconnects
+            print(f"⚠️ Channel send failed: {e}")
+        finally:
+            self._release()
+
+    def handle_message(self, data: Dict[str, Any]) -> bool:
+        """Consume a frame meant for this channel; returns False for anyone else's"""
+        if data.get("topic") != CHANNEL_TOPIC:
+            return False
+        event = data.get("event")
+        if event == "phx_reply":
+            reply = data.get("payload") or {}
+            if data.get("ref") == JOIN_REF:
+                if reply.get("status") == "ok":
+                    self.joined = True
+                    print(f"📡 Joined {CHANNEL_TOPIC}: reports go over the WebSocket")
+                    if self.on_join:
+                        self.on_join()
+                else:
+                    print(f"⚠️ Could not join {CHANNEL_TOPIC}, reports stay on HTTP: {reply.get('response')}")
+            else:
+                with self._lock:
+                    message = self._in_flight.pop(data.get("ref"), None)
+                if message is not None:
+                    self._resolve(message, reply)
+            if self._wakeup is not None:
+                self._wakeup.set()
+        elif event in ("phx_error", "phx_close"):
+            # The channel process is gone: nothing in flight will be answered
+            print(f"⚠️ {CHANNEL_TOPIC} closed by the backend, reconnecting")
+            self._release()
+            if self._websocket is not None:
+                asyncio.ensure_future(self._websocket.close())
+        return True
+
+    def _resolve(self, message: _Message, reply: Dict[str, Any]):
+        response = reply.get("response") or {}
+        status_code = 200 if reply.get("status") == "ok" else int(response.get("code", 500))
+        if message.coalesce:
+            # Nobody waits on status and progress: failures are handled here
+            if status_code >= 500 and self.on_undelivered:
+                self.on_undelivered(message.path, message.payload, message.coalesce)
+            elif status_code >= 400:
+                print(f"⚠️ Backend rejected {message.event} report: {status_code} {response.get('error', '')}")
+        message.future.set_result(ChannelReply(status_code, response))
+
+    def _release(self):
+        """Hand unsent and unanswered reports to the outbox; callers waiting on them get None"""
+        with self._lock:
+            self.joined = False
+            messages = list(self._in_flight.values()) + list(self._buffer)
+            self._in_flight.clear()
+            self._buffer.clear()
+        for message in messages:
+            if self.on_undelivered:
+                self.on_undelivered(message.path, message.queue_as() if message.queue_as else message.payload,
+                                    message.coalesce)
+            if not message.future.done():
+                message.future.set_result(None)
+        if messages:
+            self.stats["released"] += len(messages)
+            print(f"📮 {len(messages)} channel report(s) moved to the outbox")
@@ -0,0 +1,109 @@
+"""
+Component Index - Incremental BM25 retrieval over project components
+"""
+
+import re
+import math
+import heapq
+import threading
+from typing import List, Tuple, Iterable
+
+# Splits camelCase, PascalCase, snake_case, kebab-case and paths into words
+TOKEN_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+STOPWORDS = {
+    "a", "an", "and", "the", "with", "for", "to", "of", "in", "on", "that", "this",
+    "create", "build", "make", "add", "implement", "generate", "new", "use",
+    "js", "jsx", "ts", "tsx", "src", "index",
+    "string", "number", "boolean", "void", "any", "null", "undefined", "react", "node",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens with trivial plural folding"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text):
+        token = token.lower()
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class ComponentIndex:
+    """Inverted index with Okapi BM25 scoring.
+
+    Documents are added, replaced and removed one at a time, so the index
+    follows incremental catalog updates without a rebuild. Scoring only
+    touches the postings of the query terms.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}      # term -> {doc_id: term frequency}
+        self.doc_lengths = {}   # doc_id -> token count
+        self.doc_terms = {}     # doc_id -> distinct terms, for removal
+        self.total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: str, fields: Iterable[str]):
+        """Index (or re-index) a document from its text fields"""
+        tokens = []
+        for field in fields:
+            tokens.extend(tokenize(field))
+
+        frequencies = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+
+        with self._lock:
+            self._remove_locked(doc_id)
+            for term, frequency in frequencies.items():
+                self.postings.setdefault(term, {})[doc_id] = frequency
+            self.doc_lengths[doc_id] = len(tokens)
+            self.doc_terms[doc_id] = tuple(frequencies)
+            self.total_length += len(tokens)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) pairs for the query, best first; ties by doc_id"""
+        query_terms = set(tokenize(query))
+        with self._lock:
+            doc_count = len(self.doc_lengths)
+            if not doc_count or not query_terms:
+                return []
+            average_length = self.total_length / doc_count or 1.0
+
+            scores = {}
+            for term in query_terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, frequency in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return heapq.nsmallest(k, ((doc_id, score) for doc_id, score in scores.items()),
+                               key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,243 @@
+"""
+Context Watcher - Keeps project context up to date in the background
+"""
+
+import os
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Set, Tuple, Optional
+
+from project_context import ProjectContext, is_component_path, is_symbol_path
+from output_manifest import MANIFEST_NAME
+
+# Directories never worth watching (dependency installs, VCS, caches)
+IGNORED_DIRS = {"node_modules", "__pycache__", "_build", "deps"}
+
+CONFIG_FILES = {"tsconfig.json", "mix.exs", "requirements.txt", "pyproject.toml"}
+
+
+def sections_for_path(rel_path: str) -> Set[str]:
+    """Context sections affected by a change to the given file"""
+    name = os.path.basename(rel_path)
+    sections = set()
+
+    if is_component_path(rel_path):
+        # coding_patterns only when a sampled file changed (see _apply_changes)
+        sections.add("existing_components")
+    if "generated_code" in Path(rel_path).parts:
+        sections.add("recent_generated_code")
+    if name == "package.json":
+        sections.update(("project_type", "technologies", "dependencies"))
+    if name in CONFIG_FILES or name.startswith(("tailwind.config", "vite.config")):
+        sections.update(("project_type", "technologies", "file_structure", "project_config"))
+    if name.endswith(".scss"):
+        sections.add("technologies")
+
+    return sections
+
+
+class ContextWatcher:
+    """Watches the project tree and incrementally refreshes a ProjectContext.
+
+    Uses inotify/FSEvents through ``watchdog`` when it is installed and falls
+    back to periodic stat polling otherwise. Change events are debounced and
+    applied on a background thread: changed component files are re-analyzed
+    one by one, and only the affected context sections are recomputed and
+    swapped in, so task processing never waits on a scan. The agents' own
+    output directory is not watched, apart from its manifest, which is all
+    the recent_generated_code section reads.
+    """
+
+    def __init__(self, project_context: ProjectContext, root: Optional[str] = None,
+                 debounce: Optional[float] = None, poll_interval: Optional[float] = None,
+                 output_dir: Optional[str] = None):
+        self.project_context = project_context
+        if root is None:
+            root = project_context.project_root if os.path.isdir(project_context.project_root) else os.getcwd()
+        self.root = os.path.abspath(root)
+        self.output_dir = os.path.abspath(output_dir or os.path.join(os.getcwd(), "generated_code"))
+        self.manifest_path = os.path.join(self.output_dir, MANIFEST_NAME)
+        self.debounce = debounce if debounce is not None else float(os.getenv("CONTEXT_WATCH_DEBOUNCE", "0.5"))
+        self.poll_interval = poll_interval if poll_interval is not None else float(os.getenv("CONTEXT_WATCH_POLL_INTERVAL", "2"))
+        self.mode = None
+
+        self._pending = set()
+        self._last_event = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = []
+        self._observer = None
+
+    def start(self):
+        """Warm the context and begin watching in the background"""
+        self._stopped.clear()
+
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+
+            watcher = self
+
+            class _Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    watcher._queue(event.src_path)
+                    dest_path = getattr(event, "dest_path", None)
+                    if dest_path:
+                        watcher._queue(dest_path)
+
+            self._observer = Observer()
+            self._observer.schedule(_Handler(), self.root, recursive=True)
+            self._observer.start()
+            self.mode = "watchdog"
+        except Exception:
+            self._observer = None
+            self.mode = "polling"
+            self._spawn(self._poll_loop, "context-poll")
+
+        self._spawn(self._apply_loop, "context-watch")
+        self.project_context.watcher_active = True
+        print(f"👀 Context watcher started ({self.mode}) on {self.root}")
+
+    def stop(self):
+        """Stop watching; the context falls back to on-demand staleness checks"""
+        self._stopped.set()
+        self._wake.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        self.project_context.watcher_active = False
+
+    def _spawn(self, target, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _is_ignored(self, rel_path: str) -> bool:
+        return any(part in IGNORED_DIRS or part.startswith('.') for part in Path(rel_path).parts)
+
+    def _queue(self, abs_path: str):
+        if abs_path.startswith(self.output_dir + os.sep) and abs_path != self.manifest_path:
+            return
+        rel_path = os.path.relpath(abs_path, self.root)
+        if rel_path.startswith('..') or self._is_ignored(rel_path):
+            return
+        with self._lock:
+            self._pending.add(rel_path)
+            self._last_event = time.monotonic()
+        self._wake.set()
+
+    def _apply_loop(self):
+        # Initial warm-up so the first task finds a built context
+        self._safe_refresh(set(), full=True)
+
+        while not self._stopped.is_set():
+            self._wake.wait()
+            self._wake.clear()
+
+            # Debounce: wait until events have been quiet for `debounce` seconds
+            while not self._stopped.is_set():
+                with self._lock:
+                    quiet_for = time.monotonic() - self._last_event
+                if quiet_for >= self.debounce:
+                    break
+                time.sleep(self.debounce - quiet_for)
+
+            with self._lock:
+                changed, self._pending = self._pending, set()
+            if changed:
+                self._safe_refresh(changed)
+
+    def _safe_refresh(self, changed: Set[str], full: bool = False):
+        try:
+            self._apply_changes(changed, full)
+        except Exception as e:
+            print(f"⚠️ Context watcher refresh failed: {e}")
+
+    def _apply_changes(self, changed: Set[str], full: bool = False):
+        context = self.project_context
+        start = time.perf_counter()
+
+        if full:
+            # Marks the context scanned and the catalog stale; the eager
+            # refresh below then rebuilds the catalog off the task path
+            context.get_project_context(refresh=True)
+            sections = {"project_type", "technologies", "existing_components",
+                        "coding_patterns", "recent_generated_code"}
+        else:
+            # Paths are stored relative to the scan root (the cwd), as glob returns them
+            scan_paths = [os.path.relpath(os.path.join(self.root, p)) for p in changed]
+            for rel_path in changed:
+                context.file_cache.invalidate(os.path.join(self.root, rel_path))
+            context.file_cache.begin_refresh()
+
+            component_paths = [p for p in scan_paths if is_symbol_path(p)]
+            for path in scan_paths:
+                if not os.path.exists(path):
+                    # A removed directory takes its component files with it
+                    prefix = path + os.sep
+                    component_paths.extend(p for p in list(context.component_catalog) + list(context.symbol_files)
+                                           if p.startswith(prefix))
+            # Coding patterns are read from a few sample files (a full glob to
+            # recompute): only an edit to one of them, or a component file
+            # appearing or disappearing, can change them
+            patterns_changed = any(
+                p in context.pattern_sample_files or (p in context.component_catalog) != os.path.isfile(p)
+                for p in component_paths if is_component_path(p)
+            )
+            if component_paths:
+                context.update_component_files(component_paths)
+
+            sections = set()
+            for rel_path in changed:
+                sections |= sections_for_path(rel_path)
+                if os.path.isdir(os.path.join(self.root, rel_path)) or not os.path.exists(os.path.join(self.root, rel_path)):
+                    sections.add("file_structure")
+            if component_paths:
+                sections.add("existing_components")
+            if patterns_changed:
+                sections.add("coding_patterns")
+
+        # Eagerly recompute what the prompt reads; drop the rest for lazy rebuild
+        eager = [s for s in sections if s != "file_structure"]
+        context.refresh_sections(*eager)
+        if "file_structure" in sections:
+            context.context_cache.invalidate("file_structure")
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"🔄 Context updated: {len(changed) or 'all'} path(s), sections {sorted(sections)} in {elapsed_ms:.1f}ms")
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Stat fingerprint of every watched file (polling mode)"""
+        snapshot = {}
+        for dir_path, dir_names, file_names in os.walk(self.root):
+            dir_names[:] = [d for d in dir_names if d not in IGNORED_DIRS and not d.startswith('.')
+                            and os.path.join(dir_path, d) != self.output_dir]
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        if self.manifest_path.startswith(self.root + os.sep):
+            try:
+                stat = os.stat(self.manifest_path)
+                snapshot[self.manifest_path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+        return snapshot
+
+    def _poll_loop(self):
+        previous = self._snapshot()
+        while not self._stopped.wait(self.poll_interval):
+            current = self._snapshot()
+            for path in previous.keys() | current.keys():
+                if previous.get(path) != current.get(path):
+                    self._queue(path)
+            previous = current
@@ -0,0 +1,173 @@
+"""
+File Content Cache - Shared read-through cache for project file contents
+"""
+
+import os
+import json
+import mmap
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+# Marker for "JSON not parsed yet" (None is a valid parsed value)
+_UNPARSED = object()
+
+
+class _CacheEntry:
+    __slots__ = ("fingerprint", "text", "json_value", "cost", "generation")
+
+    def __init__(self, fingerprint: Tuple[int, int], text: Optional[str], cost: int, generation: int):
+        self.fingerprint = fingerprint
+        self.text = text
+        self.json_value = _UNPARSED
+        self.cost = cost
+        self.generation = generation
+
+
+class FileContentCache:
+    """Byte-budgeted LRU cache of decoded text and parsed JSON.
+
+    Entries are keyed by absolute path (plus the prefix size for sampled
+    reads, see ``read_head``) and validated against a
+    ``(mtime_ns, size)`` stat fingerprint. Within one refresh generation
+    (see ``begin_refresh``) an entry that has already been validated is
+    trusted without another stat, so every file is stat'ed, read and
+    decoded at most once per context rebuild. Returned JSON objects are
+    shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._head_limits = set()
+        self._lock = threading.Lock()
+
+    def begin_refresh(self):
+        """Start a new refresh: entries must be re-validated against disk once"""
+        with self._lock:
+            self.generation += 1
+
+    def read_text(self, path: str) -> Optional[str]:
+        """Return the file's UTF-8 text, or None if it can't be read"""
+        entry = self._get_entry(path)
+        return entry.text if entry else None
+
+    def read_head(self, path: str, limit: int, max_size: Optional[int] = None) -> Optional[str]:
+        """Return at most ``limit`` bytes from the start of the file as text.
+
+        Larger files are sampled through ``mmap`` so only the prefix is ever
+        paged in. Files bigger than ``max_size`` are skipped (None) without
+        being opened.
+        """
+        entry = self._get_entry(path, limit, max_size)
+        return entry.text if entry else None
+
+    def read_json(self, path: str) -> Optional[Any]:
+        """Return the file's parsed JSON, or None if missing or invalid"""
+        entry = self._get_entry(path)
+        if not entry or entry.text is None:
+            return None
+
+        if entry.json_value is _UNPARSED:
+            try:
+                entry.json_value = json.loads(entry.text)
+            except ValueError:
+                entry.json_value = None
+        return entry.json_value
+
+    def invalidate(self, path: Optional[str] = None):
+        """Drop one path, or everything when no path is given"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.total_bytes = 0
+                return
+            path = os.path.abspath(path)
+            for limit in (None, *self._head_limits):
+                entry = self._entries.pop((path, limit), None)
+                if entry:
+                    self.total_bytes -= entry.cost
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def _get_entry(self, path: str, limit: Optional[int] = None,
+                   max_size: Optional[int] = None) -> Optional[_CacheEntry]:
+        path = os.path.abspath(path)
+        key = (path, limit)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.generation == self.generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+        if max_size is not None and stat.st_size > max_size:
+            return None
+        fingerprint = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.fingerprint == fingerprint:
+                entry.generation = self.generation
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        self.misses += 1
+        if limit is not None and stat.st_size > limit:
+            text = self._read_prefix(path, limit)
+            cost = limit
+        else:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except (OSError, UnicodeDecodeError):
+                text = None
+            cost = stat.st_size
+
+        entry = _CacheEntry(fingerprint, text, cost, self.generation)
+        if cost > self.max_bytes:
+            # Too large to keep resident; serve it uncached
+            return entry
+
+        with self._lock:
+            if limit is not None:
+                self._head_limits.add(limit)
+            previous = self._entries.pop(key, None)
+            if previous:
+                self.total_bytes -= previous.cost
+            self._entries[key] = entry
+            self.total_bytes += entry.cost
+            while self.total_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.cost
+
+        return entry
+
+    @staticmethod
+    def _read_prefix(path: str, limit: int) -> Optional[str]:
+        try:
+            with open(path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    data = mapped[:limit]
+        except (OSError, ValueError):
+            return None
+        # The cut may split a multi-byte character; drop the partial tail
+        return data.decode('utf-8', errors='ignore')
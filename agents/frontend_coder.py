@@ -6,6 +6,69 @@ import os
 import time
 from typing import Dict, Any, List
 from base_ai_agent import BaseAIAgent
+from task_profiler import TaskProfiler, profiling_requested
+from response_parser import parse_response
+from keyword_matcher import KeywordMatcher
+from output_manifest import shard_for
+from task_output import TaskOutputWriter
+from blob_store import content_hash
+from unified_diff import PatchConflict, parse_unified_diff, apply_patches, make_patch
+from task_checkpoint import TaskCheckpoint
+
+
+# Component names for task descriptions, in priority order
+COMPONENT_NAME_MATCHER = KeywordMatcher([
+    ('accordion', 'Accordion'),
+    ('modal', 'Modal'),
+    ('button', 'Button'),
+    ('card', 'Card'),
+    ('form', 'Form'),
+    ('input', 'Input'),
+    ('dropdown', 'Dropdown'),
+    ('navigation', 'Navigation'),
+    ('nav', 'Navigation'),
+    ('navbar', 'Navigation'),
+    ('header', 'Header'),
+    ('footer', 'Footer'),
+    ('sidebar', 'Sidebar'),
+    ('menu', 'Menu'),
+    ('table', 'Table'),
+    ('list', 'List'),
+    ('grid', 'Grid'),
+    ('carousel', 'Carousel'),
+    ('slider', 'Slider'),
+    ('tab', 'Tab'),
+    ('tooltip', 'Tooltip'),
+    ('alert', 'Alert'),
+    ('badge', 'Badge'),
+    ('avatar', 'Avatar'),
+    ('spinner', 'Spinner'),
+    ('loader', 'Loader'),
+    ('progress', 'ProgressBar'),
+    ('checkbox', 'Checkbox'),
+    ('radio', 'RadioButton'),
+    ('toggle', 'Toggle'),
+    ('switch', 'Switch'),
+], plurals=True)
+
+# Kind of an unnamed code block, in priority order
+CODE_TYPE_MATCHER = KeywordMatcher([
+    ('react', 'Component'), ('jsx', 'Component'), ('usestate', 'Component'),
+    ('css', 'Styles'), ('@apply', 'Styles'), ('background', 'Styles'),
+    ('test', 'Test'), ('describe', 'Test'), ('it(', 'Test'),
+    ('interface', 'Types'), ('type', 'Types'),
+])
+
+# Signals used to pick a file extension for an unnamed code block
+EXTENSION_MATCHER = KeywordMatcher([
+    ('interface', 'interface'),
+    ('react', 'react'), ('jsx', 'react'),
+    ('usestate', 'hooks'),
+    ('typescript', 'typescript'), (': string', 'typescript'), (': number', 'typescript'),
+    ('@apply', 'css'), ('background:', 'css'), ('color:', 'css'), ('margin:', 'css'), ('padding:', 'css'),
+    ('.scss', 'scss'), ('@mixin', 'scss'),
+    ('test', 'test'), ('describe(', 'test'),
+])
 
 
 class FrontendCoder(BaseAIAgent):
@@ -71,50 +134,98 @@ Always provide complete, working code that can be directly used in a project."""
             task_id = task.get('id', f"task_{int(time.time())}")
         else:
             raise ValueError(f"Invalid task format: expected dict or str, got {type(task)}")
+        # Follow-up edits name the task whose output they change
+        amends = task.get("amends")
         
         print(f"[{self.name}] 🚀 Starting AI-powered task: {task_description}")
         
+        # Stages finished by an earlier attempt at this task are not redone
+        checkpoint = TaskCheckpoint(self.output_dir, task_id, task_description)
+        if "completed" in checkpoint:
+            print(f"[{self.name}] ♻️ Task {task_id} already completed, returning checkpointed result")
+            return checkpoint.get("completed")
+        if checkpoint.resumed_from:
+            print(f"[{self.name}] ♻️ Resuming task {task_id} after stage: {checkpoint.resumed_from}")
+        
         # Update status and notify backend with enhanced progress tracking
         self.status = "working"
         self.current_task = task_id
+        self.current_task_description = task_description
         start_time = time.time()
         
+        # Optional CPU/memory profiling (PROFILE_TASKS=true or task["profile"])
+        profiler = TaskProfiler(task_id, enabled=profiling_requested(task))
+        profiler.start()
+        profile_dir = self.output_dir
+        
         self.update_backend_status("working", f"Processing: {task_description[:50]}...", progress=0)
         self.update_task_progress(task_id, 0, "initialization", "Setting up task processing")
         self.send_progress_update("Analyzing requirements and generating code...")
         
         try:
-            # Stage 1: Create the AI prompt for code generation (10% progress)
-            self.update_task_progress(task_id, 10, "prompt_creation", "Creating AI prompt with project context")
-            prompt = self._create_code_generation_prompt(task_description)
+            if amends:
+                return self._amend_task(task_id, task_description, amends, profiler, start_time, checkpoint)
             
-            # Stage 2: Call AI to generate code (30% progress)
-            self.update_task_progress(task_id, 30, "ai_generation", "Calling AI to generate code")
-            self.send_progress_update("Calling AI to generate code...")
-            
-            # Call AI to generate code with project context awareness
-            ai_response = self.call_ai_with_context(task_description, self.get_system_prompt())
-            
-            if ai_response.startswith("Error:") or ai_response.startswith("AI client not available"):
-                return self._handle_error(task, ai_response)
+            ai_response = checkpoint.get("ai_response")
+            if ai_response is None:
+                # Stage 1: Create the AI prompt for code generation (10% progress)
+                self.update_task_progress(task_id, 10, "prompt_creation", "Creating AI prompt with project context")
+                prompt = self._create_code_generation_prompt(task_description)
+                
+                # Stage 2: Call AI to generate code (30% progress)
+                self.update_task_progress(task_id, 30, "ai_generation", "Calling AI to generate code")
+                self.send_progress_update("Calling AI to generate code...")
+                
+                # Call AI to generate code with project context awareness
+                with profiler.stage("context_build"):
+                    context_prompt = self.project_context.create_context_prompt(task_description)
+                with profiler.stage("ai_generation"):
+                    ai_response = self.call_ai(context_prompt, self.get_system_prompt())
+                
+                if ai_response.startswith("Error:") or ai_response.startswith("AI client not available"):
+                    return self._handle_error(task, ai_response)
+                checkpoint.save("ai_response", ai_response)
             
             # Stage 3: Parse the AI response and extract code (50% progress)
             self.update_task_progress(task_id, 50, "response_parsing", "Processing AI response and extracting code")
-            self.send_progress_update("Processing AI response and extracting code...")
-            code_artifacts = self._parse_ai_response(ai_response, task_description)
+            code_artifacts = checkpoint.get("artifacts")
+            if code_artifacts is None:
+                self.send_progress_update("Processing AI response and extracting code...")
+                with profiler.stage("response_parsing"):
+                    code_artifacts = self._parse_ai_response(ai_response, task_description)
+                checkpoint.save("artifacts", code_artifacts)
             
             # Stage 4: Write generated files (70% progress)
             self.update_task_progress(task_id, 70, "file_generation", f"Writing {len(code_artifacts)} code files")
-            self.send_progress_update("Writing generated code to files...")
-            created_files = self._write_code_files(code_artifacts, task_id)
+            written = checkpoint.get("files_written")
+            if written is None:
+                self.send_progress_update("Writing generated code to files...")
+                with profiler.stage("file_generation"):
+                    created_files = self._write_code_files(code_artifacts, task_id)
+                self.record_task_outputs(task_id, created_files)
+                checkpoint.save("files_written", {path: self.file_hashes.get(path) for path in created_files})
+            else:
+                # Reports below read the content back from the blob store by hash
+                created_files = list(written)
+                self.file_hashes = dict(written)
+                self.file_contents = {}
+            if created_files:
+                profile_dir = os.path.dirname(created_files[0])
             
-            # Notify backend about each file created
-            for file_path in created_files:
-                file_type = self._determine_file_type(file_path)
-                description = self._get_file_description(file_path, code_artifacts)
-                # Extract relative path for API compatibility
-                relative_path = self._extract_relative_path(file_path)
-                self.notify_file_created(task_id, relative_path, file_type, description)
+            if "files_reported" not in checkpoint:
+                # Notify backend about all created files at once, from memory
+                self.notify_files_created(task_id, [
+                    {
+                        # Extract relative path for API compatibility
+                        "file_path": self._extract_relative_path(file_path),
+                        "file_type": self._determine_file_type(file_path),
+                        "description": self._get_file_description(file_path, code_artifacts),
+                        "content_hash": self.file_hashes.get(file_path),
+                        "content": self.file_contents.get(file_path)
+                    }
+                    for file_path in created_files
+                ])
+                checkpoint.save("files_reported")
             
             # Stage 5: Complete the task (100% progress)
             processing_time = time.time() - start_time
@@ -128,14 +239,19 @@ Always provide complete, working code that can be directly used in a project."""
                 "ai_response": ai_response[:500] + "..." if len(ai_response) > 500 else ai_response,
                 "code_artifacts": len(code_artifacts),
                 "message": f"Frontend task completed! Generated {len(created_files)} files.",
-                "processing_time": processing_time
+                "processing_time": processing_time,
+                "stage_timings_ms": profiler.stage_timings()
             }
+            if profiler.enabled:
+                completion_result["profile"] = profiler.summary()
             
             self.report_task_completion(task_id, completion_result, created_files)
+            checkpoint.save("completed", completion_result)
             
             # Update local status
             self.status = "idle"
             self.current_task = None
+            self.current_task_description = None
             self.update_backend_status("idle", "Task completed successfully!", progress=100)
             self.send_progress_update(f"✅ Generated {len(created_files)} files successfully!")
             
@@ -146,14 +262,20 @@ Always provide complete, working code that can be directly used in a project."""
             print(f"[{self.name}] ❌ {error_msg}")
             
             # Report detailed error to backend
-            self.report_task_error(task_id, error_msg, "processing_error", {
+            error_details = {
                 "stage": "task_execution",
                 "task_description": task_description,
                 "processing_time": time.time() - start_time if 'start_time' in locals() else 0
-            })
+            }
+            if isinstance(e, PatchConflict):
+                error_details["conflict_path"] = e.path
+            self.report_task_error(task_id, error_msg,
+                                   "patch_conflict" if isinstance(e, PatchConflict) else "processing_error",
+                                   error_details)
             
             self.status = "idle"
             self.current_task = None
+            self.current_task_description = None
             self.update_backend_status("idle", f"Task failed: {error_msg}")
             
             return {
@@ -163,6 +285,161 @@ Always provide complete, working code that can be directly used in a project."""
                 "error": error_msg,
                 "message": f"Frontend task failed: {error_msg}"
             }
+        
+        finally:
+            profiler.finish(profile_dir)
+    
+    def _amend_task(self, task_id: str, task_description: str, amends: str,
+                    profiler: TaskProfiler, start_time: float, checkpoint: TaskCheckpoint) -> Dict[str, Any]:
+        """Apply a change request to an earlier task's output as unified diffs.
+        
+        The model sees only the previous files and the requested change and
+        answers with diffs, which are applied locally (a hunk that doesn't match
+        raises PatchConflict). The amended task gets a complete folder, but only
+        changed files are reported, as patches against content the backend has.
+        """
+        # Stage 1: Load the files being amended (10% progress)
+        self.update_task_progress(task_id, 10, "prompt_creation", f"Loading output of task {amends}")
+        with profiler.stage("context_build"):
+            directory, previous = self.load_task_outputs(amends)
+        if not previous:
+            raise ValueError(f"No recorded output for task {amends} to amend")
+        prefix = directory + "/"
+        base_files = {path[len(prefix):] if path.startswith(prefix) else path: content
+                      for path, content in previous.items()}
+        
+        # Stage 2: Ask the AI for diffs only (30% progress)
+        ai_response = checkpoint.get("ai_response")
+        if ai_response is None:
+            self.update_task_progress(task_id, 30, "ai_generation", "Calling AI for diffs against the previous files")
+            self.send_progress_update("Calling AI to amend the previous code...")
+            with profiler.stage("ai_generation"):
+                ai_response = self.call_ai(self._create_amend_prompt(task_description, base_files),
+                                           self.get_system_prompt())
+            
+            if ai_response.startswith("Error:") or ai_response.startswith("AI client not available"):
+                return self._handle_error({"id": task_id}, ai_response)
+            checkpoint.save("ai_response", ai_response)
+        
+        # Stage 3: Apply the diffs, all or nothing (50% progress); redone on a
+        # resume, since it is local and rebuilds the contents reported below
+        self.update_task_progress(task_id, 50, "response_parsing", "Applying AI diffs to the previous files")
+        with profiler.stage("response_parsing"):
+            patches = parse_unified_diff(ai_response)
+            if not patches:
+                raise ValueError("AI response contained no unified diffs")
+            changes = apply_patches(base_files, patches)
+        changed = [path for path, content in changes.items() if content is not None]
+        deleted = [path for path, content in changes.items() if content is None]
+        amended = {path: content for path, content in base_files.items() if path not in changes}
+        amended.update((path, changes[path]) for path in changed)
+        
+        # Stage 4: Write the amended folder; unchanged files are blob-store links (70% progress)
+        self.update_task_progress(task_id, 70, "file_generation", f"Writing {len(changed)} changed files")
+        saved = checkpoint.get("files_written")
+        if saved is None:
+            with profiler.stage("file_generation"):
+                written = self._write_amended_files(amended, directory, task_id)
+            self.record_task_outputs(task_id, list(written.values()))
+            # Keyed by path within the task folder, unlike a generated task's
+            checkpoint.save("files_written", {path: [file_path, self.file_hashes.get(file_path)]
+                                              for path, file_path in written.items()})
+        else:
+            written = {path: file_path for path, (file_path, _) in saved.items()}
+            self.file_hashes = {file_path: file_hash for file_path, file_hash in saved.values()}
+        
+        if "files_reported" not in checkpoint:
+            self.notify_files_created(task_id, [
+                {
+                    "file_path": self._extract_relative_path(written[path]),
+                    "file_type": self._determine_file_type(path),
+                    "description": f"Amended: {os.path.basename(path)}" if path in base_files
+                                   else f"Added by amendment: {os.path.basename(path)}",
+                    "content_hash": self.file_hashes.get(written[path]),
+                    "content": amended[path],
+                    "patch": make_patch(base_files[path], amended[path], path) if path in base_files else None,
+                    "base_hash": content_hash(base_files[path].encode('utf-8')) if path in base_files else None
+                }
+                for path in changed
+            ])
+            checkpoint.save("files_reported")
+
+        # Stage 5: Complete the task (100% progress)
+        processing_time = time.time() - start_time
+        self.update_task_progress(task_id, 100, "completion", "Task amended successfully")
+        changed_files = [written[path] for path in changed]
+        completion_result = {
+            "agent": self.name,
+            "task_id": task_id,
+            "status": "completed",
+            "amends": amends,
+            "ai_response": ai_response[:500] + "..." if len(ai_response) > 500 else ai_response,
+            "files_changed": len(changed),
+            "files_deleted": deleted,
+            "message": f"Frontend task amended! Changed {len(changed)} of {len(base_files)} files.",
+            "processing_time": processing_time,
+            "stage_timings_ms": profiler.stage_timings()
+        }
+        if profiler.enabled:
+            completion_result["profile"] = profiler.summary()
+        
+        self.report_task_completion(task_id, completion_result, changed_files)
+        checkpoint.save("completed", completion_result)
+        
+        self.status = "idle"
+        self.current_task = None
+        self.current_task_description = None
+        self.update_backend_status("idle", "Task amended successfully!", progress=100)
+        self.send_progress_update(f"✅ Amended {len(changed)} files successfully!")
+        
+        return completion_result
+    
+    def _create_amend_prompt(self, task_description: str, files: Dict[str, str]) -> str:
+        """Prompt asking for unified diffs against the current files"""
+        listings = "\n\n".join(
+            f"### {path}\n```\n{content}\n```"
+            for path, content in sorted(files.items())
+            if os.path.basename(path) != "README.md"
+        )
+        return f"""
+Change request: {task_description}
+
+The code below was generated for an earlier task. Apply the change request to it.
+
+Respond ONLY with unified diffs in ```diff blocks:
+- Use "--- a/<path>" and "+++ b/<path>" headers with the paths exactly as listed
+- Use "--- /dev/null" for a new file and "+++ /dev/null" to delete a file
+- Include 3 lines of unchanged context around every change
+- Leave files that don't change out entirely; never repeat a whole file
+
+## Current Files
+
+{listings}
+"""
+    
+    def _write_amended_files(self, files: Dict[str, str], directory: str, task_id: str) -> Dict[str, str]:
+        """Publish an amended copy of a task folder; returns task-relative path -> written path"""
+        self.file_hashes = {}
+        self.file_contents = {}
+        folder = directory.rsplit('/', 1)[-1]
+        writer = TaskOutputWriter(self.output_dir, self.blob_store, task_id, self.output_io_workers)
+        try:
+            for path, content in files.items():
+                writer.add(f"{folder}/{path}", content)
+            published = writer.commit(shard_for())
+        except Exception:
+            writer.abort()
+            raise
+        
+        written = {}
+        for path, content in files.items():
+            filepath = published[f"{folder}/{path}"]
+            self.file_hashes[filepath] = writer.hashes[f"{folder}/{path}"]
+            self.file_contents[filepath] = content
+            written[path] = filepath
+            if f"{folder}/{path}" not in writer.deduplicated:
+                print(f"[{self.name}] ✅ Amended file: {filepath}")
+        return written
     
     def _determine_file_type(self, file_path: str) -> str:
         """Determine file type based on extension"""
@@ -259,48 +536,12 @@ Always provide complete, working code that can be directly used in a project."""
         """Extract meaningful name from task description"""
         import re
         
-        # Convert task description to a suitable filename
-        task_lower = task_description.lower()
-        
-        # Look for specific component types mentioned
-        component_types = {
-            'accordion': 'Accordion',
-            'modal': 'Modal', 
-            'button': 'Button',
-            'card': 'Card',
-            'form': 'Form',
-            'input': 'Input',
-            'dropdown': 'Dropdown',
-            'navigation': 'Navigation',
-            'nav': 'Navigation',
-            'header': 'Header',
-            'footer': 'Footer',
-            'sidebar': 'Sidebar',
-            'menu': 'Menu',
-            'table': 'Table',
-            'list': 'List',
-            'grid': 'Grid',
-            'carousel': 'Carousel',
-            'slider': 'Slider',
-            'tab': 'Tab',
-            'tooltip': 'Tooltip',
-            'alert': 'Alert',
-            'badge': 'Badge',
-            'avatar': 'Avatar',
-            'spinner': 'Spinner',
-            'loader': 'Loader',
-            'progress': 'ProgressBar',
-            'checkbox': 'Checkbox',
-            'radio': 'RadioButton',
-            'toggle': 'Toggle',
-            'switch': 'Switch'
-        }
-        
-        for keyword, component_name in component_types.items():
-            if keyword in task_lower:
-                if index > 0:
-                    return f"{component_name}_{index + 1}"
-                return component_name
+        # Look for specific component types mentioned (whole words, in priority order)
+        component_name = COMPONENT_NAME_MATCHER.first(task_description)
+        if component_name:
+            if index > 0:
+                return f"{component_name}_{index + 1}"
+            return component_name
         
         # Extract first meaningful word and capitalize it
         words = re.findall(r'\b[a-zA-Z]+\b', task_description)
@@ -313,34 +554,23 @@ Always provide complete, working code that can be directly used in a project."""
     
     def _detect_code_type(self, code_content: str) -> str:
         """Detect the type of code to generate appropriate filename"""
-        content_lower = code_content.lower()
-        
-        if 'react' in content_lower or 'jsx' in content_lower or 'usestate' in content_lower:
-            return 'Component'
-        elif 'css' in content_lower or '@apply' in content_lower or 'background' in content_lower:
-            return 'Styles'
-        elif 'test' in content_lower or 'describe' in content_lower or 'it(' in content_lower:
-            return 'Test'
-        elif 'interface' in content_lower or 'type' in content_lower:
-            return 'Types'
-        else:
-            return 'Module'
+        return CODE_TYPE_MATCHER.first(code_content) or 'Module'
     
     def _determine_file_extension(self, code_content: str) -> str:
         """Determine appropriate file extension based on code content"""
-        content_lower = code_content.lower()
+        found = EXTENSION_MATCHER.labels(code_content)
         
-        if 'interface' in content_lower and ('react' in content_lower or 'jsx' in content_lower):
+        if 'interface' in found and 'react' in found:
             return '.tsx'
-        elif 'react' in content_lower or 'jsx' in content_lower or 'usestate' in content_lower:
+        elif 'react' in found or 'hooks' in found:
             return '.jsx'
-        elif 'typescript' in content_lower or ': string' in content_lower or ': number' in content_lower:
+        elif 'typescript' in found:
             return '.ts'
-        elif any(css_indicator in content_lower for css_indicator in ['@apply', 'background:', 'color:', 'margin:', 'padding:']):
+        elif 'css' in found:
             return '.css'
-        elif '.scss' in content_lower or '@mixin' in content_lower:
+        elif 'scss' in found:
             return '.scss'
-        elif 'test' in content_lower or 'describe(' in content_lower:
+        elif 'test' in found:
             return '.test.js'
         else:
             return '.jsx'  # Default for React components
@@ -447,59 +677,15 @@ Please structure your response as follows:
                 "notes": ""
             }
         
-            # Simple parsing - look for code blocks
-            lines = ai_response.split('\n')
-            current_section = None
-            current_filename = None
-            current_code = []
-        
-            for line in lines:
-                if line.startswith('## Analysis'):
-                    current_section = 'analysis'
-                elif line.startswith('## Implementation Plan'):
-                    current_section = 'implementation_plan'
-                elif line.startswith('## Code'):
-                    current_section = 'code'
-                elif line.startswith('## Usage Instructions'):
-                    current_section = 'usage_instructions'
-                elif line.startswith('## Notes'):
-                    current_section = 'notes'
-                elif line.startswith('### ') and current_section == 'code':
-                    # Save previous file if exists
-                    if current_filename and current_code:
-                        artifacts["code_files"][current_filename] = '\n'.join(current_code)
-                    
-                    # Start new file
-                    current_filename = line.replace('### ', '').strip()
-                    current_code = []
-                elif line.startswith('```') and current_section == 'code':
-                    if current_code and line.strip() != '```':
-                        # End of code block
-                        if current_filename:
-                            artifacts["code_files"][current_filename] = '\n'.join(current_code)
-                            current_filename = None
-                            current_code = []
-                    # Skip the ``` lines
-                    continue
-                elif current_section == 'code' and current_filename:
-                    current_code.append(line)
-                elif current_section and current_section != 'code':
-                    if current_section not in artifacts:
-                        artifacts[current_section] = ""
-                    artifacts[current_section] += line + '\n'
-            
-            # Save last file if exists
-            if current_filename and current_code:
-                artifacts["code_files"][current_filename] = '\n'.join(current_code)
+            # Single pass over the response: sections, "### file" blocks and bare fences
+            parser = parse_response(ai_response)
+            artifacts.update(parser.artifacts)
             
-            # If no code files found, try to extract any code blocks
+            # If no named code files were found, fall back to bare code blocks
             if not artifacts["code_files"]:
-                import re
-                code_blocks = re.findall(r'```(?:jsx?|tsx?|css|javascript|typescript)?\n(.*?)\n```', ai_response, re.DOTALL)
-                if code_blocks:
-                    for i, code in enumerate(code_blocks):
-                        filename = self._generate_smart_filename(code.strip(), task_description, i)
-                        artifacts["code_files"][filename] = code.strip()
+                for i, code in enumerate(parser.fallback_blocks):
+                    filename = self._generate_smart_filename(code.strip(), task_description, i)
+                    artifacts["code_files"][filename] = code.strip()
             
             return artifacts
             
@@ -517,6 +703,8 @@ Please structure your response as follows:
     def _write_code_files(self, artifacts: Dict[str, Any], task_id: str) -> List[str]:
         """Write generated code files to disk with organized structure"""
         created_files = []
+        self.file_hashes = {}  # content hashes of this task's files, by path
+        self.file_contents = {}  # and their text, so reporting never re-reads them
         
         # Defensive programming: handle case where artifacts is not a dict
         if not isinstance(artifacts, dict):
@@ -533,24 +721,29 @@ Please structure your response as follows:
         # Organize files by type and create appropriate folder structure
         organized_files = self._organize_files_by_type(artifacts.get("code_files", {}), task_id)
         
-        for organized_path, content in organized_files.items():
-            if content.strip():  # Only write non-empty files
-                # Split the organized path to separate folder and filename
-                path_parts = organized_path.split('/')
-                if len(path_parts) > 1:
-                    subfolder = '/'.join(path_parts[:-1])
-                    filename = path_parts[-1]
-                else:
-                    subfolder = f"task_{task_id}"
-                    filename = organized_path
-                
-                filepath = self.write_file(filename, content, subfolder)
-                if not filepath.startswith("Error:"):
-                    created_files.append(filepath)
+        # Stage privately, then publish under today's shard in one atomic step
+        writer = TaskOutputWriter(self.output_dir, self.blob_store, task_id, self.output_io_workers)
+        subfolder = f"task_{task_id}"
+        staged = []
         
-        # Also write a summary file
-        if artifacts.get("analysis") or artifacts.get("usage_instructions"):
-            summary_content = f"""# Task Summary
+        try:
+            for organized_path, content in organized_files.items():
+                if content.strip():  # Only write non-empty files
+                    # Split the organized path to separate folder and filename
+                    path_parts = organized_path.split('/')
+                    if len(path_parts) > 1:
+                        subfolder = '/'.join(path_parts[:-1])
+                        filename = path_parts[-1]
+                    else:
+                        subfolder = f"task_{task_id}"
+                        filename = organized_path
+                    
+                    staged.append((f"{subfolder}/{filename}", content))
+                    writer.add(*staged[-1])
+            
+            # Also write a summary file
+            if artifacts.get("analysis") or artifacts.get("usage_instructions"):
+                summary_content = f"""# Task Summary
 
 ## Task Description
 {artifacts.get('task_description', 'N/A')}
@@ -570,9 +763,22 @@ Please structure your response as follows:
 ## Notes
 {artifacts.get('notes', 'N/A')}
 """
-            summary_path = self.write_file("README.md", summary_content, subfolder)
-            if not summary_path.startswith("Error:"):
-                created_files.append(summary_path)
+                staged.append((f"{subfolder}/README.md", summary_content))
+                writer.add(*staged[-1])
+            
+            # Output is sharded by day so no single directory grows without bound
+            published = writer.commit(shard_for())
+        except Exception:
+            writer.abort()
+            raise
+        
+        for rel_path, content in staged:
+            filepath = published[rel_path]
+            self.file_hashes[filepath] = writer.hashes[rel_path]
+            self.file_contents[filepath] = content
+            created_files.append(filepath)
+            dedup = " (deduplicated)" if rel_path in writer.deduplicated else ""
+            print(f"[{self.name}] ✅ Created file: {filepath}{dedup}")
         
         return created_files
     
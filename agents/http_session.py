@@ -0,0 +1,42 @@
+"""
+HTTP Session - Keep-alive connections to the backend, created on first use
+"""
+
+import os
+import threading
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+
+
+def backend_session():
+    """The process's requests.Session for backend calls.
+
+    ``requests`` is imported on first use rather than at startup, and the
+    pooled connections are reused by every report, claim and backfill
+    instead of a new connection per request. A forked worker builds its own
+    rather than sharing its parent's sockets.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _lock:
+            if _session is None or _session_pid != os.getpid():
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_maxsize=int(os.getenv("BACKEND_POOL_SIZE", "16")))
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session, _session_pid = session, os.getpid()
+    return _session
+
+
+def prime_backend(backend_url: str, timeout: float = 2.0) -> bool:
+    """Open a pooled connection to the backend ahead of the first report; False if unreachable"""
+    import requests
+    try:
+        backend_session().head(f"{backend_url}/", timeout=timeout)
+        return True
+    except requests.RequestException:
+        return False
@@ -0,0 +1,59 @@
+"""
+Keyword Matcher - Compiled whole-word keyword classification
+"""
+
+import re
+from typing import Iterable, Optional, Set, Tuple
+
+# Word boundaries that also split camelCase/PascalCase ("mainNav", "NavBar")
+# but never the inside of a word ("canvas", "table"). Scoped to stay case
+# sensitive inside the case-insensitive pattern.
+_START_BOUNDARY = r'(?:(?<![A-Za-z0-9_])|(?-i:(?<=[a-z0-9])(?=[A-Z])))'
+_END_BOUNDARY = r'(?:(?![A-Za-z0-9_])|(?-i:(?<=[a-z0-9])(?=[A-Z])))'
+
+
+class KeywordMatcher:
+    """Classifies text against an ordered (keyword, label) table in one pass.
+
+    All keywords are compiled into a single case-insensitive alternation,
+    longest first, so the text is scanned once without lowercased copies.
+    Keywords that start or end with a letter or digit only match at word
+    boundaries (camelCase humps count), and a trailing "s"/"es" plural is
+    accepted when ``plurals`` is set. Earlier rules take priority.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, str]], plurals: bool = False):
+        self.rules = list(rules)
+        self._priority = {}
+        for position, (keyword, label) in enumerate(self.rules):
+            self._priority.setdefault(keyword.lower(), (position, label))
+
+        # Longest first so "navigation" wins over "nav"; group N is keyword N-1
+        self._group_keywords = sorted(self._priority, key=len, reverse=True)
+        alternatives = []
+        for keyword in self._group_keywords:
+            pattern = re.escape(keyword)
+            if keyword[0].isalnum():
+                pattern = _START_BOUNDARY + pattern
+            if keyword[-1].isalnum():
+                pattern += (r'(?:e?s)?' if plurals and keyword[-1].isalpha() else '') + _END_BOUNDARY
+            alternatives.append(pattern)
+        self.pattern = re.compile('|'.join(f'({alternative})' for alternative in alternatives), re.IGNORECASE)
+
+    def _keyword(self, match) -> str:
+        return self._group_keywords[match.lastindex - 1]
+
+    def first(self, text: str) -> Optional[str]:
+        """Label of the highest-priority keyword present anywhere in the text"""
+        best = None
+        for match in self.pattern.finditer(text):
+            position, label = self._priority[self._keyword(match)]
+            if best is None or position < best[0]:
+                best = (position, label)
+                if position == 0:
+                    break
+        return best[1] if best else None
+
+    def labels(self, text: str) -> Set[str]:
+        """Labels of every keyword present in the text"""
+        return {self._priority[self._keyword(match)][1] for match in self.pattern.finditer(text)}
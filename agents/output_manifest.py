@@ -0,0 +1,233 @@
+"""
+Output Manifest - Append-only index, sharded layout and archival for generated code
+"""
+
+import os
+import json
+import time
+import shutil
+import tarfile
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional
+
+MANIFEST_NAME = "manifest.jsonl"
+ARCHIVE_DIR = "archive"
+ARCHIVE_INDEX_NAME = "index.jsonl"
+
+# Block size for reading the manifest backwards from its end
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def shard_for(timestamp: Optional[float] = None) -> str:
+    """Shard directory for task output written at the given time (one per UTC day)"""
+    return time.strftime("%Y%m%d", time.gmtime(timestamp if timestamp is not None else time.time()))
+
+
+def is_shard(name: str) -> bool:
+    return len(name) == 8 and name.isdigit()
+
+
+def task_directory(paths) -> str:
+    """A task's output directory ("<shard>/<folder>") from its root-relative file paths"""
+    first = next(iter(paths)).split('/')
+    return '/'.join(first[:2]) if len(first) > 2 else first[0]
+
+
+def file_digest(path: str) -> Optional[str]:
+    """sha256 of a file's bytes, or None if it can't be read"""
+    try:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+class OutputManifest:
+    """Append-only JSONL index of task outputs under the generated_code root.
+
+    Each task appends one record (task id, output directory, file paths
+    relative to the root with their sha256, timestamp); archiving appends an
+    ``archived`` record instead of rewriting history. ``recent(n)`` reads the
+    file backwards from its end, so it costs O(n) no matter how many tasks
+    have ever run.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.path = os.path.join(root, MANIFEST_NAME)
+        self._lock = threading.Lock()
+
+    def record(self, task_id: str, directory: str, files: Dict[str, Optional[str]],
+               metadata: Optional[Dict[str, Any]] = None):
+        """Append a task's outputs: ``files`` maps root-relative paths to content hashes"""
+        self._append({
+            "task_id": task_id,
+            "directory": directory,
+            "files": files,
+            "created_at": time.time(),
+            "metadata": metadata or {}
+        })
+
+    def _append(self, entry: Dict[str, Any]):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            # One O_APPEND write per record keeps lines whole across processes
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def recent(self, n: int) -> List[Dict[str, Any]]:
+        """The last ``n`` tasks still on disk, newest first"""
+        results = []
+        archived = set()
+        seen = set()
+        for entry in self._reverse_entries():
+            task_id = entry.get("task_id")
+            if "archived" in entry:
+                archived.add(task_id)
+                continue
+            if task_id in archived or task_id in seen:
+                continue
+            seen.add(task_id)
+            results.append(entry)
+            if len(results) >= n:
+                break
+        return results
+
+    def latest(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """A task's newest record (its ``archived`` marker if it has been archived since)"""
+        for entry in self._reverse_entries():
+            if entry.get("task_id") == task_id:
+                return entry
+        return None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Every record, oldest first (archival and maintenance only)"""
+        entries = []
+        if not self.exists():
+            return entries
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = self._parse(line)
+                if entry:
+                    entries.append(entry)
+        return entries
+
+    def _reverse_entries(self):
+        if not self.exists():
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b''
+            while position > 0:
+                size = min(TAIL_BLOCK_SIZE, position)
+                position -= size
+                f.seek(position)
+                lines = (f.read(size) + remainder).split(b'\n')
+                # The first piece may be the tail of an earlier line
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    entry = self._parse(line)
+                    if entry:
+                        yield entry
+            entry = self._parse(remainder)
+            if entry:
+                yield entry
+
+    @staticmethod
+    def _parse(line) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            # A partially written line from a crashed writer
+            return None
+
+
+def archive_outputs(root: str, older_than_days: float = 7.0) -> List[str]:
+    """Pack shards older than the cutoff into compressed bundles; returns the bundle paths.
+
+    Each ``<shard>/`` directory becomes ``archive/<shard>.tar.gz``, the bundle
+    index gains one line per archived task, and the manifest gains an
+    ``archived`` record per task before the shard directory is removed.
+    """
+    manifest = OutputManifest(root)
+    cutoff = shard_for(time.time() - older_than_days * 86400)
+    shards = sorted(name for name in os.listdir(root)
+                    if is_shard(name) and name < cutoff and os.path.isdir(os.path.join(root, name))) \
+        if os.path.isdir(root) else []
+    if not shards:
+        return []
+
+    tasks_by_shard = {}
+    for entry in manifest.entries():
+        if "archived" in entry:
+            continue
+        shard = entry.get("directory", "").split('/', 1)[0]
+        tasks_by_shard.setdefault(shard, []).append(entry)
+
+    archive_dir = os.path.join(root, ARCHIVE_DIR)
+    os.makedirs(archive_dir, exist_ok=True)
+    bundles = []
+
+    for shard in shards:
+        bundle = os.path.join(archive_dir, f"{shard}.tar.gz")
+        temp_bundle = bundle + ".tmp"
+        with tarfile.open(temp_bundle, "w:gz") as tar:
+            tar.add(os.path.join(root, shard), arcname=shard)
+        os.replace(temp_bundle, bundle)
+
+        bundle_name = os.path.relpath(bundle, root)
+        index_lines = [json.dumps({"task_id": entry["task_id"], "bundle": bundle_name,
+                                   "files": entry.get("files", {})}) + "\n"
+                       for entry in tasks_by_shard.get(shard, [])]
+        with open(os.path.join(archive_dir, ARCHIVE_INDEX_NAME), 'a', encoding='utf-8') as f:
+            f.writelines(index_lines)
+        for entry in tasks_by_shard.get(shard, []):
+            manifest._append({"task_id": entry["task_id"], "archived": bundle_name, "created_at": time.time()})
+
+        shutil.rmtree(os.path.join(root, shard))
+        bundles.append(bundle)
+        print(f"📦 Archived {shard}: {len(index_lines)} task(s) -> {bundle_name}")
+
+    return bundles
+
+
+def load_archived_task(root: str, task_id: str) -> Dict[str, bytes]:
+    """Read an archived task's files back out of its bundle (root-relative path -> bytes)"""
+    index_path = os.path.join(root, ARCHIVE_DIR, ARCHIVE_INDEX_NAME)
+    if not os.path.exists(index_path):
+        return {}
+
+    record = None
+    with open(index_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = OutputManifest._parse(line)
+            if entry and entry.get("task_id") == task_id:
+                record = entry
+    if not record:
+        return {}
+
+    contents = {}
+    with tarfile.open(os.path.join(root, record["bundle"]), "r:gz") as tar:
+        for path in record.get("files", {}):
+            try:
+                member = tar.extractfile(path)
+            except KeyError:
+                continue
+            if member:
+                contents[path] = member.read()
+    return contents
@@ -0,0 +1,62 @@
+"""
+Payload Encoding - Compressed, optionally streamed JSON request bodies
+"""
+
+import os
+import json
+import zlib
+from typing import Any, Dict, Iterator, Tuple, Union
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+
+def compression_setting() -> str:
+    """Configured request compression: gzip (default), zstd or none"""
+    return os.getenv("NOTIFY_COMPRESSION", "gzip").lower()
+
+
+def _zstd_compressor():
+    try:
+        import zstandard
+        return zstandard.ZstdCompressor(level=3)
+    except ImportError:
+        return None
+
+
+def encode_json_body(payload: Dict[str, Any], compression: str = "gzip",
+                     chunk_bytes: int = 1024 * 1024) -> Tuple[Dict[str, str], Union[bytes, Iterator[bytes]]]:
+    """Serialize a JSON payload into (headers, body) for ``requests``.
+
+    The body is gzip- or zstd-compressed (``Content-Encoding``). Bodies
+    larger than ``chunk_bytes`` are returned as a generator of compressed
+    chunks, which ``requests`` sends with chunked transfer encoding, so
+    very large files are compressed and put on the wire piece by piece.
+    zstd falls back to gzip when the ``zstandard`` package isn't installed.
+    """
+    raw = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = {"Content-Type": "application/json"}
+
+    if compression == "none" or len(raw) < MIN_COMPRESS_BYTES:
+        return headers, raw
+
+    zstd = _zstd_compressor() if compression == "zstd" else None
+    if zstd is not None:
+        headers["Content-Encoding"] = "zstd"
+        compressor = zstd.compressobj()
+    else:
+        headers["Content-Encoding"] = "gzip"
+        # wbits=31 writes a gzip header and trailer
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    if len(raw) <= chunk_bytes:
+        return headers, compressor.compress(raw) + compressor.flush()
+
+    def chunks() -> Iterator[bytes]:
+        for start in range(0, len(raw), chunk_bytes):
+            compressed = compressor.compress(raw[start:start + chunk_bytes])
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    return headers, chunks()
@@ -0,0 +1,183 @@
+"""
+Process Workers - Agents in separate processes so CPU-bound stages use every core
+"""
+
+import os
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Dict, Optional
+
+from channel_client import ACCEPTED, ChannelReply
+
+
+class PipeChannel:
+    """A worker process's stand-in for the orchestrator's ChannelReporter.
+
+    Reports travel over the worker's pipe to the orchestrator, which pushes
+    them on its WebSocket and pipes back the outcome. When the orchestrator
+    has no joined channel, ``push`` returns None and the agent falls back to
+    HTTP from the worker, as it would in-process.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        # Whether the orchestrator's channel was joined when the current task was sent
+        self.joined = False
+        self._lock = threading.Lock()
+
+    def push(self, path: str, payload: Dict[str, Any], coalesce: Optional[str] = None,
+             queue_as=None) -> Optional[Future]:
+        if not self.joined:
+            return None
+        # Built here: the closure can't cross the pipe, and the content is in memory
+        queued = queue_as() if queue_as and not coalesce else None
+        with self._lock:
+            self.conn.send(("report", path, payload, coalesce, queued))
+            reply = self.conn.recv()
+        outcome = reply[1]
+        if outcome == "refused":
+            return None
+        future = Future()
+        if outcome == "accepted":
+            future.set_result(ACCEPTED)
+        elif outcome == "queued":
+            future.set_result(None)
+        elif outcome == "pending":
+            future.set_exception(FutureTimeout())
+        else:
+            future.set_result(ChannelReply(reply[2], reply[3]))
+        return future
+
+
+def _worker_main(worker_id: int, conn, agent_classes: Dict[str, type], ai_provider: str,
+                 snapshot: Optional[Dict[str, Any]]):
+    """Worker process: one agent per type, tasks in and results out over ``conn``"""
+    agents = {name: agent_class(name, ai_provider) for name, agent_class in agent_classes.items()}
+    channel = PipeChannel(conn)
+    for agent in agents.values():
+        agent.channel = channel
+        # Created and connected here, before "ready", rather than on the first task
+        agent.warm_up_ai_client()
+    if snapshot and agents:
+        # The agents share one context, so it adopts the scan once
+        next(iter(agents.values())).project_context.load_snapshot(snapshot)
+    conn.send(("ready", worker_id, os.getpid()))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        agent_name, task, channel.joined = message
+        try:
+            result = agents[agent_name].process_task(task)
+        except Exception as e:
+            result = {"agent": agent_name, "task_id": task.get("id"), "status": "failed", "error": str(e)}
+        conn.send(("result", task.get("id"), result))
+
+    for agent in agents.values():
+        if agent.context_watcher:
+            agent.context_watcher.stop()
+
+
+class _Worker:
+    __slots__ = ("worker_id", "process", "conn")
+
+    def __init__(self, worker_id, process, conn):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+
+
+class ProcessWorkerPool:
+    """N worker processes, each with its own agents and AI provider client.
+
+    Workers share nothing but a read-mostly context snapshot taken once by
+    the orchestrator, so none of them rescans the project at startup. A task
+    goes to whichever worker is idle; its channel reports and then its result
+    stream back over that worker's pipe. A worker that dies fails its task
+    and is replaced.
+    """
+
+    def __init__(self, processes: int, agent_classes: Dict[str, type], ai_provider: str,
+                 snapshot: Optional[Dict[str, Any]] = None, channel=None, start_method: Optional[str] = None):
+        self.processes = processes
+        self.agent_classes = agent_classes
+        self.ai_provider = ai_provider
+        self.snapshot = snapshot
+        self.channel = channel
+        self.report_timeout = float(os.getenv("WORKER_REPORT_TIMEOUT", "30"))
+        self._context = multiprocessing.get_context(start_method or os.getenv("WORKER_START_METHOD", "spawn"))
+        self._workers = {}
+        self._idle = None
+
+    async def start(self):
+        """Start every worker and wait until each has built its agents"""
+        self._idle = asyncio.Queue()
+        await asyncio.gather(*(self._start_worker(worker_id) for worker_id in range(self.processes)))
+        print(f"🧵 {self.processes} worker processes ready")
+
+    async def _start_worker(self, worker_id: int):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, name=f"agent-worker-{worker_id}", daemon=True,
+            args=(worker_id, child_conn, self.agent_classes, self.ai_provider, self.snapshot))
+        process.start()
+        child_conn.close()
+        worker = _Worker(worker_id, process, parent_conn)
+        await asyncio.to_thread(parent_conn.recv)  # ("ready", ...)
+        self._workers[worker_id] = worker
+        self._idle.put_nowait(worker)
+
+    async def run(self, agent_name: str, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Process a task on the next idle worker and return its result"""
+        worker = await self._idle.get()
+        try:
+            worker.conn.send((agent_name, task, bool(self.channel and self.channel.joined)))
+            while True:
+                message = await asyncio.to_thread(worker.conn.recv)
+                if message[0] == "result":
+                    self._idle.put_nowait(worker)
+                    return message[2]
+                if message[0] == "report":
+                    worker.conn.send(await self._forward_report(*message[1:]))
+        except (EOFError, OSError):
+            worker.process.join(timeout=1)
+            error = f"Worker process {worker.worker_id} died (exit code {worker.process.exitcode})"
+            print(f"⚠️ {error}, restarting it")
+            await self._start_worker(worker.worker_id)
+            return {"agent": agent_name, "task_id": task.get("id"), "status": "failed", "error": error}
+
+    async def _forward_report(self, path: str, payload: Dict[str, Any], coalesce: Optional[str],
+                              queued: Optional[Dict[str, Any]]):
+        pushed = self.channel.push(path, payload, coalesce, (lambda: queued) if queued else None) \
+            if self.channel else None
+        if pushed is None:
+            return ("reply", "refused")
+        if coalesce:
+            return ("reply", "accepted")
+        # asyncio.wait, unlike wait_for, leaves the report's future uncancelled on timeout
+        waiter = asyncio.wrap_future(pushed)
+        done, _ = await asyncio.wait({waiter}, timeout=self.report_timeout)
+        if not done:
+            return ("reply", "pending")
+        reply = waiter.result()
+        if reply is None:
+            return ("reply", "queued")
+        return ("reply", "sent", reply.status_code, reply.json())
+
+    async def close(self):
+        for worker in self._workers.values():
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in self._workers.values():
+            await asyncio.to_thread(worker.process.join, 5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self._workers.clear()
@@ -3,39 +3,245 @@ Project Context Analysis - Provides context awareness for AI agents
 """
 
 import os
-import json
 import glob
+import itertools
+import threading
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Iterator
 import re
+from file_cache import FileContentCache
+from component_index import ComponentIndex
+from symbol_index import SymbolTable, extract_symbols
+from keyword_matcher import KeywordMatcher
+from output_manifest import OutputManifest
+
+
+# Context sections and the ProjectContext method that computes each one
+CONTEXT_SECTIONS = {
+    "project_type": "_detect_project_type",
+    "technologies": "_detect_technologies",
+    "file_structure": "_analyze_file_structure",
+    "existing_components": "_scan_existing_components",
+    "coding_patterns": "_analyze_coding_patterns",
+    "dependencies": "_analyze_dependencies",
+    "project_config": "_analyze_project_config",
+    "recent_generated_code": "_analyze_recent_generated_code",
+}
+
+
+# Glob patterns for component files, in the order they are listed in the prompt
+COMPONENT_PATTERNS = [
+    "**/*.jsx",
+    "**/*.tsx",
+    "**/components/**/*.js",
+    "**/src/components/**/*.js"
+]
+
+# Extra files scanned only for exported symbols (custom hooks)
+SYMBOL_PATTERNS = [
+    "**/hooks/**/*.js",
+    "**/hooks/**/*.ts",
+]
+
+
+# Export/declaration signatures, in priority order, for component names
+COMPONENT_NAME_PATTERNS = [
+    re.compile(r'export default ([A-Z]\w*)'),
+    re.compile(r'export const ([A-Z]\w*)'),
+    re.compile(r'function ([A-Z]\w*)\('),
+    re.compile(r'const ([A-Z]\w*) = '),
+]
+
+# Whole-word keyword checks for component types, in priority order
+COMPONENT_TYPE_MATCHER = KeywordMatcher([
+    ("button", "button"),
+    ("form", "form"),
+    ("input", "form"),
+    ("modal", "modal"),
+    ("card", "card"),
+    ("navigation", "navigation"),
+    ("nav", "navigation"),
+    ("navbar", "navigation"),
+], plurals=True)
+
+# Declared identifiers and destructured/interface props, indexed for retrieval
+IDENTIFIER_PATTERN = re.compile(r'(?:function|const|class|let|interface|type)\s+([A-Za-z_]\w*)')
+PROPS_PATTERN = re.compile(r'\(\s*\{([^{}()]{0,500})\}|interface\s+\w*Props\s*\{([^{}]{0,1000})\}')
+PROP_NAME_PATTERN = re.compile(r'\b([A-Za-z_]\w*)\s*\??\s*(?=[=,:;}]|$)', re.MULTILINE)
+QUOTED_PATTERN = re.compile(r"(['\"`]).*?\1")
+MAX_KEYWORDS = 64
+
+# A sample with no line break this early is treated as minified
+MINIFIED_LINE_LENGTH = 4096
+
+
+def is_component_path(file_path: str) -> bool:
+    """Whether a (relative) path would be matched by COMPONENT_PATTERNS"""
+    if file_path.endswith(('.jsx', '.tsx')):
+        return True
+    parts = Path(file_path).parts
+    return file_path.endswith('.js') and "components" in parts[:-1]
+
+
+def is_symbol_path(file_path: str) -> bool:
+    """Whether a (relative) path is scanned for exported symbols"""
+    if is_component_path(file_path):
+        return True
+    return file_path.endswith(('.js', '.ts')) and "hooks" in Path(file_path).parts[:-1]
+
+
+def component_sort_key(file_path: str):
+    """Order components like the glob patterns: .jsx, then .tsx, then .js, then by path"""
+    rank = 0 if file_path.endswith('.jsx') else 1 if file_path.endswith('.tsx') else 2
+    return rank, file_path
+
+
+class LazyContext(Mapping):
+    """Read-only mapping whose sections are computed on first access.
+
+    Each section is cached on its own and can be invalidated individually,
+    so callers only pay for the analysis they actually read.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[], Any]]):
+        self._loaders = loaders
+        self._values = {}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, section: str) -> Any:
+        try:
+            return self._values[section]
+        except KeyError:
+            pass
+
+        loader = self._loaders[section]
+        with self._lock:
+            if section not in self._values:
+                self._values[section] = loader()
+            return self._values[section]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaders)
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+    def is_loaded(self, section: str) -> bool:
+        return section in self._values
+
+    def refresh(self, section: str):
+        """Recompute a section and swap it in; readers keep the old value meanwhile"""
+        value = self._loaders[section]()
+        with self._lock:
+            self._values[section] = value
+
+    def invalidate(self, *sections: str):
+        """Drop the given sections (all of them when none are given)"""
+        with self._lock:
+            if not sections:
+                self._values.clear()
+            for section in sections:
+                self._values.pop(section, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compute every section and return a plain dict"""
+        return {section: self[section] for section in self._loaders}
+    
+    def preload(self, values: Dict[str, Any]):
+        """Install already computed sections (e.g. from another process)"""
+        with self._lock:
+            self._values.update((section, value) for section, value in values.items() if section in self._loaders)
+
 
 class ProjectContext:
     def __init__(self, project_root: str = "/app"):
         self.project_root = project_root
-        self.context_cache = {}
         self.last_scan_time = 0
-        
-    def get_project_context(self, refresh: bool = False) -> Dict[str, Any]:
-        """Get comprehensive project context for AI agents"""
+        # Shared read-through cache so each file is read and decoded once per refresh
+        self.file_cache = FileContentCache(int(os.getenv("CONTEXT_CACHE_BYTES", str(32 * 1024 * 1024))))
+        self.context_cache = LazyContext({
+            section: getattr(self, method) for section, method in CONTEXT_SECTIONS.items()
+        })
+        self._scanned = False
+        
+        # Per-file component catalog, rebuilt on a full refresh and updated in
+        # place by the background watcher (see context_watcher.py)
+        self.component_catalog = {}
+        self._catalog_stale = True
+        self._catalog_lock = threading.Lock()
+        self.watcher_active = False
+        self.component_index = ComponentIndex()
+        self.symbol_files = {}
+        self.symbol_table = SymbolTable()
+        self.import_budget = int(os.getenv("CONTEXT_IMPORT_BYTES", "1536"))
+        # Files the coding_patterns section was computed from (see context_watcher.py)
+        self.pattern_sample_files = frozenset()
+        
+        # Per-file read bounds: only a prefix is scanned, oversized files are skipped
+        self.sample_bytes = int(os.getenv("CONTEXT_SAMPLE_BYTES", str(64 * 1024)))
+        self.max_file_bytes = int(os.getenv("CONTEXT_MAX_FILE_BYTES", str(2 * 1024 * 1024)))
+        
+        # Bounded thread pool for per-file reads and regex work (1 = serial)
+        self.scan_workers = int(os.getenv("CONTEXT_SCAN_WORKERS", "8"))
+        self.scan_window = max(1, self.scan_workers * 4)
+        self._scan_executor = None
+        
+    def get_project_context(self, refresh: bool = False) -> LazyContext:
+        """Get project context for AI agents; sections are computed on first access"""
         current_time = os.path.getmtime(self.project_root) if os.path.exists(self.project_root) else 0
         
-        if not refresh and self.context_cache and current_time <= self.last_scan_time:
+        if not refresh and self._scanned and (self.watcher_active or current_time <= self.last_scan_time):
+            # A running watcher keeps sections current in the background
             return self.context_cache
         
-        context = {
-            "project_type": self._detect_project_type(),
-            "technologies": self._detect_technologies(),
-            "file_structure": self._analyze_file_structure(),
-            "existing_components": self._scan_existing_components(),
-            "coding_patterns": self._analyze_coding_patterns(),
-            "dependencies": self._analyze_dependencies(),
-            "project_config": self._analyze_project_config(),
-            "recent_generated_code": self._analyze_recent_generated_code()
-        }
-        
-        self.context_cache = context
+        self._catalog_stale = True
+        self.invalidate_sections()
+        self._scanned = True
         self.last_scan_time = current_time
-        return context
+        return self.context_cache
+    
+    def invalidate_sections(self, *sections: str):
+        """Recompute the given context sections (all when none given) on next access"""
+        self.file_cache.begin_refresh()
+        self.context_cache.invalidate(*sections)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Picklable copy of the scanned context for worker processes (see load_snapshot).
+        
+        Recently generated code changes with every task, so it is left for
+        each worker to compute.
+        """
+        context = self.get_project_context()
+        sections = {section: context[section] for section in CONTEXT_SECTIONS if section != "recent_generated_code"}
+        with self._catalog_lock:
+            return {
+                "sections": sections,
+                "component_catalog": dict(self.component_catalog),
+                "symbol_files": dict(self.symbol_files),
+                "last_scan_time": self.last_scan_time
+            }
+    
+    def load_snapshot(self, snapshot: Dict[str, Any]):
+        """Adopt another process's scan instead of scanning again; indexes are rebuilt locally"""
+        catalog = snapshot["component_catalog"]
+        index = ComponentIndex()
+        for file_path, component in catalog.items():
+            if component:
+                index.add(file_path, self._index_fields(component))
+        symbol_table = SymbolTable.build(snapshot["symbol_files"])
+        with self._catalog_lock:
+            self.component_catalog = dict(catalog)
+            self.component_index = index
+            self.symbol_files = dict(snapshot["symbol_files"])
+            self.symbol_table = symbol_table
+            self._catalog_stale = False
+        self.context_cache.invalidate()
+        self.context_cache.preload(snapshot["sections"])
+        self._scanned = True
+        self.last_scan_time = snapshot["last_scan_time"]
     
     def _detect_project_type(self) -> str:
         """Detect the type of project"""
@@ -135,30 +341,175 @@ class ProjectContext:
         
         return structure
     
-    def _scan_existing_components(self) -> List[Dict[str, str]]:
+    def _scan_existing_components(self, limit: int = 20) -> List[Dict[str, str]]:
         """Scan for existing React components"""
-        components = []
-        
-        # Search patterns for React components
-        patterns = [
-            "**/*.jsx",
-            "**/*.tsx", 
-            "**/components/**/*.js",
-            "**/src/components/**/*.js"
-        ]
+        if self._catalog_stale:
+            self._rebuild_component_catalog()
         
-        for pattern in patterns:
-            for file_path in glob.glob(pattern, recursive=True):
-                if os.path.isfile(file_path):
-                    component_name = self._extract_component_name(file_path)
-                    if component_name:
-                        components.append({
-                            "name": component_name,
-                            "path": file_path,
-                            "type": self._determine_component_type(file_path)
-                        })
+        with self._catalog_lock:
+            ordered = sorted(self.component_catalog.items(), key=lambda item: component_sort_key(item[0]))
+        components = [component for _, component in ordered if component]
         
-        return components[:20]  # Limit to prevent overwhelming context
+        return components[:limit]  # Limit to prevent overwhelming context
+    
+    def _rebuild_component_catalog(self):
+        """Full scan: analyze every component file and replace the catalog"""
+        # Sorted and de-duplicated so the prompt is byte-stable between scans
+        file_paths = []
+        seen = set()
+        for pattern in COMPONENT_PATTERNS + SYMBOL_PATTERNS:
+            for file_path in sorted(glob.glob(pattern, recursive=True)):
+                if file_path not in seen:
+                    seen.add(file_path)
+                    file_paths.append(file_path)
+        
+        catalog = {}
+        symbol_files = {}
+        for file_path, (component, symbols) in zip(file_paths, self._map_files(self._analyze_source_file, file_paths)):
+            if is_component_path(file_path):
+                catalog[file_path] = component
+            if symbols:
+                symbol_files[file_path] = symbols
+        
+        index = ComponentIndex()
+        for file_path, component in catalog.items():
+            if component:
+                index.add(file_path, self._index_fields(component))
+        symbol_table = SymbolTable.build(symbol_files)
+        
+        with self._catalog_lock:
+            self.component_catalog = catalog
+            self.component_index = index
+            self.symbol_files = symbol_files
+            self.symbol_table = symbol_table
+            self._catalog_stale = False
+    
+    def update_component_files(self, file_paths: List[str]):
+        """Incrementally re-analyze changed, created or deleted component and hook files"""
+        updates = {}
+        for file_path in file_paths:
+            if is_symbol_path(file_path) and os.path.isfile(file_path):
+                updates[file_path] = self._analyze_source_file(file_path)
+            else:
+                updates[file_path] = (None, None)
+        
+        with self._catalog_lock:
+            symbol_files = dict(self.symbol_files)
+            for file_path, (component, symbols) in updates.items():
+                if component and is_component_path(file_path):
+                    self.component_catalog[file_path] = component
+                    self.component_index.add(file_path, self._index_fields(component))
+                else:
+                    self.component_catalog.pop(file_path, None)
+                    self.component_index.remove(file_path)
+                if symbols:
+                    symbol_files[file_path] = symbols
+                else:
+                    symbol_files.pop(file_path, None)
+            
+            # Tables are immutable; readers keep whichever one they grabbed
+            symbol_table = SymbolTable.build(symbol_files)
+            added, removed = self.symbol_table.diff(symbol_table)
+            self.symbol_files = symbol_files
+            self.symbol_table = symbol_table
+        
+        if added or removed:
+            print(f"🔣 Symbols updated: +{len(added)} -{len(removed)}")
+    
+    def _index_fields(self, component: Dict[str, Any]) -> List[str]:
+        # The name is repeated so it outweighs incidental identifiers
+        return [component["name"], component["name"], component["path"], component["type"],
+                " ".join(component.get("keywords", []))]
+    
+    def relevant_components(self, task_description: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Top-k components for a task by BM25 over names, identifiers, props and paths"""
+        self.get_project_context()["existing_components"]  # ensure the catalog is built
+        
+        with self._catalog_lock:
+            catalog = self.component_catalog
+            index = self.component_index
+        return [catalog[path] for path, _ in index.search(task_description, k) if catalog.get(path)]
+    
+    def refresh_sections(self, *sections: str):
+        """Recompute sections now and swap them in, so readers never wait on a scan"""
+        for section in sections:
+            self.context_cache.refresh(section)
+    
+    def import_lines(self, task_description: str, preferred_paths: Optional[List[str]] = None) -> List[str]:
+        """Exact import statements for existing exports, within the prompt's import budget"""
+        self.get_project_context()["existing_components"]  # ensure the catalog is built
+        return self.symbol_table.import_lines(self.import_budget, task_description, preferred_paths)
+    
+    def _analyze_source_file(self, file_path: str):
+        """Component entry (component files only) and exported symbols for one file"""
+        component = self._analyze_component_file(file_path) if is_component_path(file_path) else None
+        content = self._read_file_sample(file_path) if os.path.isfile(file_path) else None
+        symbols = tuple(extract_symbols(content)) if content else ()
+        return component, symbols
+    
+    def _analyze_component_file(self, file_path: str) -> Optional[Dict[str, str]]:
+        """Extract name and type for one component file (runs on the scan pool)"""
+        if not os.path.isfile(file_path):
+            return None
+        
+        # Skip vendored bundles, minified and unreadable files entirely
+        if self._read_file_sample(file_path) is None:
+            return None
+        
+        component_name = self._extract_component_name(file_path)
+        if not component_name:
+            return None
+        
+        return {
+            "name": component_name,
+            "path": file_path,
+            "type": self._determine_component_type(file_path),
+            "keywords": self._extract_keywords(file_path)
+        }
+    
+    def _extract_keywords(self, file_path: str) -> List[str]:
+        """Declared identifiers and prop names from the file's sample, for retrieval"""
+        content = self._read_file_sample(file_path)
+        if not content:
+            return []
+        
+        keywords = dict.fromkeys(IDENTIFIER_PATTERN.findall(content))
+        for match in PROPS_PATTERN.finditer(content):
+            body = QUOTED_PATTERN.sub('', match.group(1) or match.group(2) or '')
+            keywords.update(dict.fromkeys(PROP_NAME_PATTERN.findall(body)))
+        return list(keywords)[:MAX_KEYWORDS]
+    
+    def _map_files(self, func: Callable[[str], Any], file_paths: List[str]) -> Iterator[Any]:
+        """Apply func to each path on a bounded thread pool, yielding results in input order.
+        
+        At most ``scan_window`` files are in flight, and consumers that stop
+        early (e.g. after a result limit) leave the remaining files unread.
+        """
+        if self.scan_workers <= 1 or len(file_paths) <= 1:
+            for file_path in file_paths:
+                yield func(file_path)
+            return
+        
+        if self._scan_executor is None:
+            self._scan_executor = ThreadPoolExecutor(
+                max_workers=self.scan_workers, thread_name_prefix="context-scan"
+            )
+        
+        in_flight = deque()
+        paths = iter(file_paths)
+        try:
+            for file_path in itertools.islice(paths, self.scan_window):
+                in_flight.append(self._scan_executor.submit(func, file_path))
+            
+            while in_flight:
+                result = in_flight.popleft().result()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    in_flight.append(self._scan_executor.submit(func, next_path))
+                yield result
+        finally:
+            for future in in_flight:
+                future.cancel()
     
     def _analyze_coding_patterns(self) -> Dict[str, Any]:
         """Analyze common coding patterns in the project"""
@@ -171,11 +522,11 @@ class ProjectContext:
         }
         
         # Analyze a few sample files to detect patterns
-        sample_files = glob.glob("**/*.jsx", recursive=True)[:5]
-        sample_files.extend(glob.glob("**/*.tsx", recursive=True)[:5])
+        sample_files = sorted(glob.glob("**/*.jsx", recursive=True))[:5]
+        sample_files.extend(sorted(glob.glob("**/*.tsx", recursive=True))[:5])
+        self.pattern_sample_files = frozenset(sample_files)
         
-        for file_path in sample_files:
-            content = self._read_file_content(file_path)
+        for content in self._map_files(self._read_file_sample, sample_files):
             if content:
                 # Detect hooks usage
                 if "useState" in content or "useEffect" in content:
@@ -235,8 +586,20 @@ class ProjectContext:
         generated_files = []
         
         generated_dir = os.path.join(os.getcwd(), "generated_code")
-        if os.path.exists(generated_dir):
-            # Get recent directories
+        manifest = OutputManifest(generated_dir)
+        if manifest.exists():
+            # Last 3 generated tasks, read from the end of the manifest
+            for entry in manifest.recent(3):
+                task = entry.get("directory", "").rsplit('/', 1)[-1]
+                for path in entry.get("files", {}):
+                    if path.endswith(('.jsx', '.tsx', '.js', '.ts')):
+                        generated_files.append({
+                            "name": os.path.basename(path),
+                            "task": task,
+                            "type": self._determine_component_type(os.path.join(generated_dir, path))
+                        })
+        elif os.path.exists(generated_dir):
+            # Output written before the manifest existed
             recent_dirs = sorted(
                 [d for d in os.listdir(generated_dir) 
                  if os.path.isdir(os.path.join(generated_dir, d))],
@@ -274,13 +637,29 @@ class ProjectContext:
             "# Existing Components",
         ]
         
-        if context['existing_components']:
+        relevant = self.relevant_components(task_description)
+        if relevant:
+            prompt_parts.append("The project already has these components (most relevant first):")
+            for comp in relevant:
+                prompt_parts.append(f"- {comp['name']} ({comp['type']}) - {comp['path']}")
+        elif context['existing_components']:
             prompt_parts.append("The project already has these components:")
             for comp in context['existing_components'][:10]:
                 prompt_parts.append(f"- {comp['name']} ({comp['type']})")
         else:
             prompt_parts.append("- No existing components detected")
         
+        imports = self.import_lines(task_description, [comp['path'] for comp in relevant])
+        if imports:
+            prompt_parts.extend([
+                "",
+                "# Available Imports",
+                "Reuse these exports instead of re-implementing them (paths relative to the project root):",
+                "```",
+                *imports,
+                "```",
+            ])
+        
         prompt_parts.extend([
             "",
             "# Recent Generated Code",
@@ -313,22 +692,15 @@ class ProjectContext:
     def _dir_exists(self, path: str) -> bool:
         return os.path.isdir(os.path.join(self.project_root, path))
     
+    def _resolve_path(self, path: str) -> str:
+        return path if os.path.isabs(path) else os.path.join(self.project_root, path)
+    
     def _read_file_content(self, path: str) -> Optional[str]:
-        try:
-            full_path = path if os.path.isabs(path) else os.path.join(self.project_root, path)
-            with open(full_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except:
-            return None
+        return self.file_cache.read_text(self._resolve_path(path))
     
     def _read_json_file(self, path: str) -> Optional[Dict]:
-        content = self._read_file_content(path)
-        if content:
-            try:
-                return json.loads(content)
-            except:
-                return None
-        return None
+        data = self.file_cache.read_json(self._resolve_path(path))
+        return data if isinstance(data, dict) else None
     
     def _has_file_with_content(self, pattern: str) -> bool:
         files = glob.glob(f"**/*{pattern}*", recursive=True)
@@ -337,43 +709,41 @@ class ProjectContext:
     def _find_files_with_extension(self, extension: str) -> List[str]:
         return glob.glob(f"**/*{extension}", recursive=True)
     
+    def _read_file_sample(self, file_path: str) -> Optional[str]:
+        """Bounded prefix of a file for signature detection; None for oversized or minified files"""
+        sample = self.file_cache.read_head(self._resolve_path(file_path), self.sample_bytes, self.max_file_bytes)
+        if sample and len(sample) >= MINIFIED_LINE_LENGTH and '\n' not in sample[:MINIFIED_LINE_LENGTH]:
+            return None
+        return sample
+    
     def _extract_component_name(self, file_path: str) -> Optional[str]:
-        content = self._read_file_content(file_path)
+        content = self._read_file_sample(file_path)
         if content:
-            # Look for React component exports
-            patterns = [
-                r'export default (\w+)',
-                r'export const (\w+)',
-                r'function (\w+)\(',
-                r'const (\w+) = '
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, content)
+            # Look for React component exports (components start with uppercase)
+            for pattern in COMPONENT_NAME_PATTERNS:
+                match = pattern.search(content)
                 if match:
-                    name = match.group(1)
-                    if name[0].isupper():  # React components start with uppercase
-                        return name
+                    return match.group(1)
         
         # Fallback to filename
         return Path(file_path).stem
     
     def _determine_component_type(self, file_path: str) -> str:
-        content = self._read_file_content(file_path)
+        content = self._read_file_sample(file_path)
         if not content:
             return "component"
         
-        content_lower = content.lower()
-        
-        if "button" in content_lower:
-            return "button"
-        elif "form" in content_lower or "input" in content_lower:
-            return "form"
-        elif "modal" in content_lower:
-            return "modal"
-        elif "card" in content_lower:
-            return "card"
-        elif "navigation" in content_lower or "nav" in content_lower:
-            return "navigation"
-        else:
-            return "component"
\ No newline at end of file
+        return COMPONENT_TYPE_MATCHER.first(content) or "component"
+
+
+_shared_contexts: Dict[str, ProjectContext] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_project_context(project_root: str = "/app") -> ProjectContext:
+    """The process's context for ``project_root``: agents share one scan and one file cache"""
+    with _shared_lock:
+        context = _shared_contexts.get(project_root)
+        if context is None:
+            context = _shared_contexts[project_root] = ProjectContext(project_root)
+        return context
@@ -0,0 +1,173 @@
+"""
+Response Parser - Single-pass streaming parser for structured AI responses
+"""
+
+import re
+from typing import Dict, Any
+
+
+# Top-level "## " headings and the artifact section they start
+SECTION_HEADERS = (
+    ("## Analysis", "analysis"),
+    ("## Implementation Plan", "implementation_plan"),
+    ("## Code", "code"),
+    ("## Usage Instructions", "usage_instructions"),
+    ("## Notes", "notes"),
+)
+
+TEXT_SECTIONS = ("analysis", "implementation_plan", "usage_instructions", "notes")
+
+# Info strings of bare fenced blocks that are kept when no "### file" blocks exist
+FALLBACK_LANGUAGES = {"", "js", "jsx", "ts", "tsx", "css", "javascript", "typescript"}
+
+FENCE_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})(.*)$')
+
+
+class StreamingResponseParser:
+    """Incremental line-oriented state machine over an AI response.
+
+    Feed text in arbitrarily sized chunks; lines are processed as soon as
+    they are complete, so the full response never has to be split or held
+    as a list. Fence depth is tracked so a closing fence must match the
+    opening one, fences with info strings nested inside a block (e.g. code
+    examples in a README file) stay part of that block, and headings inside
+    code are never treated as section changes.
+    """
+
+    def __init__(self):
+        self.section = None
+        self.filename = None
+        self.code_files = {}
+        self.fallback_blocks = []
+        self.artifacts = None
+        self._text = {name: [] for name in TEXT_SECTIONS}
+        self._partial = []
+
+        # Open fence state: marker char, marker length, nesting depth
+        self._fence_char = None
+        self._fence_length = 0
+        self._fence_depth = 0
+        self._block_lines = None
+        self._block_target = None
+
+    def feed(self, chunk: str):
+        """Consume the next chunk of response text"""
+        start = 0
+        newline = chunk.find('\n')
+        while newline != -1:
+            if self._partial:
+                self._partial.append(chunk[start:newline])
+                line = ''.join(self._partial)
+                self._partial = []
+            else:
+                line = chunk[start:newline]
+            self._process_line(line.rstrip('\r'))
+            start = newline + 1
+            newline = chunk.find('\n', start)
+
+        if start < len(chunk):
+            self._partial.append(chunk[start:])
+
+    def close(self) -> Dict[str, Any]:
+        """Flush any trailing line or unterminated block and return the artifacts"""
+        if self._partial:
+            line = ''.join(self._partial)
+            self._partial = []
+            self._process_line(line.rstrip('\r'))
+
+        if self._fence_char:
+            self._close_block()
+
+        artifacts = {
+            name: ('\n'.join(lines) + '\n') if lines else ""
+            for name, lines in self._text.items()
+        }
+        artifacts["code_files"] = self.code_files
+        self.artifacts = artifacts
+        return artifacts
+
+    def _process_line(self, line: str):
+        fence = FENCE_PATTERN.match(line)
+
+        if self._fence_char:
+            self._process_fenced_line(line, fence)
+            return
+
+        if fence:
+            self._open_block(fence.group(1), fence.group(2).strip())
+            self._append_text(line)
+            return
+
+        if line.startswith("## "):
+            for header, section in SECTION_HEADERS:
+                if line.startswith(header):
+                    self.section = section
+                    self.filename = None
+                    return
+
+        if line.startswith("### ") and self.section == "code":
+            self.filename = line[4:].strip()
+            return
+
+        self._append_text(line)
+
+    def _process_fenced_line(self, line: str, fence):
+        if fence and fence.group(1)[0] == self._fence_char:
+            marker, info = fence.group(1), fence.group(2).strip()
+            if info:
+                # A fence with an info string opens a nested block
+                self._fence_depth += 1
+            elif self._fence_depth:
+                self._fence_depth -= 1
+            elif len(marker) >= self._fence_length:
+                self._close_block()
+                self._append_text(line)
+                return
+
+        if self._block_lines is not None:
+            self._block_lines.append(line)
+        self._append_text(line)
+
+    def _open_block(self, marker: str, info: str):
+        self._fence_char = marker[0]
+        self._fence_length = len(marker)
+        self._fence_depth = 0
+        language = info.split()[0].lower() if info else ""
+
+        if self.section == "code" and self.filename:
+            self._block_target = "file"
+        elif not self.code_files and language in FALLBACK_LANGUAGES:
+            self._block_target = "fallback"
+        else:
+            self._block_target = None
+        self._block_lines = [] if self._block_target else None
+
+    def _close_block(self):
+        lines = self._block_lines
+        if self._block_target == "file":
+            if lines:
+                self.code_files[self.filename] = '\n'.join(lines)
+                # Named files win; bare blocks are only a fallback
+                self.fallback_blocks = []
+            self.filename = None
+        elif self._block_target == "fallback" and not self.code_files:
+            self.fallback_blocks.append('\n'.join(lines))
+
+        self._fence_char = None
+        self._fence_length = 0
+        self._fence_depth = 0
+        self._block_lines = None
+        self._block_target = None
+
+    def _append_text(self, line: str):
+        if self.section in self._text:
+            self._text[self.section].append(line)
+
+
+def parse_response(ai_response: str, chunk_size: int = 65536) -> StreamingResponseParser:
+    """Run a complete response through the streaming parser in fixed-size chunks"""
+    parser = StreamingResponseParser()
+    for start in range(0, len(ai_response), chunk_size):
+        parser.feed(ai_response[start:start + chunk_size])
+    parser.close()
+    return parser
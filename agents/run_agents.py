@@ -2,36 +2,126 @@
 AI Agent Orchestration Runner - Real AI-powered coding task processing
 """
 
-import os
 import time
+_IMPORT_STARTED = time.perf_counter()
+
+import os
+import json
+import math
+import random
 import asyncio
-from typing import List, Dict, Any
+import argparse
+import threading
+import itertools
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+from base_ai_agent import load_environment
 from frontend_coder import FrontendCoder
+from keyword_matcher import KeywordMatcher
+from output_manifest import archive_outputs
+from blob_store import BlobStore
+from task_queue import create_task_queue
+from task_coordinator import create_coordinator, CoordinatorUnavailable
+from channel_client import ChannelReporter
+from process_workers import ProcessWorkerPool
+from http_session import backend_session, prime_backend
+
+# Time spent importing the agent modules (SDKs and the context engine load later)
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+
+# Agent classes by name, used to spawn extra instances for concurrent workers
+AGENT_CLASSES = {
+    "frontend_coder": FrontendCoder,
+}
+
+# Task description keywords (whole words) that route to the frontend coder
+FRONTEND_MATCHER = KeywordMatcher([
+    (keyword, "frontend_coder") for keyword in (
+        "react", "component", "ui", "frontend", "css", "tailwind", "javascript",
+        "typescript", "jsx", "tsx", "styling", "responsive", "form", "button",
+        "modal", "navigation", "layout", "design", "interface", "webpage"
+    )
+], plurals=True)
 
 
 class AIAgentOrchestrator:
-    def __init__(self):
+    def __init__(self, ai_provider: Optional[str] = None, concurrency: Optional[int] = None,
+                 processes: Optional[int] = None):
+        load_environment()
         # Initialize AI-powered agents
-        ai_provider = os.getenv("AI_PROVIDER", "openai")
-        print(f"🤖 Initializing agents with {ai_provider.upper()} AI...")
+        self.ai_provider = ai_provider or os.getenv("AI_PROVIDER", "openai")
+        print(f"🤖 Initializing agents with {self.ai_provider.upper()} AI...")
         
         self.agents = {
-            "frontend_coder": FrontendCoder("frontend_coder", ai_provider),
+            name: agent_class(name, self.ai_provider)
+            for name, agent_class in AGENT_CLASSES.items()
         }
+        # Extra agent instances for workers beyond the first, keyed by (name, worker_id)
+        self.worker_agents = {}
         
-        self.task_queue = []
+        # Pending tasks: in memory, or durable across restarts with TASK_QUEUE=sqlite
+        self.task_queue = create_task_queue()
         self.completed_tasks = []
         self.running = False
         self.backend_url = os.getenv("BACKEND_URL", "http://localhost:4000")
+        self.concurrency = max(1, concurrency or int(os.getenv("AGENT_CONCURRENCY", "1")))
+        # AGENT_PROCESSES > 0: tasks run in that many worker processes, one task each
+        self.processes = processes if processes is not None else int(os.getenv("AGENT_PROCESSES", "0"))
+        if self.processes > 0:
+            self.concurrency = self.processes
+        self.process_pool = None
+        self._pool_start = None
+        # Seconds from the first import until warm_up finished
+        self.ready_seconds = None
+        self.poll_interval = float(os.getenv("QUEUE_POLL_INTERVAL", "2"))
+        self._task_counter = itertools.count(1)
+        
+        # Backend connection: reconnect backoff, heartbeats and missed-task backfill
+        self.reconnect_base_delay = float(os.getenv("RECONNECT_BASE_DELAY", "1"))
+        self.reconnect_max_delay = float(os.getenv("RECONNECT_MAX_DELAY", "30"))
+        self.heartbeat_interval = float(os.getenv("HEARTBEAT_INTERVAL", "30"))
+        self.backfill_page_size = int(os.getenv("BACKFILL_PAGE_SIZE", "100"))
+        self._pending_heartbeat = None
+        self._seen_task_ids = OrderedDict()
+        self._backend_tasks_lock = threading.Lock()
+        # Newest backend task seen (created_at, id). Only a durable queue still
+        # holds the tasks before it after a restart; otherwise refetch them all
+        self.task_cursor_path = os.getenv("TASK_CURSOR_PATH", "task_cursor.json")
+        self.task_cursor = self._load_task_cursor() if self.task_queue.durable else None
+        
+        # Every instance hears every task_created broadcast: with TASK_COORDINATOR
+        # set, a task runs only on the instance whose claim succeeds, and tasks
+        # whose claim holder stopped renewing are picked up again
+        self.coordinator = create_coordinator(self.backend_url)
+        self.reassign_interval = float(os.getenv("REASSIGN_INTERVAL", "30"))
+        self._active_task_ids = set()
+        self._requeued = {}
+        
+        # Reports pushed over the same WebSocket while it is joined (CHANNEL_REPORTS=false keeps HTTP)
+        self.channel = None
+        if os.getenv("CHANNEL_REPORTS", "true").lower() == "true":
+            agent = next(iter(self.agents.values()))
+            self.channel = ChannelReporter(
+                buffer_size=int(os.getenv("CHANNEL_BUFFER_SIZE", "1000")),
+                max_in_flight=int(os.getenv("CHANNEL_MAX_IN_FLIGHT", "100")),
+                on_undelivered=agent.outbox.append,
+                on_join=agent.backend_health.mark_up
+            )
+            for agent in self.agents.values():
+                agent.channel = self.channel
         
         # Check AI configuration
         self._check_ai_config()
     
     def _check_ai_config(self):
         """Check if AI APIs are properly configured"""
-        ai_provider = os.getenv("AI_PROVIDER", "openai")
+        ai_provider = self.ai_provider
         
-        if ai_provider == "openai":
+        if ai_provider == "mock":
+            print("🧪 Mock AI provider selected: serving template responses offline")
+            
+        elif ai_provider == "openai":
             if not os.getenv("OPENAI_API_KEY"):
                 print("⚠️  WARNING: OPENAI_API_KEY not found. Agents will run in fallback mode.")
                 print("   Set OPENAI_API_KEY environment variable to enable AI features.")
@@ -45,84 +135,253 @@ class AIAgentOrchestrator:
             else:
                 print("✅ Anthropic API key configured")
     
-    def add_task(self, task: Dict[str, Any]):
-        """Add a new task to the queue"""
-        task_id = f"task_{int(time.time())}"
+    def add_task(self, task: Dict[str, Any], requeue: bool = False):
+        """Add a new task to the queue (``requeue``: again, after its claim expired elsewhere)"""
+        # Keep backend-assigned IDs so progress reports reach the right task
+        task_id = task.get("id") or f"task_{int(time.time())}_{next(self._task_counter)}"
         task["id"] = task_id
         task["status"] = "pending"
         task["created_at"] = time.time()
         
-        self.task_queue.append(task)
+        self.task_queue.put(task, requeue=requeue)
         print(f"📋 Task queued: {task_id} - {task['description'][:60]}...")
     
     def assign_task_to_agent(self, task: Dict[str, Any]) -> str:
         """Assign task to the most suitable agent based on content analysis"""
-        description = task.get("description", "").lower()
+        description = task.get("description", "")
         
-        # Enhanced assignment logic
-        frontend_keywords = [
-            "react", "component", "ui", "frontend", "css", "tailwind", "javascript", 
-            "typescript", "jsx", "tsx", "styling", "responsive", "form", "button",
-            "modal", "navigation", "layout", "design", "interface", "webpage"
-        ]
-        
-        if any(keyword in description for keyword in frontend_keywords):
+        if FRONTEND_MATCHER.first(description):
             return "frontend_coder"
         
         # Default to frontend coder for now (can add more agents later)
         return "frontend_coder"
     
+    def _get_worker_agent(self, agent_name: str, worker_id: int):
+        """Get the agent instance a worker should use (one per worker, never shared)"""
+        if worker_id == 0:
+            return self.agents[agent_name]
+        
+        key = (agent_name, worker_id)
+        if key not in self.worker_agents:
+            self.worker_agents[key] = AGENT_CLASSES[agent_name](agent_name, self.ai_provider)
+            self.worker_agents[key].channel = self.channel
+        return self.worker_agents[key]
+    
     async def process_task_queue(self):
         """Process tasks in the queue using AI agents"""
+        if self.processes > 0 and self.process_pool is None:
+            await self.start_process_pool()
+        await asyncio.gather(*(self._worker_loop(worker_id) for worker_id in range(self.concurrency)))
+    
+    async def _worker_loop(self, worker_id: int):
+        """Pull tasks off the queue until stopped, waiting only when the queue is empty"""
         while self.running:
-            if self.task_queue:
-                task = self.task_queue.pop(0)
-                task["status"] = "in_progress"
-                
-                # Assign to appropriate agent
-                agent_name = self.assign_task_to_agent(task)
-                agent = self.agents[agent_name]
-                
-                print(f"\n🎯 Assigning task {task['id']} to {agent_name}")
-                print(f"   Task: {task['description']}")
+            task = self.task_queue.lease()
+            if task is None:
+                # Wait before checking for more tasks
+                await asyncio.sleep(self.poll_interval)
+                continue
+            
+            if task["id"] in self._active_task_ids:
+                # A reassigned copy of a task this instance is still running
+                self.task_queue.complete(task)
+                continue
+            
+            # Keep the queue lease and the coordinator claim alive while the task
+            # runs; if this process dies, both expire and the task is handed out again
+            renewal = asyncio.create_task(self._renew_lease(task["id"])) \
+                if self.task_queue.durable or self.coordinator.distributed else None
+            self._active_task_ids.add(task["id"])
+            claimed = False
+            
+            try:
+                claimed = await self._claim_task(task)
+                if not claimed:
+                    task["status"] = "claimed_elsewhere"
+                    print(f"⏭️ Task {task['id']} is being handled by another instance")
+                    continue
+                await self._run_task(task, worker_id)
+            finally:
+                if renewal:
+                    renewal.cancel()
+                self._active_task_ids.discard(task["id"])
+                self.task_queue.complete(task)
+            if claimed and self.coordinator.distributed:
+                await asyncio.to_thread(self._release_claim, task)
+    
+    async def start_process_pool(self):
+        """Start the worker processes once, however many callers are waiting for them"""
+        if self._pool_start is None:
+            self._pool_start = asyncio.ensure_future(self._start_process_pool())
+        await self._pool_start
+    
+    async def _start_process_pool(self):
+        """Scan the project once here, then start worker processes that adopt the scan"""
+        agent = next(iter(self.agents.values()))
+        snapshot = await asyncio.to_thread(agent.project_context.snapshot)
+        self.process_pool = ProcessWorkerPool(self.processes, AGENT_CLASSES, self.ai_provider,
+                                              snapshot=snapshot, channel=self.channel)
+        await self.process_pool.start()
+    
+    async def warm_up(self):
+        """Load and connect what the first task would otherwise wait for, while the WebSocket connects.
+        
+        The backend connection, the project context and the provider SDK
+        client are primed in parallel threads. With worker processes, each
+        worker primes its own client before reporting ready, so the pool
+        start stands in for the provider step.
+        """
+        agent = next(iter(self.agents.values()))
+        steps = {
+            "backend": asyncio.to_thread(prime_backend, self.backend_url),
+            "context": asyncio.to_thread(lambda: agent.project_context.get_project_context().to_dict())
+        }
+        if self.processes > 0:
+            steps["workers"] = self.start_process_pool()
+        else:
+            steps["provider"] = asyncio.to_thread(agent.warm_up_ai_client)
+        timings = {}
+        
+        async def timed(name, step):
+            started = time.perf_counter()
+            try:
+                result = await step
+            except Exception as e:
+                print(f"⚠️ Warm-up of {name} failed: {e}")
+                result = False
+            timings[name] = f"{name} {(time.perf_counter() - started) * 1000:.0f} ms" + \
+                (" (unreachable)" if result is False and name == "backend" else "")
+        
+        await asyncio.gather(*(timed(name, step) for name, step in steps.items()))
+        self.ready_seconds = time.perf_counter() - _IMPORT_STARTED
+        print(f"⚡ Ready {self.ready_seconds:.2f}s after start "
+              f"(imports {IMPORT_SECONDS * 1000:.0f} ms; {', '.join(timings[name] for name in steps)})")
+    
+    async def _run_task(self, task: Dict[str, Any], worker_id: int):
+        """Process one claimed task on a worker's agent, recording the outcome on ``task``"""
+        task["status"] = "in_progress"
+        task["started_at"] = time.time()
+        
+        # Assign to appropriate agent
+        agent_name = self.assign_task_to_agent(task)
+        
+        print(f"\n🎯 Assigning task {task['id']} to {agent_name} (worker {worker_id})")
+        print(f"   Task: {task['description']}")
+        
+        try:
+            if self.process_pool:
+                result = await self.process_pool.run(agent_name, task)
+            else:
+                # Process the task with AI off the event loop so sockets stay responsive
+                agent = self._get_worker_agent(agent_name, worker_id)
+                result = await asyncio.to_thread(agent.process_task, task)
+            
+            # Mark as completed
+            task["status"] = result.get("status", "completed")
+            task["result"] = result
+            task["completed_at"] = time.time()
+            
+            self.completed_tasks.append(task)
+            
+            if result.get("status") == "completed":
+                files_created = result.get("files_created", [])
+                print(f"✅ Task {task['id']} completed! Generated {len(files_created)} files.")
+                if files_created:
+                    print("   Files created:")
+                    for file_path in files_created:
+                        print(f"   - {file_path}")
+            else:
+                print(f"❌ Task {task['id']} failed: {result.get('error', 'Unknown error')}")
                 
+        except Exception as e:
+            print(f"❌ Error processing task {task['id']}: {str(e)}")
+            task["status"] = "failed"
+            task["error"] = str(e)
+            task["completed_at"] = time.time()
+            self.completed_tasks.append(task)
+    
+    async def _claim_task(self, task: Dict[str, Any]) -> bool:
+        """Claim a task from the coordinator, waiting out coordinator outages"""
+        delay = self.reconnect_base_delay
+        while True:
+            try:
+                return await asyncio.to_thread(self.coordinator.claim, task)
+            except CoordinatorUnavailable as e:
+                if not self.running:
+                    return False
+                print(f"⚠️ Task coordinator unavailable ({e}), retrying claim of {task['id']} in {delay:.1f}s")
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(self.reconnect_max_delay, delay * 2)
+    
+    def _release_claim(self, task: Dict[str, Any]):
+        try:
+            self.coordinator.release(task["id"], task.get("status", "completed"))
+        except CoordinatorUnavailable as e:
+            # The claim simply expires; the finished task is not reassigned
+            print(f"⚠️ Could not release claim on {task['id']}: {e}")
+    
+    async def _renew_lease(self, task_id: str):
+        """Heartbeat for a running task: the local queue lease and the coordinator claim"""
+        intervals = []
+        if self.task_queue.durable:
+            intervals.append(self.task_queue.visibility_timeout / 3)
+        if self.coordinator.distributed:
+            intervals.append(self.coordinator.ttl / 3)
+        lost = False
+        while True:
+            await asyncio.sleep(min(intervals))
+            if self.task_queue.durable:
+                self.task_queue.renew(task_id)
+            if self.coordinator.distributed and task_id in self._active_task_ids:
                 try:
-                    # Process the task with AI
-                    result = agent.process_task(task)
-                    
-                    # Mark as completed
-                    task["status"] = result.get("status", "completed")
-                    task["result"] = result
-                    task["completed_at"] = time.time()
-                    
-                    self.completed_tasks.append(task)
-                    
-                    if result.get("status") == "completed":
-                        files_created = result.get("files_created", [])
-                        print(f"✅ Task {task['id']} completed! Generated {len(files_created)} files.")
-                        if files_created:
-                            print("   Files created:")
-                            for file_path in files_created:
-                                print(f"   - {file_path}")
-                    else:
-                        print(f"❌ Task {task['id']} failed: {result.get('error', 'Unknown error')}")
-                        
-                except Exception as e:
-                    print(f"❌ Error processing task {task['id']}: {str(e)}")
-                    task["status"] = "failed"
-                    task["error"] = str(e)
-                    task["completed_at"] = time.time()
-                    self.completed_tasks.append(task)
-            
-            # Wait before checking for more tasks
-            await asyncio.sleep(2)
+                    renewed = await asyncio.to_thread(self.coordinator.renew, task_id)
+                except CoordinatorUnavailable:
+                    continue
+                if not renewed and not lost:
+                    lost = True
+                    print(f"⚠️ Claim on task {task_id} lapsed and may have been reassigned")
+    
+    async def reassign_expired_tasks(self):
+        """Queue tasks whose claim holder stopped renewing; a claim decides who runs them"""
+        if not self.coordinator.distributed:
+            return
+        while self.running:
+            await asyncio.sleep(self.reassign_interval)
+            try:
+                tasks = await asyncio.to_thread(self.coordinator.expired)
+            except CoordinatorUnavailable as e:
+                print(f"⚠️ Could not list expired task claims: {e}")
+                continue
+            now = time.time()
+            for payload in tasks:
+                task_id = payload.get("id")
+                # Queued once per lease period; a claim settles duplicates anyway
+                if not task_id or task_id in self._active_task_ids or \
+                        now - self._requeued.get(task_id, 0) < self.coordinator.ttl:
+                    continue
+                self._requeued[task_id] = now
+                print(f"♻️ Task {task_id} was abandoned by its instance, requeuing")
+                self.add_task({
+                    "id": task_id,
+                    "description": payload.get("description"),
+                    "amends": payload.get("amends")
+                }, requeue=True)
+            for task_id in [t for t, at in self._requeued.items() if now - at > self.coordinator.ttl]:
+                del self._requeued[task_id]
     
     async def listen_for_backend_tasks(self):
-        """Listen for new tasks from the backend via WebSocket"""
+        """Listen for new tasks from the backend via WebSocket.
+        
+        Reconnects with jittered exponential backoff, keeps the connection alive
+        with Phoenix heartbeats, and after every join backfills tasks created
+        while disconnected from the REST API, so a gap delays tasks instead of
+        losing them. The same socket carries agent reports on the agents
+        channel (see channel_client.py).
+        """
         import websockets
-        import json
         
         websocket_url = self.backend_url.replace("http://", "ws://") + "/socket/websocket"
+        attempt = 0
         
         while self.running:
             try:
@@ -137,46 +396,164 @@ class AIAgentOrchestrator:
                         "ref": "1"
                     }
                     await websocket.send(json.dumps(join_message))
+                    self._pending_heartbeat = None
+                    heartbeat = asyncio.create_task(self._send_heartbeats(websocket))
+                    reporter = asyncio.create_task(self.channel.run(websocket)) if self.channel else None
                     
-                    print("✅ Connected to backend, listening for tasks...")
-                    
-                    async for message in websocket:
-                        try:
-                            data = json.loads(message)
-                            
-                            if data.get("event") == "task_created":
-                                payload = data.get("payload", {})
-                                task = {
-                                    "id": payload.get("id"),
-                                    "description": payload.get("description"),
-                                    "status": payload.get("status", "pending")
-                                }
+                    try:
+                        async for message in websocket:
+                            try:
+                                data = json.loads(message)
+                                event = data.get("event")
                                 
-                                print(f"📨 Received new task from backend: {task['id']}")
-                                self.add_task(task)
+                                if self.channel and self.channel.handle_message(data):
+                                    continue
                                 
-                        except json.JSONDecodeError:
-                            continue
-                        except Exception as e:
-                            print(f"⚠️ Error processing WebSocket message: {e}")
+                                if event == "phx_reply":
+                                    if data.get("ref") == "1" and data.get("payload", {}).get("status") == "ok":
+                                        print("✅ Connected to backend, listening for tasks...")
+                                        attempt = 0
+                                        # Joined: anything created from now on arrives live, so
+                                        # backfill from the cursor as it stands right now
+                                        asyncio.create_task(asyncio.to_thread(self.backfill_tasks, self.task_cursor))
+                                    elif data.get("ref") == self._pending_heartbeat:
+                                        self._pending_heartbeat = None
+                                
+                                elif event == "task_created":
+                                    payload = data.get("payload", {})
+                                    print(f"📨 Received new task from backend: {payload.get('id')}")
+                                    self.add_backend_task(payload)
+                                    
+                            except json.JSONDecodeError:
+                                continue
+                            except Exception as e:
+                                print(f"⚠️ Error processing WebSocket message: {e}")
+                    finally:
+                        heartbeat.cancel()
+                        if reporter:
+                            reporter.cancel()
                             
             except Exception as e:
                 print(f"⚠️ WebSocket connection error: {e}")
-                print("🔄 Retrying connection in 10 seconds...")
-                await asyncio.sleep(10)
+            
+            if self.running:
+                delay = min(self.reconnect_max_delay, self.reconnect_base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                attempt += 1
+                print(f"🔄 Reconnecting in {delay:.1f}s...")
+                await asyncio.sleep(delay)
     
-    def start(self):
+    async def _send_heartbeats(self, websocket):
+        """Phoenix heartbeats; a heartbeat still unanswered at the next one means a dead link"""
+        ref = 0
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if self._pending_heartbeat is not None:
+                print("💔 Backend heartbeat timed out, reconnecting")
+                await websocket.close()
+                return
+            ref += 1
+            self._pending_heartbeat = f"hb-{ref}"
+            await websocket.send(json.dumps({
+                "topic": "phoenix",
+                "event": "heartbeat",
+                "payload": {},
+                "ref": self._pending_heartbeat
+            }))
+    
+    def add_backend_task(self, payload: Dict[str, Any]) -> bool:
+        """Queue a task from the backend unless it was already seen; returns whether it was new"""
+        task_id = payload.get("id")
+        with self._backend_tasks_lock:
+            # Backfill runs in a thread alongside live events
+            self._advance_task_cursor(payload)
+            if not task_id or task_id in self._seen_task_ids:
+                return False
+            self._seen_task_ids[task_id] = True
+            while len(self._seen_task_ids) > 10000:
+                self._seen_task_ids.popitem(last=False)
+        
+        self.add_task({
+            "id": task_id,
+            "description": payload.get("description"),
+            "status": payload.get("status", "pending"),
+            "amends": payload.get("amends")
+        })
+        return True
+    
+    def _advance_task_cursor(self, payload: Dict[str, Any]):
+        created = payload.get("created_at") or payload.get("inserted_at")
+        if not created or not payload.get("id"):
+            return
+        # ISO 8601 UTC timestamps order correctly as strings; the id breaks ties
+        cursor = {"since": created, "after_id": payload["id"]}
+        if not self.task_cursor or (created, payload["id"]) > (self.task_cursor["since"], self.task_cursor["after_id"]):
+            self.task_cursor = cursor
+            if not self.task_queue.durable:
+                return  # only a durable queue reads the cursor back after a restart
+            try:
+                temp_path = self.task_cursor_path + ".tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(cursor, f)
+                os.replace(temp_path, self.task_cursor_path)
+            except OSError as e:
+                print(f"⚠️ Could not save task cursor: {e}")
+    
+    def _load_task_cursor(self) -> Optional[Dict[str, str]]:
+        try:
+            with open(self.task_cursor_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def backfill_tasks(self, cursor: Optional[Dict[str, str]] = None) -> int:
+        """Queue open backend tasks created after ``cursor`` (all of them if None), a page at a time.
+        
+        In-progress tasks are only fetched when something keeps them from
+        running twice: a durable queue that already holds them, or a
+        coordinator whose claim fails while another instance still runs them.
+        """
+        added = 0
+        cursor = dict(cursor) if cursor else {}
+        status = "pending,in_progress" if self.task_queue.durable or self.coordinator.distributed else "pending"
+        try:
+            while self.running:
+                response = backend_session().get(
+                    f"{self.backend_url}/api/tasks",
+                    params={"status": status, "limit": self.backfill_page_size, **cursor},
+                    timeout=10
+                )
+                if response.status_code != 200:
+                    print(f"⚠️ Task backfill failed: {response.status_code}")
+                    break
+                data = response.json()
+                for payload in data.get("tasks", []):
+                    if self.add_backend_task(payload):
+                        added += 1
+                cursor = data.get("next_cursor")
+                if not cursor:
+                    break
+        except Exception as e:
+            print(f"⚠️ Task backfill error: {e}")
+        if added:
+            print(f"📥 Backfilled {added} task(s) created while disconnected")
+        return added
+    
+    def start(self, demo_mode: Optional[bool] = None):
         """Start the AI agent orchestrator"""
         self.running = True
         print("🚀 AI Agent Orchestrator started!")
+        print(f"   Workers: {self.concurrency}" + (" (separate processes)" if self.processes > 0 else ""))
         print("   Available agents:")
         for name, agent in self.agents.items():
             capabilities = agent.get_capabilities()
             print(f"   - {name}: {len(capabilities)} capabilities")
         print()
         
+        if demo_mode is None:
+            demo_mode = os.getenv("DEMO_MODE", "true").lower() == "true"
+        
         # Add some sample tasks for demonstration
-        if os.getenv("DEMO_MODE", "true").lower() == "true":
+        if demo_mode:
             sample_tasks = [
                 {
                     "description": "Create a responsive user profile card component with avatar, name, bio, and contact information",
@@ -203,6 +580,9 @@ class AIAgentOrchestrator:
     def stop(self):
         """Stop the agent orchestrator"""
         self.running = False
+        for agent in [*self.agents.values(), *self.worker_agents.values()]:
+            if agent.context_watcher:
+                agent.context_watcher.stop()
         print("🛑 AI Agent Orchestrator stopped!")
     
     def get_status(self) -> Dict[str, Any]:
@@ -218,13 +598,147 @@ class AIAgentOrchestrator:
             },
             "pending_tasks": len(self.task_queue),
             "completed_tasks": len(self.completed_tasks),
-            "running": self.running
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "startup": {"import_seconds": IMPORT_SECONDS, "ready_seconds": self.ready_seconds}
         }
 
 
+def load_task_corpus(corpus_path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Load benchmark tasks from a JSONL file (one {"description": ...} object per line)"""
+    tasks = []
+    with open(corpus_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️ Skipping corpus line {line_number}: {e}")
+                continue
+            
+            if isinstance(entry, str):
+                entry = {"description": entry}
+            if not entry.get("description"):
+                print(f"⚠️ Skipping corpus line {line_number}: missing description")
+                continue
+            
+            tasks.append(entry)
+            if limit and len(tasks) >= limit:
+                break
+    return tasks
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def print_benchmark_report(tasks: List[Dict[str, Any]], elapsed: float, concurrency: int, provider: str):
+    """Print throughput, queue wait and per-stage latency percentiles"""
+    completed = [t for t in tasks if t.get("status") == "completed"]
+    queue_waits = [(t["started_at"] - t["created_at"]) * 1000 for t in tasks if "started_at" in t]
+    service_times = [(t["completed_at"] - t["started_at"]) * 1000 for t in tasks if "started_at" in t]
+    
+    stage_latencies = {}
+    for task in tasks:
+        for stage, duration in task.get("result", {}).get("stage_timings_ms", {}).items():
+            stage_latencies.setdefault(stage, []).append(duration)
+    
+    def row(label: str, values: List[float]) -> str:
+        return (f"   {label:<20} p50={percentile(values, 50):>9.1f}  p90={percentile(values, 90):>9.1f}  "
+                f"p99={percentile(values, 99):>9.1f}  max={max(values) if values else 0:>9.1f}")
+    
+    print()
+    print("📊 Benchmark Results")
+    print("=" * 50)
+    print(f"   Provider:    {provider}")
+    print(f"   Workers:     {concurrency}")
+    print(f"   Tasks:       {len(tasks)} ({len(completed)} completed, {len(tasks) - len(completed)} failed)")
+    print(f"   Wall time:   {elapsed:.2f}s")
+    print(f"   Throughput:  {len(tasks) / elapsed if elapsed > 0 else 0:.2f} tasks/s")
+    print()
+    print("   Latency (ms)")
+    print(row("queue_wait", queue_waits))
+    print(row("service_time", service_times))
+    for stage, values in stage_latencies.items():
+        print(row(stage, values))
+
+
+async def run_benchmark(args: argparse.Namespace):
+    """Replay a task corpus through the orchestrator at a fixed arrival rate"""
+    tasks = load_task_corpus(args.bench, args.limit)
+    if not tasks:
+        print(f"❌ No tasks found in corpus: {args.bench}")
+        return
+    
+    provider = os.getenv("AI_PROVIDER", "openai") if args.provider == "real" else args.provider
+    if args.provider == "mock" and args.mock_latency is not None:
+        os.environ["MOCK_AI_LATENCY"] = str(args.mock_latency)
+    if args.provider == "replay":
+        if not args.cassette:
+            print("❌ --provider replay requires --cassette")
+            return
+        os.environ["AI_CASSETTE"] = args.cassette
+        os.environ["AI_REPLAY_SPEED"] = str(args.replay_speed)
+    
+    print(f"🏁 Benchmark: {len(tasks)} tasks, rate={args.rate or 'burst'}/s, "
+          f"workers={args.processes or args.concurrency}{' processes' if args.processes else ''}, provider={provider}")
+    
+    orchestrator = AIAgentOrchestrator(ai_provider=provider, concurrency=args.concurrency, processes=args.processes)
+    # Poll tightly so the polling interval doesn't show up as queue wait
+    orchestrator.poll_interval = min(orchestrator.poll_interval, 0.01)
+    orchestrator.start(demo_mode=False)
+    # Startup (SDK client, context scan, worker processes) isn't part of the measured run
+    await orchestrator.warm_up()
+    workers = asyncio.create_task(orchestrator.process_task_queue())
+    
+    bench_start = time.time()
+    for task in tasks:
+        orchestrator.add_task(dict(task))
+        if args.rate > 0:
+            delay = random.expovariate(args.rate) if args.poisson else 1.0 / args.rate
+            await asyncio.sleep(delay)
+    
+    while len(orchestrator.completed_tasks) < len(tasks):
+        await asyncio.sleep(0.05)
+    elapsed = time.time() - bench_start
+    
+    orchestrator.stop()
+    await workers
+    if orchestrator.process_pool:
+        await orchestrator.process_pool.close()
+    orchestrator.task_queue.close()
+    
+    print_benchmark_report(orchestrator.completed_tasks, elapsed, orchestrator.concurrency, provider)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="DevTeam AI agent runner")
+    parser.add_argument("--bench", metavar="CORPUS", help="Replay a JSONL task corpus and report throughput")
+    parser.add_argument("--rate", type=float, default=0.0, help="Task arrival rate in tasks/s (0 = all at once)")
+    parser.add_argument("--poisson", action="store_true", help="Use exponential inter-arrival times instead of a fixed interval")
+    parser.add_argument("--concurrency", type=int, default=None, help="Number of concurrent task workers")
+    parser.add_argument("--processes", type=int, default=None, help="Run tasks in N worker processes (default: AGENT_PROCESSES)")
+    parser.add_argument("--provider", choices=["real", "mock", "replay"], default="mock", help="AI provider used for the benchmark")
+    parser.add_argument("--mock-latency", type=float, default=None, help="Simulated AI latency in seconds for the mock provider")
+    parser.add_argument("--cassette", help="Cassette file served by the replay provider")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay pacing (1.0 = recorded timing, 0 = instant)")
+    parser.add_argument("--limit", type=int, default=None, help="Only replay the first N corpus tasks")
+    parser.add_argument("--archive-outputs", type=float, metavar="DAYS", default=None,
+                        help="Pack generated_code shards older than DAYS into compressed bundles and exit")
+    return parser.parse_args(argv)
+
+
 async def main():
     """Main entry point for the AI agent system"""
     print("🌟 DevTeam AI - AI Agent System Starting...")
+    print(f"⏱️ Agent modules imported in {IMPORT_SECONDS * 1000:.0f} ms")
     print("=" * 50)
     
     orchestrator = AIAgentOrchestrator()
@@ -232,10 +746,13 @@ async def main():
     try:
         orchestrator.start()
         
-        # Run both task processing and backend listening concurrently
+        # Run task processing and backend listening concurrently; caches and
+        # connections are primed alongside while the WebSocket connects
         await asyncio.gather(
+            orchestrator.warm_up(),
             orchestrator.process_task_queue(),
-            orchestrator.listen_for_backend_tasks()
+            orchestrator.listen_for_backend_tasks(),
+            orchestrator.reassign_expired_tasks()
         )
             
     except KeyboardInterrupt:
@@ -245,8 +762,22 @@ async def main():
         print(f"❌ Agent system error: {e}")
         orchestrator.stop()
     
+    if orchestrator.process_pool:
+        await orchestrator.process_pool.close()
+    orchestrator.task_queue.close()
+    orchestrator.coordinator.close()
     print("👋 AI Agent system shutdown complete!")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    load_environment()
+    if args.archive_outputs is not None:
+        output_dir = os.path.join(os.getcwd(), "generated_code")
+        bundles = archive_outputs(output_dir, args.archive_outputs)
+        pruned = BlobStore(os.path.join(output_dir, ".blobs")).prune()
+        print(f"📦 {len(bundles)} shard(s) archived, {pruned} unreferenced blob(s) pruned")
+    elif args.bench:
+        asyncio.run(run_benchmark(args))
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""
+Symbol Index - Compact table of exported components, hooks and props types
+"""
+
+import os
+import re
+import sys
+from array import array
+from collections import namedtuple
+from typing import Dict, List, Optional, Iterable, Iterator, Tuple
+
+from component_index import tokenize
+
+Symbol = namedtuple("Symbol", ["name", "kind", "path", "default", "signature"])
+
+# Stored as a byte per symbol; the order is part of the table format
+KINDS = ("component", "hook", "props", "type", "function", "value")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+EXPORT_DECLARATION_PATTERN = re.compile(
+    r'^export\s+(default\s+)?(?:async\s+)?(function\*?|const|let|var|class|interface|type)\s+([A-Za-z_$][\w$]*)',
+    re.MULTILINE)
+EXPORT_LIST_PATTERN = re.compile(r'^export\s*\{([^}]*)\}\s*(from\b)?', re.MULTILINE)
+LOCAL_DECLARATION_PATTERN = r'^\s*(?:declare\s+)?(?:async\s+)?(function\*?|const|let|var|class|interface|type)\s+{name}\b'
+EXPORT_DEFAULT_NAME_PATTERN = re.compile(r'^export\s+default\s+(?:React\.memo\(|memo\()?([A-Za-z_$][\w$]*)\)?\s*;?\s*$', re.MULTILINE)
+PROPS_BODY_PATTERN = r'(?:interface\s+{name}\b[^{{]*|type\s+{name}\s*=\s*)\{{([^{{}}]{{0,1000}})\}}'
+PARAMS_PATTERN = r'(?:function\s+{name}\s*(?:<[^>]*>)?\s*\(|\b{name}\s*(?::[^=]+)?=\s*(?:React\.)?(?:memo\(|forwardRef\()?\s*(?:async\s*)?(?:function\s*\w*\s*)?\()'
+FIELD_PATTERN = re.compile(r'(?:^|[{,;\n])\s*(?:readonly\s+)?(\.\.\.)?([A-Za-z_$][\w$]*)(\??)')
+MAX_SIGNATURE_LENGTH = 80
+
+
+def _kind_for(name: str, keyword: str) -> str:
+    if keyword in ("interface", "type"):
+        return "props" if name.endswith("Props") else "type"
+    if re.match(r'use[A-Z0-9]', name):
+        return "hook"
+    if name[:1].isupper() and keyword in ("function", "function*", "const", "let", "var", "class", ""):
+        return "component"
+    return "function" if keyword.startswith("function") else "value"
+
+
+def _matching_paren(content: str, start: int) -> int:
+    """Index of the bracket closing the one just before ``start`` (or -1)"""
+    depth = 1
+    for position in range(start, min(len(content), start + 1000)):
+        char = content[position]
+        if char in "({[":
+            depth += 1
+        elif char in ")}]":
+            depth -= 1
+            if depth == 0:
+                return position
+    return -1
+
+
+def _field_list(body: str) -> str:
+    """'{ a, b?, ...rest }' from a destructuring pattern or type body"""
+    depth = angle = 0
+    previous = ""
+    top_level = []
+    for char in body:
+        if char in "({[":
+            depth += 1
+        elif char in ")}]":
+            depth = max(0, depth - 1)
+        elif char == "<":
+            angle += 1
+        elif char == ">" and previous != "=":
+            # The '>' of an arrow ('=>') closes nothing
+            angle = max(0, angle - 1)
+        previous = char
+        # Drop nested types/defaults and everything after ':' or '='
+        top_level.append(char if depth == 0 and angle == 0 else " ")
+    fields = []
+    for segment in re.split(r'[,;\n]', "".join(top_level)):
+        match = FIELD_PATTERN.match(segment.split(':')[0].split('=')[0])
+        if match:
+            fields.append(f"{match.group(1) or ''}{match.group(2)}{match.group(3)}")
+    return "{ " + ", ".join(fields) + " }" if fields else "{}"
+
+
+def _signature(content: str, name: str, kind: str) -> str:
+    escaped = re.escape(name)
+    if kind in ("props", "type"):
+        match = re.search(PROPS_BODY_PATTERN.format(name=escaped), content)
+        return _field_list(match.group(1)) if match else ""
+
+    match = re.search(PARAMS_PATTERN.format(name=escaped), content)
+    if not match:
+        return ""
+    end = _matching_paren(content, match.end())
+    if end == -1:
+        return ""
+    params = content[match.end():end].strip()
+    if params.startswith("{"):
+        brace = content.index("{", match.end())
+        close = _matching_paren(content, brace + 1)
+        signature = _field_list(content[brace + 1:close]) if close != -1 else "{}"
+    else:
+        signature = re.sub(r'\s+', ' ', params)
+    return f"({signature})"[:MAX_SIGNATURE_LENGTH]
+
+
+def _local_keyword(content: str, name: str) -> Optional[str]:
+    """Keyword of the file's own (unexported) declaration of ``name``"""
+    match = re.search(LOCAL_DECLARATION_PATTERN.format(name=re.escape(name)), content, re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def extract_symbols(content: str) -> List[Tuple[str, str, bool, str]]:
+    """All exports declared in a source file: (name, kind, is_default, signature)"""
+    declared = {}
+    for match in EXPORT_DECLARATION_PATTERN.finditer(content):
+        name, keyword = match.group(3), match.group(2)
+        declared[name] = (_kind_for(name, keyword), bool(match.group(1)))
+
+    for match in EXPORT_LIST_PATTERN.finditer(content):
+        if match.group(2):
+            continue  # re-exports belong to the file that declares them
+        for item in match.group(1).split(','):
+            parts = item.split()
+            type_only = bool(parts) and parts[0] == "type"
+            if type_only:
+                parts = parts[1:]
+            if not parts:
+                continue
+            local, exported = parts[0], parts[-1]
+            keyword = _local_keyword(content, local) or ("type" if type_only else "")
+            if exported == "default":
+                declared.setdefault(local, (_kind_for(local, keyword), True))
+            else:
+                declared.setdefault(exported, (_kind_for(local, keyword), False))
+
+    for match in EXPORT_DEFAULT_NAME_PATTERN.finditer(content):
+        name = match.group(1)
+        kind = declared.get(name, (_kind_for(name, ""), True))[0]
+        declared[name] = (kind, True)
+
+    return [(name, kind, is_default, _signature(content, name, kind))
+            for name, (kind, is_default) in declared.items()]
+
+
+def module_specifier(path: str) -> str:
+    """Import specifier for a project file, relative to the project root"""
+    stem, _ = os.path.splitext(path.replace(os.sep, '/'))
+    if stem.endswith('/index'):
+        stem = stem[:-len('/index')]
+    return stem if stem.startswith('.') else './' + stem
+
+
+class SymbolTable:
+    """Immutable, column-oriented table of exported symbols.
+
+    Symbols are stored sorted by (path, name) in parallel columns: names and
+    signatures as lists of (interned) strings, path ids, kinds and flags as
+    compact ``array`` columns, so a project's worth of symbols stays small
+    and two tables can be diffed by walking both in order.
+    """
+
+    __slots__ = ("paths", "names", "path_ids", "kinds", "defaults", "signatures", "_by_name")
+
+    def __init__(self):
+        self.paths = []                 # path id -> path
+        self.names = []
+        self.path_ids = array('I')
+        self.kinds = array('B')
+        self.defaults = array('B')
+        self.signatures = []
+        self._by_name = None
+
+    @classmethod
+    def build(cls, symbols_by_path: Dict[str, Iterable[Tuple[str, str, bool, str]]]) -> "SymbolTable":
+        table = cls()
+        for path in sorted(symbols_by_path):
+            symbols = sorted(symbols_by_path[path] or ())
+            if not symbols:
+                continue
+            path_id = len(table.paths)
+            table.paths.append(path)
+            for name, kind, is_default, signature in symbols:
+                table.names.append(sys.intern(name))
+                table.path_ids.append(path_id)
+                table.kinds.append(KIND_CODES[kind])
+                table.defaults.append(1 if is_default else 0)
+                table.signatures.append(signature)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, position: int) -> Symbol:
+        return Symbol(self.names[position], KINDS[self.kinds[position]],
+                      self.paths[self.path_ids[position]], bool(self.defaults[position]),
+                      self.signatures[position])
+
+    def __iter__(self) -> Iterator[Symbol]:
+        for position in range(len(self.names)):
+            yield self[position]
+
+    def find(self, name: str) -> List[Symbol]:
+        """Every export with this name"""
+        if self._by_name is None:
+            by_name = {}
+            for position, symbol_name in enumerate(self.names):
+                by_name.setdefault(symbol_name, []).append(position)
+            self._by_name = by_name
+        return [self[position] for position in self._by_name.get(name, ())]
+
+    def diff(self, other: "SymbolTable") -> Tuple[List[Symbol], List[Symbol]]:
+        """(added, removed) symbols going from this table to ``other``"""
+        old, new = list(self), list(other)
+        added, removed = [], []
+        i = j = 0
+        while i < len(old) or j < len(new):
+            if j == len(new) or (i < len(old) and (old[i].path, old[i].name) < (new[j].path, new[j].name)):
+                removed.append(old[i])
+                i += 1
+            elif i == len(old) or (new[j].path, new[j].name) < (old[i].path, old[i].name):
+                added.append(new[j])
+                j += 1
+            else:
+                if old[i] != new[j]:
+                    removed.append(old[i])
+                    added.append(new[j])
+                i += 1
+                j += 1
+        return added, removed
+
+    def import_lines(self, budget: int, task_description: str = "",
+                     preferred_paths: Optional[List[str]] = None) -> List[str]:
+        """Import statements for the most useful modules, within ``budget`` bytes.
+
+        Modules in ``preferred_paths`` come first (in that order), then modules
+        with exports named like words in the task, then hooks, then the rest.
+        Each line carries the exports' signatures as a trailing comment.
+        """
+        by_path = {}
+        for symbol in self:
+            by_path.setdefault(symbol.path, []).append(symbol)
+
+        task_terms = set(tokenize(task_description))
+        preferred = {path: rank for rank, path in enumerate(preferred_paths or [])}
+
+        def priority(path: str):
+            symbols = by_path[path]
+            if path in preferred:
+                return 0, preferred[path], path
+            if any(task_terms & set(tokenize(symbol.name)) for symbol in symbols):
+                return 1, 0, path
+            if any(symbol.kind == "hook" for symbol in symbols):
+                return 2, 0, path
+            return 3, 0, path
+
+        lines = []
+        used = 0
+        for path in sorted(by_path, key=priority):
+            line = self._import_line(path, by_path[path])
+            size = len(line.encode('utf-8')) + 1
+            if used + size > budget:
+                continue  # a shorter line further down may still fit
+            lines.append(line)
+            used += size
+        return lines
+
+    @staticmethod
+    def _import_line(path: str, symbols: List[Symbol]) -> str:
+        default = next((s for s in symbols if s.default), None)
+        named = [s for s in symbols if not s.default]
+        specifiers = []
+        if default:
+            specifiers.append(default.name)
+        if named:
+            specifiers.append("{ " + ", ".join(s.name for s in named) + " }")
+        line = f"import {', '.join(specifiers)} from '{module_specifier(path)}';"
+
+        signatures = [f"{s.name}{s.signature}" if s.signature.startswith("(") else f"{s.name} {s.signature}"
+                      for s in symbols if s.signature not in ("", "()", "{}")]
+        if signatures:
+            line += "  // " + "; ".join(signatures)
+        return line
@@ -0,0 +1,102 @@
+"""
+Task Checkpoint - Append-only stage log so retried tasks resume where they stopped
+"""
+
+import os
+import json
+import time
+from typing import Any, Optional
+
+CHECKPOINT_DIR = ".checkpoints"
+
+
+def _file_name(task_id: str) -> str:
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(task_id))
+    return f"{safe}.jsonl"
+
+
+def cleanup_checkpoints(output_dir: str, older_than: float = 86400.0) -> int:
+    """Remove checkpoints of tasks untouched for ``older_than`` seconds; returns the count"""
+    root = os.path.join(output_dir, CHECKPOINT_DIR)
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    cutoff = time.time() - older_than
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+class TaskCheckpoint:
+    """Per-task log of finished stages in ``<output_dir>/.checkpoints/<task_id>.jsonl``.
+
+    Each stage appends one compact JSON line holding what is needed to skip
+    it next time (the raw AI response, parsed artifacts, written file hashes,
+    the completion result), with a single O_APPEND write followed by fsync.
+    A crash leaves at most a torn last line, which is ignored on load. A log
+    written for a different description under the same task id is discarded.
+    """
+
+    def __init__(self, output_dir: str, task_id: str, description: str):
+        self.path = os.path.join(output_dir, CHECKPOINT_DIR, _file_name(task_id))
+        self.description = description
+        self.stages = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.stages[record["stage"]] = record.get("data")
+        except OSError:
+            return
+        if self.stages.get("task", {}).get("description") != self.description:
+            self.discard()
+
+    def __contains__(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def get(self, stage: str) -> Optional[Any]:
+        return self.stages.get(stage)
+
+    @property
+    def resumed_from(self) -> Optional[str]:
+        """The last stage a previous attempt finished, if any"""
+        stages = [stage for stage in self.stages if stage != "task"]
+        return stages[-1] if stages else None
+
+    def save(self, stage: str, data: Any = None):
+        """Durably record that ``stage`` finished"""
+        records = []
+        if not self.stages:
+            records.append({"stage": "task", "data": {"description": self.description}})
+            self.stages["task"] = records[0]["data"]
+        records.append({"stage": stage, "data": data})
+        self.stages[stage] = data
+
+        payload = "".join(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + "\n"
+                          for record in records).encode('utf-8')
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def discard(self):
+        self.stages = {}
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
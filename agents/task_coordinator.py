@@ -0,0 +1,188 @@
+"""
+Task Coordinator - Cross-instance task claims so each backend task is processed exactly once
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from http_session import backend_session
+
+
+class CoordinatorUnavailable(Exception):
+    """The coordinator couldn't be asked; the claim should be retried later"""
+
+
+def default_node_id() -> str:
+    """AGENT_NODE_ID, else hostname:pid so replicas on one host stay distinct"""
+    return os.getenv("AGENT_NODE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LocalCoordinator:
+    """A single instance: every claim succeeds and nothing is ever reassigned"""
+
+    distributed = False
+    ttl = 0.0
+
+    def claim(self, task: Dict[str, Any]) -> bool:
+        return True
+
+    def renew(self, task_id: str) -> bool:
+        return True
+
+    def release(self, task_id: str, status: str = "completed"):
+        pass
+
+    def expired(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return []
+
+    def close(self):
+        pass
+
+
+class SQLiteCoordinator:
+    """Claims in a SQLite file shared by instances on one host (or in tests).
+
+    A claim is a row keyed by task id holding the owner node and a lease
+    deadline, taken inside BEGIN IMMEDIATE so racing instances see each
+    other. It succeeds when the task is unclaimed, its lease expired, or
+    this node already holds it (a restart with the same AGENT_NODE_ID);
+    a released (finished) task is never claimed again.
+    """
+
+    distributed = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leases (
+            task_id TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            lease_until REAL NOT NULL,
+            state TEXT NOT NULL DEFAULT 'claimed',
+            claims INTEGER NOT NULL DEFAULT 1,
+            payload TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS leases_by_deadline ON leases (state, lease_until);
+    """
+
+    def __init__(self, path: str, node_id: Optional[str] = None, ttl: float = 60.0):
+        self.path = path
+        self.node_id = node_id or default_node_id()
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    def claim(self, task: Dict[str, Any]) -> bool:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT owner, lease_until, state FROM leases WHERE task_id = ?",
+                                       (task["id"],)).fetchone()
+                if row is not None:
+                    owner, lease_until, state = row
+                    if state == "done" or (owner != self.node_id and lease_until >= now):
+                        self._db.execute("COMMIT")
+                        return False
+                self._db.execute(
+                    "INSERT INTO leases (task_id, owner, lease_until, payload) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(task_id) DO UPDATE SET owner = excluded.owner, "
+                    "lease_until = excluded.lease_until, claims = claims + 1",
+                    (task["id"], self.node_id, now + self.ttl, json.dumps(task, ensure_ascii=False, default=str)))
+                self._db.execute("COMMIT")
+                return True
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def renew(self, task_id: str) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "UPDATE leases SET lease_until = ? WHERE task_id = ? AND owner = ? AND state = 'claimed'",
+                (time.time() + self.ttl, task_id, self.node_id)).rowcount == 1
+
+    def release(self, task_id: str, status: str = "completed"):
+        with self._lock:
+            self._db.execute("UPDATE leases SET state = 'done' WHERE task_id = ? AND owner = ?",
+                             (task_id, self.node_id))
+
+    def expired(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Claimed tasks whose owner stopped renewing"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT payload FROM leases WHERE state = 'claimed' AND lease_until < ? ORDER BY lease_until LIMIT ?",
+                (time.time(), limit)).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class BackendCoordinator:
+    """Claims held by the backend on the task row itself (``/api/tasks/:id/claim``).
+
+    The backend grants a claim with one conditional UPDATE, so exactly one
+    of the instances racing for a task wins. Tasks the backend doesn't know
+    (demo or corpus tasks) are processed locally. Connection failures and
+    server errors raise CoordinatorUnavailable.
+    """
+
+    distributed = True
+
+    def __init__(self, backend_url: str, node_id: Optional[str] = None, ttl: float = 60.0):
+        self.backend_url = backend_url
+        self.node_id = node_id or default_node_id()
+        self.ttl = ttl
+
+    def _post(self, task_id: str, action: str):
+        import requests
+        try:
+            response = backend_session().post(f"{self.backend_url}/api/tasks/{task_id}/{action}",
+                                              json={"node_id": self.node_id, "ttl": int(self.ttl)}, timeout=5)
+        except requests.RequestException as e:
+            raise CoordinatorUnavailable(str(e))
+        if response.status_code >= 500:
+            raise CoordinatorUnavailable(f"{action} failed: {response.status_code}")
+        return response
+
+    def claim(self, task: Dict[str, Any]) -> bool:
+        response = self._post(task["id"], "claim")
+        return response.status_code in (200, 404)
+
+    def renew(self, task_id: str) -> bool:
+        return self._post(task_id, "lease").status_code == 200
+
+    def release(self, task_id: str, status: str = "completed"):
+        self._post(task_id, "release")
+
+    def expired(self, limit: int = 100) -> List[Dict[str, Any]]:
+        import requests
+        try:
+            response = backend_session().get(f"{self.backend_url}/api/tasks/leases/expired",
+                                             params={"limit": limit}, timeout=10)
+        except requests.RequestException as e:
+            raise CoordinatorUnavailable(str(e))
+        if response.status_code != 200:
+            raise CoordinatorUnavailable(f"expired leases: {response.status_code}")
+        return response.json().get("tasks", [])
+
+    def close(self):
+        pass
+
+
+def create_coordinator(backend_url: str, kind: Optional[str] = None):
+    """Coordinator from TASK_COORDINATOR: none (the default, one instance), backend or sqlite"""
+    kind = (kind or os.getenv("TASK_COORDINATOR", "none")).lower()
+    ttl = float(os.getenv("TASK_LEASE_TTL", "60"))
+    if kind == "backend":
+        return BackendCoordinator(backend_url, ttl=ttl)
+    if kind == "sqlite":
+        return SQLiteCoordinator(os.getenv("TASK_COORDINATOR_PATH", "task_leases.db"), ttl=ttl)
+    return LocalCoordinator()
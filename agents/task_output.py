@@ -0,0 +1,149 @@
+"""
+Task Output - Atomic, collision-free publication of a task's generated files
+"""
+
+import os
+import time
+import errno
+import itertools
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from blob_store import BlobStore
+
+STAGING_DIR = ".staging"
+
+
+def _fsync_path(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def cleanup_staging(output_dir: str, older_than: float = 3600.0) -> int:
+    """Remove staging directories abandoned by crashed writers; returns the count"""
+    staging_root = os.path.join(output_dir, STAGING_DIR)
+    if not os.path.isdir(staging_root):
+        return 0
+    removed = 0
+    cutoff = time.time() - older_than
+    for name in os.listdir(staging_root):
+        path = os.path.join(staging_root, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+class TaskOutputWriter:
+    """Stages one task's files in a private directory, then publishes them atomically.
+
+    Files are written concurrently on a small I/O pool into
+    ``<output_dir>/.staging/<task_id>-XXXX/`` (as blob-store hardlinks), all
+    new data is fsync'ed in one batch at commit, and each staged top-level
+    folder is moved into place with a single ``rename``. A folder that is
+    already taken gets a task-specific name instead of being overwritten,
+    so concurrent tasks never see or clobber each other's partial output.
+    """
+
+    def __init__(self, output_dir: str, blob_store: BlobStore, task_id: str, io_workers: int = 4):
+        self.output_dir = output_dir
+        self.blob_store = blob_store
+        self.task_id = task_id
+        staging_root = os.path.join(output_dir, STAGING_DIR)
+        os.makedirs(staging_root, exist_ok=True)
+        self.staging_dir = tempfile.mkdtemp(prefix=f"{task_id}-", dir=staging_root)
+        self.hashes = {}        # staged relative path -> content hash
+        self.deduplicated = set()
+        self._new_blobs = []
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=max(1, io_workers), thread_name_prefix="task-output")
+
+    def add(self, rel_path: str, content: str):
+        """Queue a file for writing (relative to the task's output root)"""
+        self._futures.append(self._executor.submit(self._write, rel_path, content))
+
+    def _write(self, rel_path: str, content: str):
+        digest, existed = self.blob_store.put(content.encode('utf-8'), sync=False)
+        self.blob_store.link(digest, os.path.join(self.staging_dir, rel_path))
+        self.hashes[rel_path] = digest
+        if existed:
+            self.deduplicated.add(rel_path)
+        else:
+            self._new_blobs.append(self.blob_store.blob_path(digest))
+
+    def commit(self, destination: str) -> Dict[str, str]:
+        """Publish everything under ``destination`` (relative to the output dir).
+
+        Returns staged relative path -> final absolute path.
+        """
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+
+        # One batch of fsyncs: new blob contents, then the directories naming them
+        directories = set()
+        for blob_path in self._new_blobs:
+            _fsync_path(blob_path)
+            directories.add(os.path.dirname(blob_path))
+        for dir_path, _, _ in os.walk(self.staging_dir):
+            directories.add(dir_path)
+        for directory in directories:
+            _fsync_path(directory)
+
+        target_root = os.path.join(self.output_dir, destination)
+        os.makedirs(target_root, exist_ok=True)
+
+        published = {}
+        for top in sorted(os.listdir(self.staging_dir)):
+            final_name = self._claim(os.path.join(self.staging_dir, top), target_root, top)
+            prefix = top + "/"
+            for rel_path in self.hashes:
+                if rel_path == top or rel_path.startswith(prefix):
+                    published[rel_path] = os.path.join(target_root, final_name + rel_path[len(top):])
+        _fsync_path(target_root)
+
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        return published
+
+    def _candidates(self, stem: str, extension: str):
+        yield f"{stem}{extension}"
+        yield f"{stem}-{self.task_id}{extension}"
+        for attempt in itertools.count(2):
+            yield f"{stem}-{self.task_id}-{attempt}{extension}"
+
+    def _claim(self, source: str, target_root: str, name: str) -> str:
+        """Move ``source`` to the first free name in ``target_root``; returns that name"""
+        is_file = os.path.isfile(source)
+        stem, extension = os.path.splitext(name) if is_file else (name, "")
+        for candidate in self._candidates(stem, extension):
+            target = os.path.join(target_root, candidate)
+            if is_file:
+                # rename() would silently replace an existing file; link() refuses
+                try:
+                    os.link(source, target)
+                except FileExistsError:
+                    continue
+                os.unlink(source)
+                return candidate
+            try:
+                # Atomic; fails if another task already owns this name
+                os.rename(source, target)
+                return candidate
+            except OSError as e:
+                if e.errno not in (errno.EEXIST, errno.ENOTEMPTY, errno.ENOTDIR):
+                    raise
+
+    def abort(self):
+        """Drop everything staged so far"""
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
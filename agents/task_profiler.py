@@ -0,0 +1,208 @@
+"""
+Task Profiler - On-demand CPU and memory profiling for agent tasks
+"""
+
+import os
+import time
+import threading
+import cProfile
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+# tracemalloc is process-wide: it runs while any profiled task does, and its
+# peak belongs to one task only while no other profiled task is running
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_joins = 0
+_tracing_external = False
+
+
+def _acquire_tracing() -> int:
+    global _tracing_users, _tracing_joins, _tracing_external
+    with _tracing_lock:
+        if _tracing_users == 0:
+            _tracing_external = tracemalloc.is_tracing()
+            if not _tracing_external:
+                tracemalloc.start()
+        _tracing_users += 1
+        _tracing_joins += 1
+        return _tracing_joins
+
+
+def _release_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and not _tracing_external:
+            tracemalloc.stop()
+
+
+def _tracing_state() -> Tuple[int, int]:
+    """(profiled tasks tracing now, tasks that ever started tracing)"""
+    with _tracing_lock:
+        return _tracing_users, _tracing_joins
+
+
+def profiling_requested(task: Dict[str, Any]) -> bool:
+    """Check whether a task should be profiled (env var or per-task flag)"""
+    if isinstance(task, dict) and task.get("profile"):
+        return True
+    return os.getenv("PROFILE_TASKS", "false").lower() == "true"
+
+
+class TaskProfiler:
+    """Wraps a task in cProfile (or pyinstrument) and tracemalloc.
+
+    Stage wall times are always recorded; everything else is a cheap no-op
+    when disabled, so callers can use it unconditionally. Stage memory is
+    only recorded while this is the one task being profiled; with several
+    profiled at once the task's peak and allocations are process-wide and
+    labelled as such.
+    """
+
+    def __init__(self, task_id: str, enabled: bool = False, top_allocations: int = 25):
+        self.task_id = str(task_id)
+        self.enabled = enabled
+        self.top_allocations = top_allocations
+        self.sampler = os.getenv("PROFILE_SAMPLER", "cprofile").lower()
+        self.stages = {}
+        self._profiler = None
+        self._sampling_profiler = None
+        self._tracing = False
+        self._shared_tracing = False
+        self._tracing_joined = 0
+        self._start_time = 0.0
+
+    def start(self):
+        """Start CPU and memory profiling"""
+        if not self.enabled:
+            return
+
+        self._start_time = time.time()
+
+        self._tracing_joined = _acquire_tracing()
+        self._tracing = True
+
+        if self.sampler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+                self._sampling_profiler = Profiler()
+                self._sampling_profiler.start()
+                return
+            except Exception as e:
+                print(f"⚠️ pyinstrument not available, falling back to cProfile: {e}")
+
+        try:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        except ValueError as e:
+            # Another profiler is already active on this thread
+            print(f"⚠️ cProfile unavailable for task {self.task_id}: {e}")
+            self._profiler = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Record wall time (always) and peak traced memory (when enabled) for a stage"""
+        tracing = self._tracing and self._tracing_alone()
+        if tracing:
+            state = _tracing_state()
+            tracemalloc.reset_peak()
+            current_before, _ = tracemalloc.get_traced_memory()
+        stage_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage_info = {"duration_ms": round((time.perf_counter() - stage_start) * 1000, 2)}
+            if tracing:
+                current_after, peak = tracemalloc.get_traced_memory()
+                if _tracing_state() == state:
+                    stage_info["peak_memory_kb"] = round((peak - current_before) / 1024, 1)
+                    stage_info["retained_memory_kb"] = round((current_after - current_before) / 1024, 1)
+                else:
+                    # Another profiled task started during the stage
+                    self._shared_tracing = True
+            self.stages[name] = stage_info
+
+    def _tracing_alone(self) -> bool:
+        """Whether this is the only profiled task now; notes any overlap seen since start"""
+        users, joins = _tracing_state()
+        if users > 1 or joins != self._tracing_joined:
+            self._shared_tracing = True
+        return users == 1
+
+    def stage_timings(self) -> Dict[str, float]:
+        """Return wall time in milliseconds for each completed stage"""
+        return {name: info["duration_ms"] for name, info in self.stages.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize stage timings and peak memory for the completion report"""
+        if not self.enabled:
+            return {}
+
+        summary = {
+            "sampler": "pyinstrument" if self._sampling_profiler else "cprofile",
+            "elapsed_ms": round((time.time() - self._start_time) * 1000, 2),
+            "stages": dict(self.stages)
+        }
+        if self._tracing:
+            peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            self._tracing_alone()
+            summary["process_peak_memory_kb" if self._shared_tracing else "peak_memory_kb"] = peak_kb
+        return summary
+
+    def finish(self, output_dir: Optional[str] = None) -> List[str]:
+        """Stop profiling and write the .prof and allocation reports"""
+        if not self.enabled:
+            return []
+
+        written = []
+        output_dir = output_dir or os.getcwd()
+        os.makedirs(output_dir, exist_ok=True)
+        base_path = os.path.join(output_dir, f"{self.task_id}")
+
+        try:
+            if self._profiler:
+                self._profiler.disable()
+                prof_path = f"{base_path}.prof"
+                self._profiler.dump_stats(prof_path)
+                written.append(prof_path)
+
+                stats_path = f"{base_path}.cpu.txt"
+                with open(stats_path, 'w', encoding='utf-8') as f:
+                    stats = pstats.Stats(self._profiler, stream=f)
+                    stats.sort_stats("cumulative").print_stats(40)
+                written.append(stats_path)
+
+            if self._sampling_profiler:
+                self._sampling_profiler.stop()
+                sample_path = f"{base_path}.cpu.txt"
+                with open(sample_path, 'w', encoding='utf-8') as f:
+                    f.write(self._sampling_profiler.output_text())
+                written.append(sample_path)
+
+            if self._tracing:
+                self._tracing_alone()
+                snapshot = tracemalloc.take_snapshot()
+                alloc_path = f"{base_path}.alloc.txt"
+                with open(alloc_path, 'w', encoding='utf-8') as f:
+                    scope = " (process-wide: other tasks were profiled concurrently)" if self._shared_tracing else ""
+                    f.write(f"Top {self.top_allocations} allocations for task {self.task_id}{scope}\n\n")
+                    for stat in snapshot.statistics("lineno")[:self.top_allocations]:
+                        f.write(f"{stat}\n")
+                written.append(alloc_path)
+
+        except Exception as e:
+            print(f"⚠️ Failed to write profile for task {self.task_id}: {e}")
+        finally:
+            self._profiler = None
+            self._sampling_profiler = None
+            if self._tracing:
+                _release_tracing()
+                self._tracing = False
+
+        for path in written:
+            print(f"📊 Profile written: {path}")
+
+        return written
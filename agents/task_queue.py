@@ -0,0 +1,247 @@
+"""
+Task Queue - In-memory or durable (SQLite WAL) task queue with leased dequeues
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+
+class MemoryTaskQueue:
+    """The original in-process list: fast, but a restart loses every pending task"""
+
+    durable = False
+
+    def __init__(self):
+        self._pending = []
+
+    def put(self, task: Dict[str, Any], requeue: bool = False):
+        self._pending.append(task)
+
+    def lease(self) -> Optional[Dict[str, Any]]:
+        return self._pending.pop(0) if self._pending else None
+
+    def renew(self, task_id: str):
+        pass
+
+    def complete(self, task: Dict[str, Any]):
+        pass
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def close(self):
+        pass
+
+
+class SQLiteTaskQueue:
+    """Durable queue in a SQLite database in WAL mode.
+
+    ``put`` only appends to an in-memory buffer; a background thread commits
+    buffered tasks every ``flush_interval`` seconds (or as soon as
+    ``batch_size`` accumulate) in one transaction, so thousands of enqueues
+    per second cost a handful of commits. ``lease`` hands a task to a worker
+    for ``visibility_timeout`` seconds; a task whose lease runs out (its
+    worker died) becomes available again, and on startup this node's own
+    leases from a previous run are released at once so in-flight work
+    resumes immediately. Task ids are unique: a re-sent task is ignored.
+    """
+
+    durable = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            state TEXT NOT NULL DEFAULT 'pending',
+            payload TEXT NOT NULL,
+            owner TEXT,
+            lease_until REAL NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            finished_at REAL,
+            result TEXT
+        );
+        CREATE INDEX IF NOT EXISTS tasks_by_state ON tasks (state, seq);
+        CREATE INDEX IF NOT EXISTS tasks_by_lease ON tasks (state, lease_until);
+    """
+
+    def __init__(self, path: str, visibility_timeout: float = 600.0, batch_size: int = 500,
+                 flush_interval: float = 0.02, max_attempts: int = 5, owner: Optional[str] = None,
+                 retention: float = 7 * 86400.0):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.owner = owner or socket.gethostname()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # One connection, serialized by our own lock; BEGIN IMMEDIATE keeps
+        # leases atomic against other processes sharing the file
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        with self._lock:
+            released = self._db.execute(
+                "UPDATE tasks SET state = 'pending', lease_until = 0 WHERE state = 'leased' AND owner = ?",
+                (self.owner,)).rowcount
+            self._db.execute("DELETE FROM tasks WHERE state = 'done' AND finished_at < ?",
+                             (time.time() - retention,))
+        pending = len(self)
+        if pending:
+            print(f"♻️ Task queue {path}: {pending} task(s) waiting, {released} resumed from the last run")
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="task-queue-flush", daemon=True)
+        self._flusher.start()
+
+    def put(self, task: Dict[str, Any], requeue: bool = False):
+        """Buffer a task; it is committed within ``flush_interval`` seconds.
+        
+        ``requeue`` makes a task this queue already finished pending again
+        at once (a task reassigned after another node's lease expired).
+        """
+        if requeue:
+            self.flush()
+            with self._lock:
+                self._db.execute(
+                    "INSERT INTO tasks (id, payload, created_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET state = 'pending', lease_until = 0, attempts = 0 "
+                    "WHERE state = 'done'",
+                    (task["id"], json.dumps(task, ensure_ascii=False, default=str), task.get("created_at", time.time())))
+            return
+        with self._buffer_lock:
+            self._buffer.append((task["id"], json.dumps(task, ensure_ascii=False, default=str),
+                                 task.get("created_at", time.time())))
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Commit buffered tasks in one transaction; returns how many were new"""
+        with self._buffer_lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany("INSERT OR IGNORE INTO tasks (id, payload, created_at) VALUES (?, ?, ?)", batch)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return self._db.total_changes - before
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️ Task queue flush failed: {e}")
+
+    def lease(self) -> Optional[Dict[str, Any]]:
+        """Take the oldest available task for ``visibility_timeout`` seconds"""
+        self.flush()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                task = self._lease_locked()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return task
+
+    def _lease_locked(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        while True:
+            # Tasks whose worker died go first: they were queued before anything pending
+            row = self._db.execute(
+                "SELECT seq, payload, attempts FROM tasks WHERE state = 'leased' AND lease_until < ? "
+                "ORDER BY lease_until LIMIT 1", (now,)).fetchone()
+            if row is None:
+                row = self._db.execute(
+                    "SELECT seq, payload, attempts FROM tasks WHERE state = 'pending' ORDER BY seq LIMIT 1").fetchone()
+            if row is None:
+                return None
+
+            seq, payload, attempts = row
+            task = json.loads(payload)
+            if attempts >= self.max_attempts:
+                # Every earlier worker died holding it: stop handing it out
+                self._db.execute(
+                    "UPDATE tasks SET state = 'done', finished_at = ?, result = ? WHERE seq = ?",
+                    (now, json.dumps({"status": "failed", "error": f"Abandoned after {attempts} attempts"}), seq))
+                print(f"⚠️ Task {task.get('id')} abandoned after {attempts} expired leases")
+                continue
+
+            self._db.execute(
+                "UPDATE tasks SET state = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 WHERE seq = ?",
+                (self.owner, now + self.visibility_timeout, seq))
+            return task
+
+    def renew(self, task_id: str):
+        """Extend a lease that is still being worked on"""
+        with self._lock:
+            self._db.execute("UPDATE tasks SET lease_until = ? WHERE id = ? AND state = 'leased' AND owner = ?",
+                             (time.time() + self.visibility_timeout, task_id, self.owner))
+
+    def complete(self, task: Dict[str, Any]):
+        """Record the finished task (completed or failed) so it is never leased again"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE tasks SET state = 'done', finished_at = ?, result = ? WHERE id = ?",
+                (time.time(), json.dumps(task.get("result") or {"status": task.get("status"), "error": task.get("error")},
+                                         ensure_ascii=False, default=str), task["id"]))
+
+    def __len__(self) -> int:
+        """Tasks waiting to be leased (buffered ones included)"""
+        with self._lock:
+            stored = self._db.execute("SELECT COUNT(*) FROM tasks WHERE state = 'pending'").fetchone()[0]
+        with self._buffer_lock:
+            return stored + len(self._buffer)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+        return dict(rows)
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+def create_task_queue(kind: Optional[str] = None):
+    """Queue backend from TASK_QUEUE (memory, the default, or sqlite)"""
+    kind = (kind or os.getenv("TASK_QUEUE", "memory")).lower()
+    if kind == "sqlite":
+        return SQLiteTaskQueue(
+            os.getenv("TASK_QUEUE_PATH", "task_queue.db"),
+            visibility_timeout=float(os.getenv("TASK_VISIBILITY_TIMEOUT", "600")),
+            batch_size=int(os.getenv("TASK_QUEUE_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("TASK_QUEUE_FLUSH_MS", "20")) / 1000,
+            max_attempts=int(os.getenv("TASK_MAX_ATTEMPTS", "5")),
+            owner=os.getenv("AGENT_NODE_ID") or None
+        )
+    return MemoryTaskQueue()
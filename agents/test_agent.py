@@ -5,137 +5,27 @@ Quick test script to verify agent code generation without full orchestrator
 
 import os
 import sys
+import shutil
+import tempfile
 from frontend_coder import FrontendCoder
+from ai_cassette import request_hash
+from symbol_index import extract_symbols
+
+BUTTON_CASSETTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "button_component.jsonl")
 
 def test_code_generation():
     print("🧪 Testing AI Agent Code Generation")
     print("=" * 50)
     
-    # Create agent (will work without API key in fallback mode)
-    agent = FrontendCoder()
-    print(f"✅ Agent '{agent.name}' initialized")
-    
-    # Override the AI call to provide mock response for testing
-    def mock_ai_call(prompt, system_prompt=None):
-        return """
-## Analysis
-This task requires creating a simple React button component with proper styling and accessibility.
-
-## Implementation Plan
-1. Create a reusable Button component
-2. Add proper TypeScript interfaces
-3. Include Tailwind CSS styling
-4. Add accessibility attributes
-
-## Code
-
-### Button.jsx
-```jsx
-import React from 'react';
-
-const Button = ({ 
-  children, 
-  onClick, 
-  variant = 'primary', 
-  size = 'medium',
-  disabled = false,
-  ...props 
-}) => {
-  const baseClasses = 'font-medium rounded-lg focus:outline-none focus:ring-2 transition-colors duration-200';
-  
-  const variants = {
-    primary: 'bg-blue-600 hover:bg-blue-700 text-white focus:ring-blue-500',
-    secondary: 'bg-gray-200 hover:bg-gray-300 text-gray-900 focus:ring-gray-500',
-    danger: 'bg-red-600 hover:bg-red-700 text-white focus:ring-red-500'
-  };
-  
-  const sizes = {
-    small: 'px-3 py-1.5 text-sm',
-    medium: 'px-4 py-2 text-base',
-    large: 'px-6 py-3 text-lg'
-  };
-  
-  const classes = `${baseClasses} ${variants[variant]} ${sizes[size]} ${
-    disabled ? 'opacity-50 cursor-not-allowed' : 'cursor-pointer'
-  }`;
-  
-  return (
-    <button
-      className={classes}
-      onClick={disabled ? undefined : onClick}
-      disabled={disabled}
-      aria-disabled={disabled}
-      {...props}
-    >
-      {children}
-    </button>
-  );
-};
-
-export default Button;
-```
-
-### Button.stories.js
-```javascript
-import Button from './Button';
-
-export default {
-  title: 'Components/Button',
-  component: Button,
-};
-
-export const Primary = {
-  args: {
-    children: 'Primary Button',
-    variant: 'primary',
-  },
-};
-
-export const Secondary = {
-  args: {
-    children: 'Secondary Button',
-    variant: 'secondary',
-  },
-};
-
-export const Danger = {
-  args: {
-    children: 'Delete',
-    variant: 'danger',
-  },
-};
-```
-
-## Usage Instructions
-Import and use the Button component in your React application:
-
-```jsx
-import Button from './components/Button';
-
-function App() {
-  return (
-    <div>
-      <Button onClick={() => alert('Clicked!')}>
-        Click me
-      </Button>
-      <Button variant="secondary" size="large">
-        Large Secondary
-      </Button>
-    </div>
-  );
-}
-```
-
-## Notes
-- Component includes full accessibility support
-- Uses Tailwind CSS for styling
-- Supports multiple variants and sizes
-- Includes TypeScript-ready props interface
-"""
-
-    # Replace the AI call method temporarily
-    original_call_ai = agent.call_ai
-    agent.call_ai = mock_ai_call
+    # Replay a recorded AI response instead of calling a live model. The
+    # project context (part of the request hash) is built from the working
+    # directory, so run in an empty one, as the cassette was recorded
+    os.environ["AI_CASSETTE"] = BUTTON_CASSETTE
+    previous_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp()
+    os.chdir(work_dir)
+    agent = FrontendCoder(ai_provider="replay")
+    print(f"✅ Agent '{agent.name}' initialized with {len(agent.cassette)} recorded response(s)")
     
     # Test task
     test_task = {
@@ -147,6 +37,11 @@ function App() {
     print()
     
     try:
+        # The recording must match on the exact request, not just the task description
+        prompt = agent.project_context.create_context_prompt(test_task['description'])
+        matched_by_hash = request_hash(prompt, agent.get_system_prompt()) in agent.cassette.by_hash
+        print(f"📼 Cassette matched by request hash: {matched_by_hash}")
+        
         # Process the task
         result = agent.process_task(test_task)
         
@@ -169,7 +64,7 @@ function App() {
                 for file in files:
                     print(f"{subindent}{file}")
         
-        return result.get('status') == 'completed'
+        return matched_by_hash and result.get('status') == 'completed'
         
     except Exception as e:
         print(f"❌ Error during task processing: {e}")
@@ -177,10 +72,60 @@ function App() {
         traceback.print_exc()
         return False
     finally:
-        # Restore original method
-        agent.call_ai = original_call_ai
+        os.environ.pop("AI_CASSETTE", None)
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_cassette_round_trip():
+    print("🧪 Testing AI response record/replay")
+    print("=" * 50)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["AI_CASSETTE"] = os.path.join(tmp_dir, "round_trip.jsonl")
+        os.environ["AI_CASSETTE_RECORD"] = "true"
+        try:
+            recorder = FrontendCoder(ai_provider="mock")
+            recorded = recorder.call_ai("Build a login form", recorder.get_system_prompt())
+            
+            os.environ["AI_CASSETTE_RECORD"] = "false"
+            player = FrontendCoder(ai_provider="replay")
+            replayed = player.call_ai("Build a login form", player.get_system_prompt())
+            missing = player.call_ai("Something never recorded", player.get_system_prompt())
+        finally:
+            os.environ.pop("AI_CASSETTE", None)
+            os.environ.pop("AI_CASSETTE_RECORD", None)
+    
+    print(f"📼 Recorded {len(recorded)} chars, replayed {len(replayed)} chars")
+    return recorded == replayed and missing.startswith("Error:")
+
+def test_symbol_signatures():
+    print("🧪 Testing symbol index signatures")
+    print("=" * 50)
+    
+    # '=>' in arrow-typed props and arrow defaults must not end the field list
+    cases = {
+        "export interface ButtonProps { onClick: () => void; label: string; size?: number }":
+            "{ onClick, label, size? }",
+        "export type CardProps = { title: string; renderFooter?: (x: number) => Node; subtitle?: string }":
+            "{ title, renderFooter?, subtitle? }",
+        "export function Button({ onChange = () => {}, value, name }) { return null }":
+            "({ onChange, value, name })",
+    }
+    success = True
+    for source, expected in cases.items():
+        signature = extract_symbols(source)[0][3]
+        if signature != expected:
+            print(f"❌ Expected {expected}, got {signature}")
+            success = False
+    # A type-only export list entry is classified from its own declaration
+    exported = extract_symbols("type Foo = { a: string };\nexport { type Foo }")
+    if exported != [("Foo", "type", False, "{ a }")]:
+        print(f"❌ Expected Foo as a type, got {exported}")
+        success = False
+    print(f"🔎 Checked {len(cases) + 1} signatures")
+    return success
 
 if __name__ == "__main__":
-    success = test_code_generation()
+    success = test_code_generation() and test_cassette_round_trip() and test_symbol_signatures()
     print(f"\n🏁 Test {'PASSED' if success else 'FAILED'}")
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Unified Diff - Parse, apply and produce unified diffs for amended task output
+"""
+
+import re
+import difflib
+from typing import Dict, List, Optional
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+# How far (in lines) a hunk may have drifted from its stated position
+MAX_OFFSET = 200
+
+
+class PatchConflict(Exception):
+    """A diff that doesn't match the file it claims to change"""
+
+    def __init__(self, path: str, reason: str):
+        super().__init__(f"{path}: {reason}")
+        self.path = path
+        self.reason = reason
+
+
+class Hunk:
+    __slots__ = ("old_start", "old_count", "new_count", "lines")
+
+    def __init__(self, old_start: int, old_count: int, new_count: int):
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_count = new_count
+        self.lines = []  # raw lines, each starting with " ", "-" or "+"
+
+    def old_lines(self) -> List[str]:
+        return [line[1:] for line in self.lines if line[0] in ' -']
+
+    def new_lines(self) -> List[str]:
+        return [line[1:] for line in self.lines if line[0] in ' +']
+
+
+class FilePatch:
+    """The hunks for one file; a path of None stands for /dev/null"""
+
+    __slots__ = ("old_path", "new_path", "hunks")
+
+    def __init__(self, old_path: Optional[str], new_path: Optional[str]):
+        self.old_path = old_path
+        self.new_path = new_path
+        self.hunks = []
+
+    @property
+    def path(self) -> str:
+        return self.new_path or self.old_path
+
+    @property
+    def is_new(self) -> bool:
+        return self.old_path is None
+
+    @property
+    def is_deleted(self) -> bool:
+        return self.new_path is None
+
+
+def _header_path(line: str) -> Optional[str]:
+    path = line[4:].split('\t', 1)[0].strip()
+    if path == '/dev/null':
+        return None
+    if path[:2] in ('a/', 'b/'):
+        path = path[2:]
+    return path
+
+
+def parse_unified_diff(text: str) -> List[FilePatch]:
+    """Extract every file patch from text such as an AI response.
+
+    Prose and ``` fences around the diffs are ignored. Models often get hunk
+    line counts slightly wrong or drop the space on blank context lines, so
+    counts are only used to decide whether a bare blank line still belongs
+    to the hunk.
+    """
+    patches = []
+    current = None
+    hunk = None
+    lines = text.split('\n')
+
+    for number, line in enumerate(lines):
+        line = line.rstrip('\r')
+        if line.startswith('--- ') and number + 1 < len(lines) and lines[number + 1].startswith('+++ '):
+            current = FilePatch(_header_path(line), None)
+            hunk = None
+            continue
+        if line.startswith('+++ ') and current is not None and current.new_path is None and not current.hunks:
+            current.new_path = _header_path(line)
+            if current.old_path is None and current.new_path is None:
+                current = None
+            else:
+                patches.append(current)
+            continue
+
+        header = HUNK_HEADER.match(line)
+        if header and current is not None:
+            old_count = int(header.group(2)) if header.group(2) is not None else 1
+            new_count = int(header.group(4)) if header.group(4) is not None else 1
+            hunk = Hunk(int(header.group(1)), old_count, new_count)
+            current.hunks.append(hunk)
+            continue
+
+        if hunk is None:
+            continue
+        if line and line[0] in ' -+':
+            hunk.lines.append(line)
+        elif line.startswith('\\'):
+            continue  # "\ No newline at end of file"
+        elif not line and len(hunk.old_lines()) < hunk.old_count:
+            hunk.lines.append(' ')
+        else:
+            hunk = None
+
+    return [patch for patch in patches if patch.hunks or patch.is_deleted]
+
+
+def _matches(lines: List[str], at: int, expected: List[str]) -> bool:
+    if at < 0 or at + len(expected) > len(lines):
+        return False
+    return all(lines[at + i].rstrip() == text.rstrip() for i, text in enumerate(expected))
+
+
+def _locate(lines: List[str], expected: List[str], hint: int, floor: int) -> Optional[int]:
+    """Index at or after ``floor`` where ``expected`` occurs, nearest to ``hint``"""
+    hint = max(hint, floor)
+    if not expected:
+        return min(hint, len(lines))
+    for offset in range(MAX_OFFSET + 1):
+        for at in (hint - offset, hint + offset) if offset else (hint,):
+            if at >= floor and _matches(lines, at, expected):
+                return at
+    return None
+
+
+def apply_patch(original: str, patch: FilePatch) -> str:
+    """Apply one file's hunks; raises PatchConflict if any hunk's context doesn't match.
+
+    Hunks may have drifted a little from their stated line numbers, and
+    trailing whitespace is ignored when matching, but the context and removed
+    lines themselves must be present in order.
+    """
+    lines = original.split('\n') if original else ['']
+    output = []
+    position = 0
+    for number, hunk in enumerate(patch.hunks, 1):
+        expected = hunk.old_lines()
+        hint = hunk.old_start - 1 if hunk.old_count else hunk.old_start
+        at = _locate(lines, expected, hint, position)
+        if at is None:
+            raise PatchConflict(patch.path, f"hunk {number} (line {hunk.old_start}) does not match the current file")
+        output.extend(lines[position:at])
+        output.extend(hunk.new_lines())
+        position = at + len(expected)
+    output.extend(lines[position:])
+    return '\n'.join(output)
+
+
+def apply_patches(files: Dict[str, str], patches: List[FilePatch]) -> Dict[str, Optional[str]]:
+    """Apply file patches to ``files`` (path -> content).
+
+    Returns path -> new content for every file the patches actually change,
+    with None for deleted files. Nothing is returned unless every patch
+    applies cleanly.
+    """
+    changed = {}
+    for patch in patches:
+        path = patch.path
+        current = changed[path] if path in changed else files.get(path)
+        if patch.is_new:
+            if current is not None:
+                raise PatchConflict(path, "diff creates a file that already exists")
+            current = ""
+        elif current is None:
+            raise PatchConflict(path, "diff changes a file that doesn't exist")
+        if patch.is_deleted:
+            changed[path] = None
+            continue
+        updated = apply_patch(current, patch)
+        if patch.is_new or updated != files.get(path):
+            changed[path] = updated
+        else:
+            changed.pop(path, None)
+    return changed
+
+
+def make_patch(old: str, new: str, path: str) -> str:
+    """Exact unified diff from ``old`` to ``new`` over lines split on "\\n".
+
+    Splitting on "\\n" (rather than splitlines) keeps a missing final
+    newline and stray "\\r"s intact, so joining the patched lines with
+    "\\n" reproduces ``new`` byte for byte.
+    """
+    return '\n'.join(difflib.unified_diff(old.split('\n'), new.split('\n'),
+                                          f"a/{path}", f"b/{path}", lineterm=''))
@@ -1,7 +1,9 @@
 import Config
 
 config :devteam_ai,
-  ecto_repos: [DevteamAi.Repo]
+  ecto_repos: [DevteamAi.Repo],
+  # Largest request body after inflating gzip/zstd (see CompressedBodyReader)
+  max_inflated_body_bytes: 64_000_000
 
 config :devteam_ai, DevteamAiWeb.Endpoint,
   url: [host: "localhost"],
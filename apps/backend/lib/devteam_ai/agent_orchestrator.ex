@@ -31,6 +31,7 @@ defmodule DevteamAi.AgentOrchestrator do
       description: task.description,
       status: task.status,
       priority: task.priority,
+      amends: task.amends,
       created_at: DateTime.to_iso8601(task.inserted_at)
     })
     
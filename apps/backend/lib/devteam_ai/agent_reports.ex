@@ -0,0 +1,370 @@
+defmodule DevteamAi.AgentReports do
+  @moduledoc """
+  Status, progress, file, completion and error reports and chat messages
+  from agents.
+
+  Agents send these over HTTP (`TaskProgressController`, `AgentController`,
+  `MessageController`) or as messages on the `agents:lobby` channel
+  (`AgentChannel`); both go through here. Every function returns `{:ok, body}` or
+  `{:error, status, body}`, where `status` is the HTTP status to answer with.
+  """
+
+  import Ecto.Query
+  alias DevteamAi.{Tasks, Repo, GeneratedFile, Patch}
+
+  @doc """
+  Records an agent's status and broadcasts it on `agents:lobby`.
+  """
+  def update_status(%{"agent_id" => agent_id, "status" => status} = params) do
+    task_id = Map.get(params, "task_id")
+    message = Map.get(params, "message", "Status updated")
+
+    # Update the orchestrator with agent status
+    DevteamAi.AgentOrchestrator.update_agent_status(agent_id, status, task_id, message)
+
+    # Broadcast status update via WebSocket
+    DevteamAiWeb.Endpoint.broadcast("agents:lobby", "agent_status_updated", %{
+      agent_id: agent_id,
+      status: status,
+      task_id: task_id,
+      message: message,
+      timestamp: DateTime.utc_now()
+    })
+
+    {:ok, %{success: true, message: "Agent status updated"}}
+  end
+
+  def update_status(_params), do: invalid("agent_id and status are required")
+
+  @doc """
+  Stores a task's progress in its result and broadcasts it on `tasks:lobby`.
+  """
+  def update_progress(task_id, %{"progress_percentage" => progress, "current_stage" => stage} = params) do
+    agent_id = Map.get(params, "agent_id")
+    stage_details = Map.get(params, "stage_details", "")
+    timestamp = Map.get(params, "timestamp", DateTime.utc_now() |> DateTime.to_unix())
+
+    case Tasks.get_task(task_id) do
+      nil ->
+        task_not_found()
+
+      task ->
+        # Update task with progress information
+        progress_data = %{
+          "progress_percentage" => progress,
+          "current_stage" => stage,
+          "stage_details" => stage_details,
+          "last_updated_by" => agent_id,
+          "last_updated_at" => DateTime.from_unix!(trunc(timestamp))
+        }
+
+        # Store progress in task result or metadata
+        updated_result = Map.merge(task.result || %{}, %{"progress" => progress_data})
+
+        case Tasks.update_task(task, %{"result" => updated_result}) do
+          {:ok, _updated_task} ->
+            # Broadcast progress update via WebSocket
+            DevteamAiWeb.Endpoint.broadcast("tasks:lobby", "task_progress", %{
+              task_id: task_id,
+              progress: progress,
+              stage: stage,
+              details: stage_details,
+              agent: agent_id,
+              timestamp: DateTime.to_iso8601(DateTime.from_unix!(trunc(timestamp)))
+            })
+
+            {:ok, %{status: "progress_updated", progress: progress, stage: stage}}
+
+          {:error, _changeset} ->
+            {:error, :unprocessable_entity, %{error: "Failed to update task progress"}}
+        end
+    end
+  end
+
+  def update_progress(_task_id, _params), do: invalid("progress_percentage and current_stage are required")
+
+  @doc """
+  Stores one generated file. Content the agent uploaded before may be sent
+  by `content_hash` only; `:conflict` means it must be sent in full.
+  """
+  def record_file(task_id, %{"file_path" => file_path, "file_type" => file_type} = params) do
+    agent_id = Map.get(params, "agent_id")
+    description = Map.get(params, "description", "")
+    content_hash = Map.get(params, "content_hash")
+    # Agents omit content they have uploaded before and send only its hash
+    content = Map.get(params, "content") || stored_content(content_hash) || ""
+    timestamp = Map.get(params, "timestamp", DateTime.utc_now() |> DateTime.to_unix())
+
+    case Tasks.get_task(task_id) do
+      nil ->
+        task_not_found()
+
+      _task when content == "" and is_binary(content_hash) ->
+        {:error, :conflict, %{error: "content_required", content_hash: content_hash}}
+
+      task ->
+        # Store file content in generated_files table
+        filename = Path.basename(file_path)
+        file_id = "#{task_id}_#{filename}_#{:os.system_time(:millisecond)}"
+
+        file_attrs = %{
+          id: file_id,
+          task_id: task_id,
+          filename: filename,
+          file_path: file_path,
+          content: content,
+          content_hash: content_hash,
+          file_type: file_type,
+          description: description,
+          agent_name: agent_id
+        }
+
+        case Repo.insert(GeneratedFile.changeset(%GeneratedFile{}, file_attrs)) do
+          {:ok, _generated_file} ->
+            # Add file to task's files_created array
+            updated_files = [file_path | (task.files_created || [])]
+            Tasks.update_task(task, %{"files_created" => updated_files})
+
+            # Broadcast file creation via WebSocket
+            DevteamAiWeb.Endpoint.broadcast("tasks:lobby", "file_created", %{
+              task_id: task_id,
+              file_path: file_path,
+              file_type: file_type,
+              description: description,
+              agent: agent_id,
+              timestamp: DateTime.to_iso8601(DateTime.from_unix!(trunc(timestamp)))
+            })
+
+            {:ok, %{status: "file_recorded", file_path: file_path}}
+
+          {:error, _changeset} ->
+            {:error, :unprocessable_entity, %{error: "Failed to store file content"}}
+        end
+    end
+  end
+
+  def record_file(_task_id, _params), do: invalid("file_path and file_type are required")
+
+  @doc """
+  Stores a batch of generated files. Files sent by hash (or as a patch)
+  whose content can't be produced are listed under `content_required`.
+  """
+  def record_files(task_id, %{"files" => files} = params) when is_list(files) do
+    agent_id = Map.get(params, "agent_id")
+    timestamp = Map.get(params, "timestamp", DateTime.utc_now() |> DateTime.to_unix())
+
+    case Tasks.get_task(task_id) do
+      nil ->
+        task_not_found()
+
+      task ->
+        # Store every file of the batch; files sent by hash (or as a patch)
+        # whose content we can't produce are reported back so the agent can
+        # upload them in full
+        {recorded, content_required, failed} =
+          Enum.reduce(files, {[], [], []}, fn file, {recorded, content_required, failed} ->
+            file_path = file["file_path"]
+            content_hash = file["content_hash"]
+            content = file["content"] || stored_content(content_hash) || patched_content(file)
+
+            if is_nil(content) and is_binary(content_hash) do
+              {recorded, [file_path | content_required], failed}
+            else
+              file_attrs = %{
+                id: "#{task_id}_#{Path.basename(file_path)}_#{System.unique_integer([:positive, :monotonic])}",
+                task_id: task_id,
+                filename: Path.basename(file_path),
+                file_path: file_path,
+                content: content || "",
+                content_hash: content_hash,
+                file_type: file["file_type"],
+                description: Map.get(file, "description", ""),
+                agent_name: agent_id
+              }
+
+              case Repo.insert(GeneratedFile.changeset(%GeneratedFile{}, file_attrs)) do
+                {:ok, _generated_file} -> {[file | recorded], content_required, failed}
+                {:error, _changeset} -> {recorded, content_required, [file_path | failed]}
+              end
+            end
+          end)
+
+        recorded = Enum.reverse(recorded)
+
+        if recorded != [] do
+          # Same order as one record_file call per file
+          updated_files = Enum.reduce(recorded, task.files_created || [], &[&1["file_path"] | &2])
+          Tasks.update_task(task, %{"files_created" => updated_files})
+
+          Enum.each(recorded, fn file ->
+            DevteamAiWeb.Endpoint.broadcast("tasks:lobby", "file_created", %{
+              task_id: task_id,
+              file_path: file["file_path"],
+              file_type: file["file_type"],
+              description: Map.get(file, "description", ""),
+              agent: agent_id,
+              timestamp: DateTime.to_iso8601(DateTime.from_unix!(trunc(timestamp)))
+            })
+          end)
+        end
+
+        {:ok,
+         %{
+           status: "files_recorded",
+           recorded: Enum.map(recorded, & &1["file_path"]),
+           content_required: Enum.reverse(content_required),
+           failed: Enum.reverse(failed)
+         }}
+    end
+  end
+
+  def record_files(_task_id, _params), do: invalid("files must be a list")
+
+  @doc """
+  Marks a task completed and broadcasts `task_completed`.
+  """
+  def complete_task(task_id, %{"result" => result, "files_created" => files_created} = params) do
+    agent_id = Map.get(params, "agent_id")
+    completion_time = Map.get(params, "completion_time", DateTime.utc_now() |> DateTime.to_unix())
+    metadata = Map.get(params, "metadata", %{})
+
+    case Tasks.get_task(task_id) do
+      nil ->
+        task_not_found()
+
+      task ->
+        # Prepare completion data
+        completion_result = Map.merge(result, %{
+          "completed_by" => agent_id,
+          "completion_timestamp" => completion_time,
+          "metadata" => metadata
+        })
+
+        completion_attrs = %{
+          "status" => "completed",
+          "result" => completion_result,
+          "files_created" => files_created,
+          "completed_at" => DateTime.from_unix!(trunc(completion_time))
+        }
+
+        case Tasks.update_task(task, completion_attrs) do
+          {:ok, _updated_task} ->
+            # Broadcast task completion via WebSocket
+            DevteamAiWeb.Endpoint.broadcast("tasks:lobby", "task_completed", %{
+              task_id: task_id,
+              status: "completed",
+              files_created: files_created,
+              result: completion_result,
+              agent: agent_id,
+              completed_at: DateTime.to_iso8601(DateTime.from_unix!(trunc(completion_time)))
+            })
+
+            {:ok,
+             %{
+               status: "task_completed",
+               files_created: length(files_created),
+               processing_time: Map.get(metadata, "processing_time", 0)
+             }}
+
+          {:error, _changeset} ->
+            {:error, :unprocessable_entity, %{error: "Failed to complete task"}}
+        end
+    end
+  end
+
+  def complete_task(_task_id, _params), do: invalid("result and files_created are required")
+
+  @doc """
+  Marks a task failed and broadcasts `task_failed`.
+  """
+  def report_error(task_id, %{"error_message" => error_message} = params) do
+    agent_id = Map.get(params, "agent_id")
+    error_type = Map.get(params, "error_type", "general")
+    error_details = Map.get(params, "error_details", %{})
+    timestamp = Map.get(params, "timestamp", DateTime.utc_now() |> DateTime.to_unix())
+    metadata = Map.get(params, "metadata", %{})
+
+    case Tasks.get_task(task_id) do
+      nil ->
+        task_not_found()
+
+      task ->
+        # Prepare error data
+        error_result = %{
+          "error_type" => error_type,
+          "error_message" => error_message,
+          "error_details" => error_details,
+          "failed_by" => agent_id,
+          "failure_timestamp" => timestamp,
+          "metadata" => metadata
+        }
+
+        error_attrs = %{
+          "status" => "failed",
+          "error_message" => error_message,
+          "result" => error_result,
+          "completed_at" => DateTime.from_unix!(trunc(timestamp))
+        }
+
+        case Tasks.update_task(task, error_attrs) do
+          {:ok, _updated_task} ->
+            # Broadcast task failure via WebSocket
+            DevteamAiWeb.Endpoint.broadcast("tasks:lobby", "task_failed", %{
+              task_id: task_id,
+              status: "failed",
+              error_type: error_type,
+              error_message: error_message,
+              agent: agent_id,
+              failed_at: DateTime.to_iso8601(DateTime.from_unix!(trunc(timestamp)))
+            })
+
+            {:ok, %{status: "error_reported", error_type: error_type}}
+
+          {:error, _changeset} ->
+            {:error, :unprocessable_entity, %{error: "Failed to report task error"}}
+        end
+    end
+  end
+
+  def report_error(_task_id, _params), do: invalid("error_message is required")
+
+  @doc """
+  Relays a chat message to the `chat` PubSub topic.
+  """
+  def post_message(%{"message" => message_params}) do
+    Phoenix.PubSub.broadcast(DevteamAi.PubSub, "chat", {:new_message, message_params})
+
+    {:ok, %{status: "sent", message: "Message sent successfully"}}
+  end
+
+  def post_message(_params), do: invalid("message is required")
+
+  defp task_not_found, do: {:error, :not_found, %{error: "Task not found"}}
+
+  defp invalid(message), do: {:error, :bad_request, %{error: message}}
+
+  # Amended files arrive as a unified diff against content we already store;
+  # the result must hash to the content_hash the agent computed
+  defp patched_content(%{"patch" => patch, "base_hash" => base_hash, "content_hash" => content_hash})
+       when is_binary(patch) and is_binary(content_hash) do
+    with base when is_binary(base) <- stored_content(base_hash),
+         {:ok, content} <- Patch.apply_patch(base, patch),
+         ^content_hash <- :crypto.hash(:sha256, content) |> Base.encode16(case: :lower) do
+      content
+    else
+      _ -> nil
+    end
+  end
+
+  defp patched_content(_file), do: nil
+
+  defp stored_content(nil), do: nil
+
+  defp stored_content(content_hash) do
+    GeneratedFile
+    |> where([f], f.content_hash == ^content_hash)
+    |> select([f], f.content)
+    |> limit(1)
+    |> Repo.one()
+  end
+end
@@ -10,6 +10,7 @@ defmodule DevteamAi.GeneratedFile do
     field :filename, :string
     field :file_path, :string
     field :content, :string
+    field :content_hash, :string
     field :file_type, :string
     field :description, :string
     field :agent_name, :string
@@ -20,7 +21,7 @@ defmodule DevteamAi.GeneratedFile do
   @doc false
   def changeset(generated_file, attrs) do
     generated_file
-    |> cast(attrs, [:id, :task_id, :filename, :file_path, :content, :file_type, :description, :agent_name])
+    |> cast(attrs, [:id, :task_id, :filename, :file_path, :content, :content_hash, :file_type, :description, :agent_name])
     |> validate_required([:id, :task_id, :filename, :file_path, :content, :file_type])
     |> unique_constraint([:id])
   end
@@ -0,0 +1,72 @@
+defmodule DevteamAi.Patch do
+  @moduledoc """
+  Applies the unified diffs agents send for amended files.
+
+  Agents build these patches with Python's `difflib.unified_diff` over the
+  file split on "\\n", against a version whose content we already store, so
+  they must apply exactly: any context mismatch is an error, never fuzz.
+  """
+
+  @hunk_header ~r/^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@/
+
+  @doc """
+  Applies `patch` to `original`. Returns `{:ok, content}` or `{:error, reason}`.
+  """
+  def apply_patch(original, patch) when is_binary(original) and is_binary(patch) do
+    hunks = patch |> String.split("\n") |> parse_hunks(nil, [])
+    apply_hunks(hunks, String.split(original, "\n"), 0, [])
+  end
+
+  def apply_patch(_original, _patch), do: {:error, :invalid_patch}
+
+  defp parse_hunks([], current, hunks), do: Enum.reverse(close_hunk(current, hunks))
+
+  defp parse_hunks([line | rest], current, hunks) do
+    case Regex.run(@hunk_header, line) do
+      [_header, old_start | old_count] ->
+        start = String.to_integer(old_start)
+        # difflib numbers an empty range by the line before it
+        index = if old_count == ["0"], do: start, else: start - 1
+        parse_hunks(rest, {index, []}, close_hunk(current, hunks))
+
+      nil when is_nil(current) or line == "" ->
+        # File headers before the first hunk
+        parse_hunks(rest, current, hunks)
+
+      nil ->
+        {index, body} = current
+        parse_hunks(rest, {index, [line | body]}, hunks)
+    end
+  end
+
+  defp close_hunk(nil, hunks), do: hunks
+  defp close_hunk({index, body}, hunks), do: [{index, Enum.reverse(body)} | hunks]
+
+  defp apply_hunks([], lines, _position, acc) do
+    {:ok, acc |> Enum.reverse(lines) |> Enum.join("\n")}
+  end
+
+  defp apply_hunks([{index, body} | hunks], lines, position, acc) when index >= position do
+    {unchanged, lines} = Enum.split(lines, index - position)
+
+    case apply_body(body, lines, Enum.reverse(unchanged, acc), 0) do
+      {:ok, lines, acc, consumed} -> apply_hunks(hunks, lines, index + consumed, acc)
+      error -> error
+    end
+  end
+
+  defp apply_hunks(_hunks, _lines, _position, _acc), do: {:error, :overlapping_hunks}
+
+  defp apply_body([], lines, acc, consumed), do: {:ok, lines, acc, consumed}
+
+  defp apply_body(["+" <> text | body], lines, acc, consumed),
+    do: apply_body(body, lines, [text | acc], consumed)
+
+  defp apply_body([" " <> text | body], [text | lines], acc, consumed),
+    do: apply_body(body, lines, [text | acc], consumed + 1)
+
+  defp apply_body(["-" <> text | body], [text | lines], acc, consumed),
+    do: apply_body(body, lines, acc, consumed + 1)
+
+  defp apply_body(_body, _lines, _acc, _consumed), do: {:error, :context_mismatch}
+end
@@ -13,11 +13,7 @@ defmodule DevteamAi.Tasks do
   def list_tasks(opts \\ []) do
     query = from(t in Task, order_by: [desc: t.inserted_at])
     
-    query = 
-      case Keyword.get(opts, :status) do
-        nil -> query
-        status -> from(t in query, where: t.status == ^status)
-      end
+    query = filter_status(query, Keyword.get(opts, :status))
 
     query =
       case Keyword.get(opts, :agent) do
@@ -28,6 +24,31 @@ defmodule DevteamAi.Tasks do
     Repo.all(query)
   end
 
+  @doc """
+  Returns up to `:limit` tasks created after the `:since`/`:after_id` cursor
+  (an inserted_at and task id), oldest first, optionally filtered by status.
+  Keyset pagination for agents catching up on tasks they missed.
+  """
+  def list_tasks_after(opts \\ []) do
+    query =
+      from(t in Task, order_by: [asc: t.inserted_at, asc: t.id], limit: ^Keyword.get(opts, :limit, 100))
+      |> filter_status(Keyword.get(opts, :status))
+
+    query =
+      case {Keyword.get(opts, :since), Keyword.get(opts, :after_id)} do
+        {nil, _} -> query
+        {since, nil} -> from(t in query, where: t.inserted_at > ^since)
+        {since, after_id} ->
+          from(t in query, where: t.inserted_at > ^since or (t.inserted_at == ^since and t.id > ^after_id))
+      end
+
+    Repo.all(query)
+  end
+
+  defp filter_status(query, nil), do: query
+  defp filter_status(query, statuses) when is_list(statuses), do: from(t in query, where: t.status in ^statuses)
+  defp filter_status(query, status), do: from(t in query, where: t.status == ^status)
+
   @doc """
   Gets a single task.
   """
@@ -103,6 +124,78 @@ defmodule DevteamAi.Tasks do
     Task.changeset(task, attrs)
   end
 
+  @doc """
+  Claims a task for agent instance `node` for `ttl` seconds.
+
+  One conditional UPDATE, so of several instances racing for a task exactly
+  one wins. The claim succeeds when the task is unclaimed, its lease has
+  expired, or `node` already holds it; finished tasks can't be claimed.
+  Returns `{:ok, lease_expires_at}` or `{:error, :not_found | :finished | :held}`.
+  """
+  def claim_task(id, node, ttl) do
+    now = DateTime.utc_now() |> DateTime.truncate(:second)
+    expires_at = DateTime.add(now, ttl, :second)
+
+    {count, _} =
+      from(t in Task,
+        where: t.id == ^id and t.status not in ["completed", "failed"],
+        where: is_nil(t.leased_by) or t.leased_by == ^node or t.lease_expires_at < ^now
+      )
+      |> Repo.update_all(set: [leased_by: node, lease_expires_at: expires_at, updated_at: now])
+
+    if count == 1 do
+      {:ok, expires_at}
+    else
+      case get_task(id) do
+        nil -> {:error, :not_found}
+        %Task{status: status} when status in ["completed", "failed"] -> {:error, :finished}
+        _task -> {:error, :held}
+      end
+    end
+  end
+
+  @doc """
+  Extends `node`'s claim on a task. Returns `{:ok, lease_expires_at}`, or
+  `{:error, :lost}` if the task finished or another instance took it over.
+  """
+  def renew_task_lease(id, node, ttl) do
+    now = DateTime.utc_now() |> DateTime.truncate(:second)
+    expires_at = DateTime.add(now, ttl, :second)
+
+    from(t in Task, where: t.id == ^id and t.leased_by == ^node and t.status not in ["completed", "failed"])
+    |> Repo.update_all(set: [lease_expires_at: expires_at])
+    |> case do
+      {1, _} -> {:ok, expires_at}
+      _ -> {:error, :lost}
+    end
+  end
+
+  @doc """
+  Drops `node`'s claim on a task it has finished with.
+  """
+  def release_task_lease(id, node) do
+    from(t in Task, where: t.id == ^id and t.leased_by == ^node)
+    |> Repo.update_all(set: [leased_by: nil, lease_expires_at: nil])
+
+    :ok
+  end
+
+  @doc """
+  Returns unfinished tasks whose claim expired without being released (the
+  instance holding them died), longest expired first.
+  """
+  def list_expired_leases(limit \\ 100) do
+    now = DateTime.utc_now()
+
+    from(t in Task,
+      where: not is_nil(t.leased_by) and t.lease_expires_at < ^now,
+      where: t.status not in ["completed", "failed"],
+      order_by: [asc: t.lease_expires_at],
+      limit: ^limit
+    )
+    |> Repo.all()
+  end
+
   @doc """
   Gets the next pending task for processing.
   """
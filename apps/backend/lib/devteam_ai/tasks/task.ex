@@ -4,7 +4,7 @@ defmodule DevteamAi.Tasks.Task do
 
   @primary_key {:id, :string, autogenerate: false}
   @derive {Phoenix.Param, key: :id}
-  @derive {Jason.Encoder, only: [:id, :description, :status, :priority, :assigned_agent, :result, :error_message, :started_at, :completed_at, :files_created, :inserted_at, :updated_at]}
+  @derive {Jason.Encoder, only: [:id, :description, :status, :priority, :assigned_agent, :result, :error_message, :started_at, :completed_at, :files_created, :amends, :leased_by, :lease_expires_at, :inserted_at, :updated_at]}
 
   schema "tasks" do
     field :description, :string
@@ -16,6 +16,11 @@ defmodule DevteamAi.Tasks.Task do
     field :started_at, :utc_datetime
     field :completed_at, :utc_datetime
     field :files_created, {:array, :string}, default: []
+    # Id of an earlier task whose output this follow-up edit changes
+    field :amends, :string
+    # Agent instance holding the task's claim, until lease_expires_at (see Tasks.claim_task/3)
+    field :leased_by, :string
+    field :lease_expires_at, :utc_datetime
 
     timestamps(type: :utc_datetime)
   end
@@ -25,7 +30,7 @@ defmodule DevteamAi.Tasks.Task do
     task
     |> cast(attrs, [
       :id, :description, :status, :priority, :assigned_agent, 
-      :result, :error_message, :started_at, :completed_at, :files_created
+      :result, :error_message, :started_at, :completed_at, :files_created, :amends
     ])
     |> validate_required([:id, :description])
     |> validate_inclusion(:status, ["pending", "in_progress", "completed", "failed"])
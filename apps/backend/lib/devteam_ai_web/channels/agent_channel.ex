@@ -1,5 +1,6 @@
 defmodule DevteamAiWeb.AgentChannel do
   use DevteamAiWeb, :channel
+  alias DevteamAi.AgentReports
 
   @impl true
   def join("agents:lobby", _payload, socket) do
@@ -13,4 +14,45 @@ defmodule DevteamAiWeb.AgentChannel do
     agents = DevteamAi.AgentOrchestrator.get_agent_status()
     {:reply, {:ok, %{agents: agents}}, socket}
   end
-end
\ No newline at end of file
+
+  # Agent reports pushed over the socket instead of one HTTP request each.
+  # Same handling and reply bodies as the HTTP routes; an error reply carries
+  # the HTTP status the route would have answered with as `code`.
+  def handle_in("agent_status", payload, socket) do
+    reply(AgentReports.update_status(payload), socket)
+  end
+
+  def handle_in("task_progress", %{"task_id" => task_id} = payload, socket) do
+    reply(AgentReports.update_progress(task_id, payload), socket)
+  end
+
+  def handle_in("file_created", %{"task_id" => task_id} = payload, socket) do
+    reply(AgentReports.record_file(task_id, payload), socket)
+  end
+
+  def handle_in("files_created", %{"task_id" => task_id} = payload, socket) do
+    reply(AgentReports.record_files(task_id, payload), socket)
+  end
+
+  def handle_in("task_completed", %{"task_id" => task_id} = payload, socket) do
+    reply(AgentReports.complete_task(task_id, payload), socket)
+  end
+
+  def handle_in("task_error", %{"task_id" => task_id} = payload, socket) do
+    reply(AgentReports.report_error(task_id, payload), socket)
+  end
+
+  def handle_in("chat_message", payload, socket) do
+    reply(AgentReports.post_message(payload), socket)
+  end
+
+  def handle_in(_event, _payload, socket) do
+    {:reply, {:error, %{code: 400, error: "unknown or malformed report"}}, socket}
+  end
+
+  defp reply({:ok, body}, socket), do: {:reply, {:ok, body}, socket}
+
+  defp reply({:error, status, body}, socket) do
+    {:reply, {:error, Map.put(body, :code, Plug.Conn.Status.code(status))}, socket}
+  end
+end
@@ -0,0 +1,107 @@
+defmodule DevteamAiWeb.CompressedBodyReader do
+  @moduledoc """
+  Body reader for `Plug.Parsers` that inflates compressed request bodies.
+
+  Agents send batched file notifications gzip-compressed (or zstd where
+  the runtime provides `:zstd`, OTP 28+), and stream large batches with
+  chunked transfer encoding. Uncompressed bodies pass through unchanged.
+
+  The compressed body is read once under the parser's `:length` cap; a
+  longer one comes back as `{:more, ...}` and `Plug.Parsers` answers 413.
+  Inflated output is capped by `:max_inflated_body_bytes` (64 MB by
+  default) and a body that can't be decoded is a 400.
+  """
+
+  @default_max_inflated 64_000_000
+  # Compressed bytes fed to zstd per step, bounding the output of one step
+  @zstd_step 1024
+
+  def read_body(conn, opts) do
+    case Plug.Conn.get_req_header(conn, "content-encoding") do
+      ["gzip" | _] -> decode(conn, opts, "gzip", &gunzip/2)
+      ["zstd" | _] -> decode(conn, opts, "zstd", &zstd_decompress/2)
+      _ -> Plug.Conn.read_body(conn, opts)
+    end
+  end
+
+  defp decode(conn, opts, encoding, decoder) do
+    case Plug.Conn.read_body(conn, opts) do
+      {:ok, body, conn} ->
+        limit = Application.get_env(:devteam_ai, :max_inflated_body_bytes, @default_max_inflated)
+
+        try do
+          {:ok, decoder.(body, limit), conn}
+        rescue
+          e in [ErlangError, ArgumentError, MatchError, CaseClauseError] ->
+            raise Plug.BadRequestError,
+              message: "could not decode #{encoding} request body: #{Exception.message(e)}"
+        end
+
+      other ->
+        other
+    end
+  end
+
+  defp gunzip(body, limit) do
+    z = :zlib.open()
+
+    try do
+      # 16 + 15 window bits: expect a gzip header
+      :ok = :zlib.inflateInit(z, 31)
+      inflate(z, :zlib.safeInflate(z, body), [], 0, limit)
+    after
+      :zlib.close(z)
+    end
+  end
+
+  defp inflate(z, {:continue, output}, acc, size, limit) do
+    case IO.iodata_length(output) do
+      # No progress without more input: the body was cut short
+      0 -> raise ArgumentError, "truncated gzip stream"
+      length -> inflate(z, :zlib.safeInflate(z, []), [output | acc], check_size(size + length, limit), limit)
+    end
+  end
+
+  defp inflate(z, {:finished, output}, acc, size, limit) do
+    check_size(size + IO.iodata_length(output), limit)
+    # Raises data_error unless the stream ended properly
+    :zlib.inflateEnd(z)
+    IO.iodata_to_binary(Enum.reverse([output | acc]))
+  end
+
+  defp zstd_decompress(body, limit) do
+    unless Code.ensure_loaded?(:zstd) do
+      raise Plug.Parsers.UnsupportedMediaTypeError, media_type: "zstd-encoded body"
+    end
+
+    zstd_stream(apply(:zstd, :context, [:decompress]), body, [], 0, limit)
+  end
+
+  defp zstd_stream(context, <<>>, acc, size, limit) do
+    output =
+      case apply(:zstd, :finish, [context, <<>>]) do
+        {:done, output} -> output
+        {:continue, _remainder, output} -> output
+      end
+
+    check_size(size + IO.iodata_length(output), limit)
+    IO.iodata_to_binary(Enum.reverse([output | acc]))
+  end
+
+  defp zstd_stream(context, input, acc, size, limit) do
+    step = min(byte_size(input), @zstd_step)
+    <<chunk::binary-size(step), rest::binary>> = input
+
+    {remainder, output} =
+      case apply(:zstd, :stream, [context, chunk]) do
+        {:continue, remainder, output} -> {remainder, output}
+        {:done, output} -> {<<>>, output}
+      end
+
+    size = check_size(size + IO.iodata_length(output), limit)
+    zstd_stream(context, remainder <> rest, [output | acc], size, limit)
+  end
+
+  defp check_size(size, limit) when size > limit, do: raise(Plug.Parsers.RequestTooLargeError)
+  defp check_size(size, _limit), do: size
+end
@@ -6,22 +6,15 @@ defmodule DevteamAiWeb.AgentController do
     json(conn, %{agents: agents})
   end
 
-  def update_status(conn, %{"agent_id" => agent_id, "status" => status} = params) do
-    task_id = Map.get(params, "task_id")
-    message = Map.get(params, "message", "Status updated")
-    
-    # Update the orchestrator with agent status
-    DevteamAi.AgentOrchestrator.update_agent_status(agent_id, status, task_id, message)
-    
-    # Broadcast status update via WebSocket
-    DevteamAiWeb.Endpoint.broadcast("agents:lobby", "agent_status_updated", %{
-      agent_id: agent_id,
-      status: status,
-      task_id: task_id,
-      message: message,
-      timestamp: DateTime.utc_now()
-    })
-    
-    json(conn, %{success: true, message: "Agent status updated"})
+  def update_status(conn, params) do
+    case DevteamAi.AgentReports.update_status(params) do
+      {:ok, body} ->
+        json(conn, body)
+
+      {:error, status, body} ->
+        conn
+        |> put_status(status)
+        |> json(body)
+    end
   end
-end
\ No newline at end of file
+end
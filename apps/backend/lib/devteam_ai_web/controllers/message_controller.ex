@@ -1,9 +1,15 @@
 defmodule DevteamAiWeb.MessageController do
   use DevteamAiWeb, :controller
 
-  def create(conn, %{"message" => message_params}) do
-    Phoenix.PubSub.broadcast(DevteamAi.PubSub, "chat", {:new_message, message_params})
-    
-    json(conn, %{status: "sent", message: "Message sent successfully"})
+  def create(conn, params) do
+    case DevteamAi.AgentReports.post_message(params) do
+      {:ok, body} ->
+        json(conn, body)
+
+      {:error, status, body} ->
+        conn
+        |> put_status(status)
+        |> json(body)
+    end
   end
-end
\ No newline at end of file
+end
@@ -2,8 +2,39 @@ defmodule DevteamAiWeb.TaskController do
   use DevteamAiWeb, :controller
   alias DevteamAi.Tasks
 
+  # Paged form used by agents backfilling tasks they missed while disconnected
+  def index(conn, %{"limit" => limit} = params) do
+    limit =
+      case Integer.parse(to_string(limit)) do
+        {n, _} when n > 0 -> min(n, 500)
+        _ -> 100
+      end
+
+    since =
+      case DateTime.from_iso8601(Map.get(params, "since", "")) do
+        {:ok, datetime, _offset} -> DateTime.truncate(datetime, :second)
+        _ -> nil
+      end
+
+    tasks =
+      Tasks.list_tasks_after(
+        status: parse_status(Map.get(params, "status")),
+        since: since,
+        after_id: Map.get(params, "after_id"),
+        limit: limit
+      )
+
+    next_cursor =
+      if length(tasks) == limit do
+        last = List.last(tasks)
+        %{since: DateTime.to_iso8601(last.inserted_at), after_id: last.id}
+      end
+
+    json(conn, %{tasks: tasks, next_cursor: next_cursor})
+  end
+
   def index(conn, params) do
-    status = Map.get(params, "status")
+    status = parse_status(Map.get(params, "status"))
     agent = Map.get(params, "agent")
     
     tasks = Tasks.list_tasks(status: status, agent: agent)
@@ -34,7 +65,8 @@ defmodule DevteamAiWeb.TaskController do
   def create(conn, %{"description" => description} = params) do
     task_params = %{
       "description" => description,
-      "priority" => Map.get(params, "priority", "medium")
+      "priority" => Map.get(params, "priority", "medium"),
+      "amends" => Map.get(params, "amends")
     }
     
     case Tasks.create_task(task_params) do
@@ -113,4 +145,15 @@ defmodule DevteamAiWeb.TaskController do
     stats = Tasks.get_task_stats()
     json(conn, %{stats: stats})
   end
-end
\ No newline at end of file
+
+  # "pending,in_progress" filters on either status
+  defp parse_status(nil), do: nil
+
+  defp parse_status(status) do
+    case String.split(status, ",", trim: true) do
+      [] -> nil
+      [single] -> single
+      statuses -> statuses
+    end
+  end
+end
@@ -0,0 +1,58 @@
+defmodule DevteamAiWeb.TaskLeaseController do
+  use DevteamAiWeb, :controller
+  alias DevteamAi.Tasks
+
+  # Agent instances claim a task before processing it, so with several
+  # replicas listening on tasks:lobby each task still runs exactly once
+
+  def claim(conn, %{"id" => task_id, "node_id" => node} = params) do
+    case Tasks.claim_task(task_id, node, lease_ttl(params)) do
+      {:ok, expires_at} ->
+        json(conn, %{status: "claimed", leased_by: node, lease_expires_at: expires_at})
+
+      {:error, :not_found} ->
+        conn
+        |> put_status(:not_found)
+        |> json(%{error: "Task not found"})
+
+      {:error, reason} ->
+        conn
+        |> put_status(:conflict)
+        |> json(%{error: Atom.to_string(reason)})
+    end
+  end
+
+  def renew(conn, %{"id" => task_id, "node_id" => node} = params) do
+    case Tasks.renew_task_lease(task_id, node, lease_ttl(params)) do
+      {:ok, expires_at} ->
+        json(conn, %{status: "renewed", lease_expires_at: expires_at})
+
+      {:error, :lost} ->
+        conn
+        |> put_status(:conflict)
+        |> json(%{error: "lease_lost"})
+    end
+  end
+
+  def release(conn, %{"id" => task_id, "node_id" => node}) do
+    :ok = Tasks.release_task_lease(task_id, node)
+    json(conn, %{status: "released"})
+  end
+
+  def expired(conn, params) do
+    limit =
+      case Integer.parse(to_string(Map.get(params, "limit", "100"))) do
+        {n, _} when n > 0 -> min(n, 500)
+        _ -> 100
+      end
+
+    json(conn, %{tasks: Tasks.list_expired_leases(limit)})
+  end
+
+  defp lease_ttl(params) do
+    case Integer.parse(to_string(Map.get(params, "ttl", "60"))) do
+      {ttl, _} when ttl > 0 -> min(ttl, 3600)
+      _ -> 60
+    end
+  end
+end
@@ -9,7 +9,7 @@ defmodule DevteamAiWeb.Endpoint do
   ]
 
   socket "/live", Phoenix.LiveView.Socket, websocket: [connect_info: [session: @session_options]]
-  socket "/socket", DevteamAiWeb.UserSocket, websocket: true, longpoll: false
+  socket "/socket", DevteamAiWeb.UserSocket, websocket: [compress: true], longpoll: false
 
   plug CORSPlug,
     origin: ["http://localhost:5173"],
@@ -38,6 +38,7 @@ defmodule DevteamAiWeb.Endpoint do
   plug Plug.Parsers,
     parsers: [:urlencoded, :multipart, :json],
     pass: ["*/*"],
+    body_reader: {DevteamAiWeb.CompressedBodyReader, :read_body, []},
     json_decoder: Phoenix.json_library()
 
   plug Plug.MethodOverride
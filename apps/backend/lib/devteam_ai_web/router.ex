@@ -26,6 +26,7 @@ defmodule DevteamAiWeb.Router do
     get "/tasks", TaskController, :index
     post "/tasks", TaskController, :create
     get "/tasks/stats", TaskController, :stats
+    get "/tasks/leases/expired", TaskLeaseController, :expired
     get "/tasks/:id", TaskController, :show
     put "/tasks/:id", TaskController, :update
     delete "/tasks/:id", TaskController, :delete
@@ -33,9 +34,15 @@ defmodule DevteamAiWeb.Router do
     # Enhanced task communication endpoints
     post "/tasks/:id/progress", TaskProgressController, :update_progress
     post "/tasks/:id/files", TaskProgressController, :notify_file_created
+    post "/tasks/:id/files/batch", TaskProgressController, :notify_files_created
     post "/tasks/:id/complete", TaskProgressController, :complete_task
     post "/tasks/:id/error", TaskProgressController, :report_error
     
+    # Claims that keep agent replicas from processing the same task
+    post "/tasks/:id/claim", TaskLeaseController, :claim
+    post "/tasks/:id/lease", TaskLeaseController, :renew
+    post "/tasks/:id/release", TaskLeaseController, :release
+    
     get "/agents", AgentController, :index
     post "/messages", MessageController, :create
     post "/agent_status", AgentController, :update_status
@@ -0,0 +1,11 @@
+defmodule DevteamAi.Repo.Migrations.AddContentHashToGeneratedFiles do
+  use Ecto.Migration
+
+  def change do
+    alter table(:generated_files) do
+      add :content_hash, :string
+    end
+
+    create index(:generated_files, [:content_hash])
+  end
+end
@@ -0,0 +1,9 @@
+defmodule DevteamAi.Repo.Migrations.AddAmendsToTasks do
+  use Ecto.Migration
+
+  def change do
+    alter table(:tasks) do
+      add :amends, :string
+    end
+  end
+end
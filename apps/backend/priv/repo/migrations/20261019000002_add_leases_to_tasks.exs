@@ -0,0 +1,12 @@
+defmodule DevteamAi.Repo.Migrations.AddLeasesToTasks do
+  use Ecto.Migration
+
+  def change do
+    alter table(:tasks) do
+      add :leased_by, :string
+      add :lease_expires_at, :utc_datetime
+    end
+
+    create index(:tasks, [:lease_expires_at])
+  end
+end